@@ -60,6 +60,24 @@ interface MLExplainResponse {
   timestamp: string;
 }
 
+interface MLFullResponse {
+  wallet_address: string;
+  fraud_probability: number;
+  risk_score: number;
+  is_fraud: boolean;
+  confidence: number;
+  model_path?: string;
+  is_anomaly: boolean;
+  anomaly_score: number;
+  anomaly_threshold: number;
+  anomaly_reasons: string[];
+  feature_contributions?: { feature_name: string; importance: number; shap_value?: number }[];
+  top_risk_factors?: string[];
+  model_version: string;
+  timestamp: string;
+  processing_time_ms: number;
+}
+
 interface MLFeedbackRequest {
   wallet_address: string;
   actual_fraud: boolean;
@@ -210,6 +228,17 @@ export function extractMLFeatures(walletData: any): Record<string, number> {
   return features;
 }
 
+/**
+ * Request options with a timeout the ML service also sees, so it can shed
+ * requests it could not answer before we give up on them
+ */
+function withDeadline(timeoutMs: number) {
+  return {
+    timeout: timeoutMs,
+    headers: { 'X-Request-Timeout-Ms': String(timeoutMs) }
+  };
+}
+
 /**
  * Get ML fraud prediction
  */
@@ -230,7 +259,7 @@ export async function getMlPrediction(
         chain_id: chainId,
         features
       },
-      { timeout: 5000 }
+      withDeadline(5000)
     );
 
     console.log(`✅ ML prediction for ${walletAddress}: ${response.data.risk_score}`);
@@ -261,7 +290,7 @@ export async function detectAnomaly(
         chain_id: chainId,
         features
       },
-      { timeout: 5000 }
+      withDeadline(5000)
     );
 
     return response.data;
@@ -272,6 +301,39 @@ export async function detectAnomaly(
   }
 }
 
+/**
+ * Get fraud prediction and anomaly detection in one call
+ * Features are extracted and sent once instead of once per endpoint
+ */
+export async function getFullPrediction(
+  walletAddress: string,
+  walletData: any,
+  chainId: number = 84532,
+  explainTopK: number = 0
+): Promise<MLFullResponse | null> {
+  try {
+    const features = extractMLFeatures(walletData);
+
+    const response = await axios.post<MLFullResponse>(
+      `${ML_SERVICE_URL}/api/predict/full`,
+      {
+        wallet_address: walletAddress,
+        chain_id: chainId,
+        features,
+        explain_top_k: explainTopK
+      },
+      withDeadline(explainTopK > 0 ? 10000 : 5000)
+    );
+
+    console.log(`✅ ML prediction for ${walletAddress}: ${response.data.risk_score}`);
+    return response.data;
+
+  } catch (error: any) {
+    console.error('Full ML prediction error:', error.message);
+    return null;
+  }
+}
+
 /**
  * Get explainable prediction
  */
@@ -286,7 +348,7 @@ export async function getExplainablePrediction(
         wallet_address: walletAddress,
         chain_id: chainId
       },
-      { timeout: 10000 }
+      withDeadline(10000)
     );
 
     return response.data;
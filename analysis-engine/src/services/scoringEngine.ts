@@ -12,8 +12,7 @@ import {
   shouldAutoBlock
 } from './metasleuthProvider';
 import {
-  getMlPrediction,
-  detectAnomaly,
+  getFullPrediction,
   isMlServiceAvailable
 } from './mlProvider';
 import fs from 'fs';
@@ -127,10 +126,8 @@ export async function analyzeWallet(walletAddress: string): Promise<RiskAnalysis
 
       if (mlAvailable) {
         console.log(`🤖 Getting ML prediction for ${normalizedAddress}`);
-        [mlPrediction, mlAnomaly] = await Promise.all([
-          getMlPrediction(normalizedAddress, walletData, 84532),
-          detectAnomaly(normalizedAddress, walletData, 84532)
-        ]);
+        // One request covers both the fraud and the anomaly model
+        mlPrediction = mlAnomaly = await getFullPrediction(normalizedAddress, walletData, 84532);
 
         if (mlPrediction) {
           console.log(`✅ ML Risk Score: ${mlPrediction.risk_score}, Confidence: ${mlPrediction.confidence.toFixed(2)}`);
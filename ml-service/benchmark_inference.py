@@ -0,0 +1,288 @@
+"""Benchmark fraud ensemble and anomaly inference backends on the Kaggle test split."""
+import logging
+import sys
+import argparse
+import copy
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.utils.data_loader import KaggleDataLoader
+from src.models.fraud_detector import FraudDetector
+from src.models.anomaly_detector import AnomalyDetector
+from src.services.member_pool import EnsembleMemberPool
+from src.config import settings
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Largest probability or score difference from the native models per backend,
+# the same tolerances the engines are verified with at load time
+PARITY_TOLERANCE = {'compiled': 0.0, 'parallel': 0.0, 'onnx': 1e-5}
+
+
+def load_detector(version: str) -> FraudDetector:
+    """Load a fraud detector with quiet, single-threaded RF inference."""
+    detector = FraudDetector(model_dir=str(settings.model_dir))
+    detector.load(version=version)
+    # Sequential RF accumulation is the reference the compiled engine matches
+    detector.rf_model.n_jobs = 1
+    detector.rf_model.verbose = 0
+    return detector
+
+
+def build_backends(version: str) -> dict:
+    """Build a detector for each backend, keyed by name."""
+    native = load_detector(version)
+
+    compiled = copy.copy(native)
+    if not compiled.compile_engine(max_rows=sys.maxsize):
+        raise RuntimeError("Compiled engine failed verification")
+
+    parallel = copy.copy(native)
+    parallel.member_pool = EnsembleMemberPool(max_workers=2)
+
+    backends = {
+        'native': native,
+        'compiled': compiled,
+        'parallel': parallel,
+    }
+
+    onnx = copy.copy(native)
+    if onnx.load_onnx(version=version):
+        backends['onnx'] = onnx
+    else:
+        logger.warning("Skipping the onnx backend, see the warning above")
+    return backends
+
+
+def build_anomaly_backends(version: str) -> dict:
+    """Build an anomaly detector for each backend, keyed by name."""
+    native = AnomalyDetector(model_dir=str(settings.model_dir))
+    native.load(version=version)
+
+    backends = {'native': native}
+    onnx = copy.copy(native)
+    if onnx.load_onnx(version=version, max_rows=sys.maxsize):
+        backends['onnx'] = onnx
+    return backends
+
+
+def time_backend(predict: Callable[[np.ndarray], object], X: np.ndarray, batch_size: int, repeats: int, warmup: int = 3) -> dict:
+    """
+    Measure per-call latency for one backend and batch size.
+
+    Args:
+        predict: Prediction call of the backend
+        X: Test matrix
+        batch_size: Rows per call
+        repeats: Timed calls
+        warmup: Untimed calls first
+
+    Returns:
+        Dictionary with p50/p99 latency (ms) and throughput (rows/s)
+    """
+    n_rows = len(X)
+    latencies = []
+
+    for i in range(warmup + repeats):
+        start = (i * batch_size) % max(1, n_rows - batch_size)
+        batch = X[start:start + batch_size]
+
+        began = time.perf_counter()
+        predict(batch)
+        elapsed = time.perf_counter() - began
+
+        if i >= warmup:
+            latencies.append(elapsed)
+
+    latencies = np.array(latencies)
+    return {
+        'p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'p99_ms': float(np.percentile(latencies, 99) * 1000),
+        'rows_per_s': float(batch_size * len(latencies) / latencies.sum())
+    }
+
+
+def _parity_failures(name: str, max_diff: float, agreement: float, min_agreement: float) -> List[str]:
+    """Describe how a backend misses its tolerance or the label agreement threshold."""
+    failures = []
+    if max_diff > PARITY_TOLERANCE[name]:
+        failures.append(f"{name}: max abs diff {max_diff:.3g} over tolerance {PARITY_TOLERANCE[name]:g}")
+    if agreement < min_agreement:
+        failures.append(f"{name}: label agreement {agreement:.4%} below {min_agreement:.4%}")
+    return failures
+
+
+def check_parity(backends: dict, X: np.ndarray, min_agreement: float) -> List[str]:
+    """
+    Compare every backend with the native models on the full test split.
+
+    Returns:
+        Parity failures, empty if every backend matches
+    """
+    reference = backends['native'].predict_proba(X)
+
+    failures = []
+    for name, detector in backends.items():
+        if name == 'native':
+            continue
+        proba = detector.predict_proba(X)
+        identical = np.array_equal(proba, reference)
+        max_diff = float(np.abs(proba - reference).max())
+        agreement = float(np.mean((proba >= 0.5) == (reference >= 0.5)))
+        logger.info(
+            f"  {name:<10} bit-identical: {'yes' if identical else 'NO'} "
+            f"(max abs diff {max_diff:.3g}, label agreement {agreement:.2%})"
+        )
+        failures += _parity_failures(name, max_diff, agreement, min_agreement)
+    return failures
+
+
+def check_anomaly_parity(backends: dict, X: np.ndarray, min_agreement: float) -> List[str]:
+    """
+    Compare every anomaly backend with the native model on the full test split.
+
+    Returns:
+        Parity failures, empty if every backend matches
+    """
+    reference_labels, reference_scores, _ = backends['native'].score(X)
+
+    failures = []
+    for name, detector in backends.items():
+        if name == 'native':
+            continue
+        labels, scores, _ = detector.score(X)
+        max_diff = float(np.abs(scores - reference_scores).max())
+        agreement = float(np.mean(labels == reference_labels))
+        logger.info(
+            f"  {name:<10} max abs score diff {max_diff:.3g}, label agreement {agreement:.2%}"
+        )
+        failures += _parity_failures(name, max_diff, agreement, min_agreement)
+    return failures
+
+
+def main():
+    """Main benchmark function."""
+    parser = argparse.ArgumentParser(description="Benchmark fraud ensemble inference backends")
+    parser.add_argument(
+        "--dataset",
+        type=str,
+        default="transaction_dataset.csv",
+        help="Name of dataset CSV file"
+    )
+    parser.add_argument(
+        "--data-path",
+        type=str,
+        default="data/kaggle",
+        help="Path to dataset directory"
+    )
+    parser.add_argument(
+        "--version",
+        type=str,
+        default=settings.model_version,
+        help="Model version to benchmark"
+    )
+    parser.add_argument(
+        "--batch-sizes",
+        type=str,
+        default="1,32,1024",
+        help="Comma-separated batch sizes"
+    )
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=100,
+        help="Timed calls per backend and batch size"
+    )
+    parser.add_argument(
+        "--test-size",
+        type=float,
+        default=0.2,
+        help="Test set proportion"
+    )
+    parser.add_argument(
+        "--min-agreement",
+        type=float,
+        default=0.999,
+        help="Lowest label agreement with the native models before the parity check fails"
+    )
+
+    args = parser.parse_args()
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",")]
+
+    # Only the held-out split is used, so skip SMOTE balancing
+    data_loader = KaggleDataLoader(data_path=args.data_path)
+    _, X_test, _, _, _ = data_loader.load_and_prepare(
+        filename=args.dataset,
+        test_size=args.test_size,
+        balance_data=False
+    )
+
+    backends = build_backends(args.version)
+    detector = load_detector(args.version)
+    X = detector.vectorize(X_test[detector.feature_names].to_dict('records'))
+
+    logger.info("\n" + "=" * 60)
+    logger.info(f"PARITY ({len(X)} test rows)")
+    logger.info("=" * 60)
+    failures = check_parity(backends, X, args.min_agreement)
+
+    anomaly_backends = build_anomaly_backends(args.version)
+    X_anomaly = anomaly_backends['native'].vectorize(X_test[anomaly_backends['native'].feature_names].to_dict('records'))
+    logger.info("\n" + "=" * 60)
+    logger.info(f"ANOMALY PARITY ({len(X_anomaly)} test rows)")
+    logger.info("=" * 60)
+    failures += [
+        f"anomaly {failure}" for failure in check_anomaly_parity(anomaly_backends, X_anomaly, args.min_agreement)
+    ]
+    if failures:
+        for failure in failures:
+            logger.error(f"  ❌ Parity check failed, {failure}")
+        sys.exit(1)
+
+    logger.info("\n" + "=" * 60)
+    logger.info("LATENCY / THROUGHPUT")
+    logger.info("=" * 60)
+    logger.info(f"  {'backend':<10} {'batch':>6} {'p50 ms':>10} {'p99 ms':>10} {'rows/s':>12}")
+    for batch_size in batch_sizes:
+        for name, detector in backends.items():
+            result = time_backend(detector.predict_proba, X, batch_size, args.repeats)
+            logger.info(
+                f"  {name:<10} {batch_size:>6} {result['p50_ms']:>10.3f} "
+                f"{result['p99_ms']:>10.3f} {result['rows_per_s']:>12.0f}"
+            )
+
+            if detector.member_pool is not None:
+                timings = detector.member_pool.get_stats()['timings_ms']
+                logger.info("  " + ", ".join(
+                    f"{member} p50 {timing['p50']:.3f}ms"
+                    for member, timing in timings.items()
+                ))
+                # Next batch size starts from fresh timings
+                detector.member_pool = EnsembleMemberPool(max_workers=detector.member_pool.max_workers)
+
+    logger.info("\n" + "=" * 60)
+    logger.info("ANOMALY LATENCY / THROUGHPUT")
+    logger.info("=" * 60)
+    logger.info(f"  {'backend':<10} {'batch':>6} {'p50 ms':>10} {'p99 ms':>10} {'rows/s':>12}")
+    for batch_size in batch_sizes:
+        for name, detector in anomaly_backends.items():
+            result = time_backend(detector.score, X_anomaly, batch_size, args.repeats)
+            logger.info(
+                f"  {name:<10} {batch_size:>6} {result['p50_ms']:>10.3f} "
+                f"{result['p99_ms']:>10.3f} {result['rows_per_s']:>12.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""Derive smaller serving models from a trained ensemble and report their trade-offs."""
+import logging
+import sys
+import argparse
+import copy
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import joblib
+import numpy as np
+from sklearn.metrics import precision_score, recall_score, roc_auc_score
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.utils.data_loader import KaggleDataLoader
+from src.models.fraud_detector import FraudDetector
+from src.models.anomaly_detector import AnomalyDetector
+from src.models.compaction import (
+    cap_forest_depth, distill_student, forest_depth, rank_trees, subset_forest, truncate_boosting
+)
+from src.config import settings
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Objectives a candidate must not be worse on to dominate another: (key, higher is better)
+OBJECTIVES = (('auc_roc', True), ('recall', True), ('p50_ms', False), ('p99_ms', False), ('size_mb', False))
+
+
+def score(y_true: np.ndarray, proba: np.ndarray) -> dict:
+    """Classification metrics at the 0.5 decision threshold."""
+    pred = (proba >= 0.5).astype(int)
+    return {
+        'auc_roc': roc_auc_score(y_true, proba),
+        'recall': recall_score(y_true, pred, zero_division=0),
+        'precision': precision_score(y_true, pred, zero_division=0)
+    }
+
+
+def time_single_rows(predict: Callable[[np.ndarray], np.ndarray], X: np.ndarray, n_rows: int, warmup: int = 5) -> Tuple[float, float]:
+    """p50 and p99 latency in ms of scoring rows one at a time."""
+    for i in range(warmup):
+        predict(X[i:i + 1])
+    latencies = []
+    for i in range(n_rows):
+        began = time.perf_counter()
+        predict(X[i:i + 1])
+        latencies.append(time.perf_counter() - began)
+    p50, p99 = np.percentile(latencies, [50, 99])
+    return float(p50 * 1000), float(p99 * 1000)
+
+
+def measure_artifacts(detector: FraudDetector, tier: str) -> Tuple[float, float]:
+    """
+    Size on disk and load time of the models a tier serves from.
+
+    Args:
+        detector: Candidate detector
+        tier: 'full' for RF and XGBoost, 'fallback' for the student
+
+    Returns:
+        Tuple of (size in MB, load time in ms)
+    """
+    names = ['fallback'] if tier == 'fallback' else ['random_forest', 'xgboost']
+    with tempfile.TemporaryDirectory() as tmp:
+        saved = copy.copy(detector)
+        saved.model_dir = Path(tmp)
+        saved.save(version="candidate")
+        paths = [Path(tmp) / f"{name}_vcandidate.joblib" for name in names]
+        size_mb = sum(path.stat().st_size for path in paths) / 2**20
+        began = time.perf_counter()
+        for path in paths:
+            joblib.load(path)
+        load_ms = (time.perf_counter() - began) * 1000
+    return size_mb, load_ms
+
+
+def build_candidates(
+    detector: FraudDetector,
+    X_train: np.ndarray,
+    tree_counts: List[int],
+    depths: List[int],
+    xgb_rounds: List[int],
+    students: List[Tuple[int, int]]
+) -> Dict[str, Tuple[FraudDetector, str]]:
+    """
+    Derive every candidate from a loaded detector.
+
+    Args:
+        detector: Detector with the trained ensemble
+        X_train: Training rows to select trees and distill on
+        tree_counts: Random forest subset sizes
+        depths: Random forest depth caps
+        xgb_rounds: XGBoost boosting round counts
+        students: (boosting rounds, depth) per student, 1 round meaning a
+            single regression tree
+
+    Returns:
+        (detector, tier to predict with) keyed by candidate name, the full
+        ensemble first
+    """
+    rf_model, xgb_model = detector.rf_model, detector.xgb_model
+    n_trees = len(rf_model.estimators_)
+    n_rounds = xgb_model.get_booster().num_boosted_rounds()
+    full_depth = forest_depth(rf_model)
+
+    logger.info(f"Ranking {n_trees} random forest trees...")
+    order = rank_trees(rf_model, X_train)
+
+    forests = {}
+    for count in [n_trees] + sorted({n for n in tree_counts if n < n_trees}, reverse=True):
+        forest = subset_forest(rf_model, order[:count])
+        forests[(count, full_depth)] = forest
+        for depth in sorted({d for d in depths if d < full_depth}, reverse=True):
+            forests[(count, depth)] = cap_forest_depth(forest, depth)
+
+    boosters = {n_rounds: xgb_model}
+    for rounds in sorted({r for r in xgb_rounds if r < n_rounds}, reverse=True):
+        boosters[rounds] = truncate_boosting(xgb_model, rounds)
+
+    candidates: Dict[str, Tuple[FraudDetector, str]] = {}
+    for (count, depth), forest in forests.items():
+        for rounds, booster in boosters.items():
+            candidate = copy.copy(detector)
+            candidate.rf_model = forest
+            candidate.xgb_model = booster
+            candidate.compiled_engine = None
+            candidate.onnx_engine = None
+            candidates[f"rf{count}-d{depth}+xgb{rounds}"] = (candidate, 'full')
+
+    teacher = detector.predict_proba(X_train)
+    for rounds, depth in students:
+        candidate = copy.copy(detector)
+        candidate.fallback_model = distill_student(X_train, teacher, max_depth=depth, n_estimators=rounds)
+        name = f"student-tree-d{depth}" if rounds == 1 else f"student-xgb{rounds}-d{depth}"
+        candidates[name] = (candidate, 'fallback')
+    return candidates
+
+
+def pareto_front(rows: List[dict]) -> None:
+    """Mark rows no other row is at least as good as on every objective and better on one."""
+    def dominates(a: dict, b: dict) -> bool:
+        no_worse = all(a[key] >= b[key] if higher else a[key] <= b[key] for key, higher in OBJECTIVES)
+        better = any(a[key] > b[key] if higher else a[key] < b[key] for key, higher in OBJECTIVES)
+        return no_worse and better
+
+    for row in rows:
+        row['pareto'] = not any(dominates(other, row) for other in rows if other is not row)
+
+
+def main():
+    """Main derivation function."""
+    parser = argparse.ArgumentParser(description="Derive pruned, depth-capped and distilled models")
+    parser.add_argument(
+        "--dataset",
+        type=str,
+        default="transaction_dataset.csv",
+        help="Name of dataset CSV file"
+    )
+    parser.add_argument(
+        "--data-path",
+        type=str,
+        default="data/kaggle",
+        help="Path to dataset directory"
+    )
+    parser.add_argument(
+        "--version",
+        type=str,
+        default=settings.model_version,
+        help="Model version to derive from"
+    )
+    parser.add_argument(
+        "--tree-counts",
+        type=str,
+        default="25,50,100",
+        help="Comma-separated random forest subset sizes"
+    )
+    parser.add_argument(
+        "--depths",
+        type=str,
+        default="8,12",
+        help="Comma-separated random forest depth caps"
+    )
+    parser.add_argument(
+        "--xgb-rounds",
+        type=str,
+        default="50,100",
+        help="Comma-separated XGBoost boosting round counts"
+    )
+    parser.add_argument(
+        "--students",
+        type=str,
+        default="1x6,1x10,50x4",
+        help="Comma-separated distilled students as ROUNDSxDEPTH (1 round: a single tree)"
+    )
+    parser.add_argument(
+        "--engine",
+        type=str,
+        default="native",
+        choices=["native", "compiled"],
+        help="Inference engine for the ensemble candidates"
+    )
+    parser.add_argument(
+        "--latency-rows",
+        type=int,
+        default=200,
+        help="Rows scored one at a time for latency"
+    )
+    parser.add_argument(
+        "--test-size",
+        type=float,
+        default=0.2,
+        help="Test set proportion"
+    )
+    parser.add_argument(
+        "--no-balance",
+        action="store_true",
+        help="Select trees and distill on the unbalanced training split"
+    )
+    parser.add_argument(
+        "--save-as",
+        type=str,
+        help="Save --candidate as this model version (students as its fallback tier)"
+    )
+    parser.add_argument(
+        "--candidate",
+        type=str,
+        help="Candidate name from the report to save"
+    )
+
+    args = parser.parse_args()
+    if bool(args.save_as) != bool(args.candidate):
+        parser.error("--save-as and --candidate go together")
+
+    def int_list(value: str) -> List[int]:
+        return [int(item) for item in value.split(",") if item]
+
+    students = [tuple(int(part) for part in spec.split("x")) for spec in args.students.split(",") if spec]
+
+    data_loader = KaggleDataLoader(data_path=args.data_path)
+    X_train_df, X_test_df, _, y_test, _ = data_loader.load_and_prepare(
+        filename=args.dataset,
+        test_size=args.test_size,
+        balance_data=not args.no_balance
+    )
+    y_test = np.asarray(y_test)
+
+    detector = FraudDetector(model_dir=str(settings.model_dir))
+    detector.load(version=args.version)
+    rf_jobs, rf_verbose = detector.rf_model.n_jobs, detector.rf_model.verbose
+    # Quiet, single-threaded RF inference, as served on one inference worker
+    detector.rf_model = copy.copy(detector.rf_model)
+    detector.rf_model.n_jobs = 1
+    detector.rf_model.verbose = 0
+
+    X_train = detector.vectorize(X_train_df[detector.feature_names].to_dict('records'))
+    X = detector.vectorize(X_test_df[detector.feature_names].to_dict('records'))
+    n_latency = min(args.latency_rows, len(X))
+
+    candidates = build_candidates(
+        detector,
+        X_train,
+        int_list(args.tree_counts),
+        int_list(args.depths),
+        int_list(args.xgb_rounds),
+        students
+    )
+
+    baseline_name = next(iter(candidates))
+    baseline_labels = None
+    rows = []
+    for name, (candidate, tier) in candidates.items():
+        if tier == 'full' and args.engine == "compiled":
+            candidate.compile_engine(max_rows=settings.compiled_engine_max_rows)
+        proba = candidate.predict_proba(X, tier=tier)
+        labels = proba >= 0.5
+        if baseline_labels is None:
+            baseline_labels = labels
+        p50, p99 = time_single_rows(lambda batch: candidate.predict_proba(batch, tier=tier), X, n_latency)
+        size_mb, load_ms = measure_artifacts(candidate, tier)
+        rows.append({
+            'name': name,
+            **score(y_test, proba),
+            'agreement': float(np.mean(labels == baseline_labels)),
+            'p50_ms': p50,
+            'p99_ms': p99,
+            'size_mb': size_mb,
+            'load_ms': load_ms
+        })
+        logger.info(f"Measured {name}")
+
+    pareto_front(rows)
+
+    logger.info("\n" + "=" * 112)
+    logger.info(
+        f"COMPACT MODELS ({len(X)} test rows, {n_latency} single-row calls, {args.engine} engine, "
+        f"baseline {baseline_name})"
+    )
+    logger.info("=" * 112)
+    logger.info(
+        f"  {'candidate':<24} {'auc':>7} {'recall':>7} {'prec':>7} {'agree':>7} "
+        f"{'p50 ms':>8} {'p99 ms':>8} {'size MB':>8} {'load ms':>8}  pareto"
+    )
+    for row in sorted(rows, key=lambda row: row['p50_ms']):
+        logger.info(
+            f"  {row['name']:<24} {row['auc_roc']:>7.4f} {row['recall']:>7.4f} {row['precision']:>7.4f} "
+            f"{row['agreement']:>7.2%} {row['p50_ms']:>8.3f} {row['p99_ms']:>8.3f} "
+            f"{row['size_mb']:>8.2f} {row['load_ms']:>8.1f}  {'*' if row['pareto'] else ''}"
+        )
+    logger.info("\nagree: labels identical to the baseline; pareto: no other candidate is at least as "
+                "good on AUC, recall, p50, p99 and size and better on one")
+
+    if args.save_as:
+        if args.candidate not in candidates:
+            parser.error(f"Unknown candidate {args.candidate}")
+        candidate, tier = candidates[args.candidate]
+        saved = copy.copy(detector if tier == 'fallback' else candidate)
+        saved.fallback_model = candidate.fallback_model
+        saved.model_dir = settings.model_dir
+        saved.rf_model = copy.copy(saved.rf_model)
+        saved.rf_model.n_jobs, saved.rf_model.verbose = rf_jobs, rf_verbose
+        row = next(row for row in rows if row['name'] == args.candidate)
+        saved.metrics = {
+            **detector.metrics,
+            'derived_from': args.version,
+            'derivation': args.candidate,
+            'derived_auc_roc': row['auc_roc'],
+            'derived_recall': row['recall']
+        }
+        saved.save(version=args.save_as)
+
+        # Serving a version needs its anomaly model too
+        anomaly_detector = AnomalyDetector(model_dir=str(settings.model_dir))
+        anomaly_detector.load(version=args.version)
+        anomaly_detector.save(version=args.save_as)
+        logger.info(f"\n📦 Saved {args.candidate} as version {args.save_as} in {settings.model_dir}")
+
+
+if __name__ == "__main__":
+    main()
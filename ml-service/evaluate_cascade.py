@@ -0,0 +1,177 @@
+"""Measure accuracy cost and latency savings of cascade inference."""
+import logging
+import sys
+import argparse
+import copy
+import time
+from pathlib import Path
+
+import numpy as np
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.utils.data_loader import KaggleDataLoader
+from src.models.fraud_detector import FraudDetector
+from src.config import settings
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def score(y_true: np.ndarray, proba: np.ndarray) -> dict:
+    """Classification metrics at the 0.5 decision threshold."""
+    pred = (proba >= 0.5).astype(int)
+    return {
+        'accuracy': accuracy_score(y_true, pred),
+        'precision': precision_score(y_true, pred, zero_division=0),
+        'recall': recall_score(y_true, pred, zero_division=0),
+        'f1': f1_score(y_true, pred, zero_division=0),
+        'auc_roc': roc_auc_score(y_true, proba)
+    }
+
+
+def time_single_rows(detector: FraudDetector, X: np.ndarray, n_rows: int) -> float:
+    """Mean latency in ms of scoring rows one at a time."""
+    latencies = []
+    for i in range(n_rows):
+        began = time.perf_counter()
+        detector.predict_proba(X[i:i + 1])
+        latencies.append(time.perf_counter() - began)
+    return float(np.mean(latencies) * 1000)
+
+
+def time_batch(detector: FraudDetector, X: np.ndarray, repeats: int = 3) -> float:
+    """Best-of-n latency in ms of scoring the whole split in one call."""
+    best = float('inf')
+    for _ in range(repeats):
+        began = time.perf_counter()
+        detector.predict_proba(X)
+        best = min(best, time.perf_counter() - began)
+    return best * 1000
+
+
+def main():
+    """Main evaluation function."""
+    parser = argparse.ArgumentParser(description="Evaluate cascade inference band widths")
+    parser.add_argument(
+        "--dataset",
+        type=str,
+        default="transaction_dataset.csv",
+        help="Name of dataset CSV file"
+    )
+    parser.add_argument(
+        "--data-path",
+        type=str,
+        default="data/kaggle",
+        help="Path to dataset directory"
+    )
+    parser.add_argument(
+        "--version",
+        type=str,
+        default=settings.model_version,
+        help="Model version to evaluate"
+    )
+    parser.add_argument(
+        "--bands",
+        type=str,
+        default="0.0,0.05,0.1,0.2,0.3,0.4",
+        help="Comma-separated band half-widths around the 0.5 threshold"
+    )
+    parser.add_argument(
+        "--first-model",
+        type=str,
+        default="xgboost",
+        choices=["xgboost", "random_forest"],
+        help="Model run for every row"
+    )
+    parser.add_argument(
+        "--engine",
+        type=str,
+        default=settings.inference_engine,
+        choices=["native", "compiled"],
+        help="Inference engine"
+    )
+    parser.add_argument(
+        "--latency-rows",
+        type=int,
+        default=200,
+        help="Rows scored one at a time for latency"
+    )
+    parser.add_argument(
+        "--test-size",
+        type=float,
+        default=0.2,
+        help="Test set proportion"
+    )
+
+    args = parser.parse_args()
+    bands = [float(band) for band in args.bands.split(",")]
+
+    # Only the held-out split is used, so skip SMOTE balancing
+    data_loader = KaggleDataLoader(data_path=args.data_path)
+    _, X_test, _, y_test, _ = data_loader.load_and_prepare(
+        filename=args.dataset,
+        test_size=args.test_size,
+        balance_data=False
+    )
+    y_test = np.asarray(y_test)
+
+    detector = FraudDetector(model_dir=str(settings.model_dir))
+    detector.load(version=args.version)
+    detector.rf_model.verbose = 0
+    if args.engine == "compiled":
+        detector.compile_engine(max_rows=settings.compiled_engine_max_rows)
+
+    X = detector.vectorize(X_test[detector.feature_names].to_dict('records'))
+    n_latency = min(args.latency_rows, len(X))
+
+    # Full ensemble baseline
+    baseline_proba = detector.predict_proba(X)
+    baseline = score(y_test, baseline_proba)
+    baseline_single_ms = time_single_rows(detector, X, n_latency)
+    baseline_batch_ms = time_batch(detector, X)
+
+    logger.info("\n" + "=" * 100)
+    logger.info(
+        f"CASCADE EVALUATION ({len(X)} test rows, {args.first_model} first, {args.engine} engine)"
+    )
+    logger.info("=" * 100)
+    logger.info(
+        f"  {'band':>6} {'escalated':>10} {'agree':>8} {'accuracy':>9} {'precision':>10} "
+        f"{'recall':>8} {'f1':>8} {'auc':>8} {'1-row ms':>10} {'batch ms':>10}"
+    )
+    logger.info(
+        f"  {'full':>6} {1.0:>10.1%} {1.0:>8.2%} {baseline['accuracy']:>9.4f} "
+        f"{baseline['precision']:>10.4f} {baseline['recall']:>8.4f} {baseline['f1']:>8.4f} "
+        f"{baseline['auc_roc']:>8.4f} {baseline_single_ms:>10.3f} {baseline_batch_ms:>10.1f}"
+    )
+
+    for band in bands:
+        cascade = copy.copy(detector)
+        cascade.configure_cascade(band=band, first_model=args.first_model)
+
+        proba, paths = cascade.predict_proba(X, return_path=True)
+        metrics = score(y_test, proba)
+        escalated = float(np.mean(paths == 'ensemble'))
+        agreement = float(np.mean((proba >= 0.5) == (baseline_proba >= 0.5)))
+        single_ms = time_single_rows(cascade, X, n_latency)
+        batch_ms = time_batch(cascade, X)
+
+        logger.info(
+            f"  {band:>6.2f} {escalated:>10.1%} {agreement:>8.2%} {metrics['accuracy']:>9.4f} "
+            f"{metrics['precision']:>10.4f} {metrics['recall']:>8.4f} {metrics['f1']:>8.4f} "
+            f"{metrics['auc_roc']:>8.4f} {single_ms:>10.3f} {batch_ms:>10.1f}"
+        )
+
+    logger.info("\nescalated: rows that also ran the second model; "
+                "agree: labels identical to the full ensemble")
+
+
+if __name__ == "__main__":
+    main()
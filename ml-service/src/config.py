@@ -2,6 +2,9 @@
 from pydantic_settings import BaseSettings
 from pathlib import Path
 
+# Model versions become part of artifact file names, so they may not hold path separators or glob characters
+MODEL_VERSION_PATTERN = r"^[\w.-]{1,64}$"
+
 
 class Settings(BaseSettings):
     """Application settings."""
@@ -10,15 +13,80 @@ class Settings(BaseSettings):
     port: int = 3003
     host: str = "0.0.0.0"
     env: str = "development"
+    workers: int = 1  # Pre-fork workers started by `python -m src.prefork`
 
     # Model
     model_version: str = "1.0.0"
     model_path: str = "data/trained_models"
     retrain_interval_hours: int = 168
+    model_load_workers: int = 4  # Model artifacts deserialized concurrently
+    warmup_batches: int = 3  # Synthetic batches run through every model before /ready turns green, 0 to skip
+    warmup_batch_size: int = 64
+    warmup_explainer: bool = True  # Also build the SHAP explainer (imports shap) during warm-up
+
+    # Hot model reload (POST /admin/models/reload, or watching the model directory)
+    model_reload_poll_s: float = 0  # Check the serving version's files this often and reload on change, 0 disables
+    model_reload_drain_timeout_s: float = 60.0  # Longest wait for requests on a replaced version
+
+    # Shadow scoring of a candidate version on sampled live traffic
+    shadow_model_version: str = ""  # Empty disables
+    shadow_sample_rate: float = 0.1
+    shadow_queue_size: int = 1000  # Requests waiting to be re-scored before new ones are dropped
+    shadow_window: int = 10000  # Recent score deltas kept per kind for quantiles
+
+    # Per-chain (MODEL_PATH/<chain_id>/) and A/B (X-Model-Version) models, loaded on first use
+    chain_model_versions: str = ""  # e.g. "8453=1.1.0,84532=1.0.0"; other chains get MODEL_VERSION
+    allowed_model_versions: str = ""  # Further versions X-Model-Version may ask for, e.g. "1.1.0,1.2.0-rc1"
+    model_memory_budget_mb: float = 2048.0  # Models kept loaded per worker, serving models included
+
+    # Inference
+    max_batch_size: int = 1000
+    inference_engine: str = "native"  # native | compiled | onnx
+    compiled_engine_max_rows: int = 256
+    compiled_engine_mmap: bool = False  # Keep compiled tree arrays in a file memory-mapped by every worker
+    onnx_intra_op_threads: int = 1  # Threads one onnxruntime graph evaluation may use
+    onnx_inter_op_threads: int = 1
+    onnx_anomaly_max_rows: int = 256  # Larger inputs use the native Isolation Forest
+    stream_chunk_size: int = 256
+    stream_max_line_bytes: int = 65536
+    columnar_max_rows: int = 1000000
+    columnar_max_body_mb: float = 512.0  # Checked against Content-Length before the body is read
+
+    # Cascade inference (second model only for uncertain predictions)
+    enable_cascade: bool = False
+    cascade_first_model: str = "xgboost"  # xgboost | random_forest
+    cascade_band: float = 0.2
+
+    # Inference executor (keeps CPU-bound model calls off the event loop)
+    inference_workers: int = 4
+    inference_queue_depth: int = 64
+    loop_lag_interval_ms: float = 100.0
+
+    # Admission control in front of the interactive /api/predict routes
+    enable_admission_control: bool = True
+    admission_max_concurrent: int = 32  # Leaves room for request batching to coalesce
+    admission_max_queue: int = 64
+    admission_default_timeout_ms: float = 0.0  # Deadline when X-Request-Timeout-Ms is absent, 0 for none
+
+    # Degraded inference tiers (full ensemble -> XGBoost -> distilled tree) under load
+    enable_degraded_tiers: bool = True
+    tier_xgboost_pressure: float = 0.5  # Inference queue fill from which XGBoost alone is used
+    tier_fallback_pressure: float = 0.9  # ... and from which the fallback tree is used
+
+    # Run RF and XGBoost concurrently within one prediction
+    parallel_ensemble: bool = False
+    ensemble_member_workers: int = 4
+
+    # Request coalescing (micro-batching of concurrent /api/predict calls)
+    enable_request_batching: bool = True
+    batching_window_ms: float = 5.0
+    batching_max_size: int = 64
 
     # Feature Engineering
     basescan_api_key: str = ""
     enable_feature_caching: bool = True
+    cache_max_entries: int = 10000
+    cache_ttl_seconds: float = 300.0
 
     # Database
     database_url: str = "sqlite+aiosqlite:///data/training_data/ml_training.db"
@@ -26,12 +94,26 @@ class Settings(BaseSettings):
     # Redis
     redis_url: str = "redis://localhost:6379"
     enable_redis: bool = False
+    redis_lock_ttl_ms: int = 2000
 
     # External Services
     analysis_engine_url: str = "http://localhost:3002"
 
     # Logging
     log_level: str = "INFO"
+    log_queue_size: int = 10000
+    access_log_sample_rate: float = 0.1  # of fast, successful requests
+    access_log_slow_ms: float = 250.0
+
+    # Profiling (folded stacks for flamegraphs, served under /admin/profile)
+    enable_request_profiling: bool = False  # honor the X-Profile: 1 request header
+    request_profile_interval_ms: float = 1.0
+    request_profile_keep: int = 20
+    profile_dir: str = ""  # also write request profiles here when set
+    continuous_profiling: bool = False
+    continuous_profile_interval_ms: float = 20.0
+    continuous_profile_window_s: float = 300.0
+    admin_token: str = ""  # required as X-Admin-Token on /admin routes, which are disabled while unset
 
     # CORS
     allowed_origins: str = "http://localhost:3001,http://localhost:5173,http://localhost:5174"
@@ -54,6 +136,21 @@ class Settings(BaseSettings):
         """Parse allowed origins into a list."""
         return [origin.strip() for origin in self.allowed_origins.split(",")]
 
+    @property
+    def chain_model_versions_map(self) -> dict[int, str]:
+        """Parse per-chain model versions into a dict."""
+        versions = {}
+        for entry in self.chain_model_versions.split(","):
+            if entry.strip():
+                chain_id, _, version = entry.partition("=")
+                versions[int(chain_id.strip())] = version.strip()
+        return versions
+
+    @property
+    def allowed_model_versions_list(self) -> list[str]:
+        """Parse versions requests may ask for into a list."""
+        return [version.strip() for version in self.allowed_model_versions.split(",") if version.strip()]
+
     @property
     def model_dir(self) -> Path:
         """Get model directory as Path object."""
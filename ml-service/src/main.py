@@ -1,19 +1,47 @@
 """Main FastAPI application for ML fraud detection service."""
+import asyncio
+import atexit
 import logging
-from contextlib import asynccontextmanager
-from fastapi import FastAPI
+import time
+from contextlib import ExitStack, asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from src.config import settings
-from src.routes import predict, train, metrics
+from src.utils.startup import startup_report
 
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, settings.log_level),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Time the heavy imports; numpy and pandas are pulled in by the routes
+for _module in ("numpy", "pandas", "src.routes.predict"):
+    startup_report.import_module(_module)
+from src.routes import predict, train, metrics, admin
+from src.services.admission import AdmissionRejected
+from src.utils.access_log import AccessLogger, configure_logging, shutdown_logging
+from src.utils.metrics_registry import track_request_stages
+from src.utils.profiler import ProfileStore, StackSampler
+
+# Configure logging; records are written by background threads
+configure_logging(settings.log_level, queue_size=settings.log_queue_size)
+atexit.register(shutdown_logging)
 logger = logging.getLogger(__name__)
+access_logger = AccessLogger(
+    sample_rate=settings.access_log_sample_rate,
+    slow_ms=settings.access_log_slow_ms
+)
+
+
+async def _warm_up(model_manager) -> None:
+    """Warm the loaded models up in the background; /ready waits for it."""
+    try:
+        await asyncio.to_thread(
+            model_manager.warm_up,
+            batches=settings.warmup_batches,
+            batch_size=settings.warmup_batch_size,
+            explainer=settings.warmup_explainer
+        )
+        startup_report.mark('warmed_up')
+    except Exception as e:
+        logger.error(f"❌ Model warm-up failed: {e}", exc_info=True)
 
 
 @asynccontextmanager
@@ -24,21 +52,153 @@ async def lifespan(app: FastAPI):
     logger.info(f"Environment: {settings.env}")
     logger.info(f"Model version: {settings.model_version}")
 
+    # Model backends are needed to unpickle the models; shap is imported
+    # on the first explanation
+    for module in ("sklearn.ensemble", "xgboost", "src.utils.model_manager"):
+        startup_report.import_module(module)
+
+    from src.services.inference_executor import InferenceExecutor
+    from src.utils.loop_monitor import EventLoopLagMonitor
+    app.state.inference_executor = InferenceExecutor(
+        max_workers=settings.inference_workers,
+        max_queue_depth=settings.inference_queue_depth
+    )
+    app.state.loop_monitor = EventLoopLagMonitor(interval_ms=settings.loop_lag_interval_ms)
+    app.state.loop_monitor.start()
+
+    if settings.enable_admission_control:
+        from src.services.admission import AdmissionController
+        app.state.admission_controller = AdmissionController(
+            max_concurrent=settings.admission_max_concurrent,
+            max_queue=settings.admission_max_queue
+        )
+
+    if settings.enable_degraded_tiers:
+        from src.services.tiering import TierSelector
+        app.state.tier_selector = TierSelector(
+            xgboost_pressure=settings.tier_xgboost_pressure,
+            fallback_pressure=settings.tier_fallback_pressure
+        )
+
+    app.state.profile_store = ProfileStore(
+        keep=settings.request_profile_keep,
+        directory=settings.profile_dir or None
+    )
+    app.state.continuous_profiler = None
+    if settings.continuous_profiling:
+        app.state.continuous_profiler = StackSampler(
+            interval_ms=settings.continuous_profile_interval_ms,
+            window_s=settings.continuous_profile_window_s
+        )
+        app.state.continuous_profiler.start()
+        logger.info(f"Continuous profiling every {settings.continuous_profile_interval_ms}ms")
+
+    if settings.parallel_ensemble:
+        from src.services.member_pool import EnsembleMemberPool
+        app.state.member_pool = EnsembleMemberPool(max_workers=settings.ensemble_member_workers)
+
+    if settings.enable_feature_caching:
+        from src.services.cache import TTLCache
+        from src.services.prediction_cache import PredictionCache
+        redis_client = None
+        if settings.enable_redis:
+            try:
+                import redis.asyncio as aioredis
+                redis_client = aioredis.from_url(settings.redis_url)
+                logger.info(f"Shared prediction cache: {settings.redis_url}")
+            except ImportError:
+                logger.warning("⚠️ ENABLE_REDIS is set but redis is not installed, caching in process only")
+        app.state.prediction_cache = PredictionCache(
+            TTLCache(
+                max_entries=settings.cache_max_entries,
+                ttl_seconds=settings.cache_ttl_seconds
+            ),
+            redis=redis_client,
+            ttl_seconds=settings.cache_ttl_seconds,
+            lock_ttl_ms=settings.redis_lock_ttl_ms
+        )
+
     # Load models on startup
     try:
         from src.utils.model_manager import ModelManager
-        model_manager = ModelManager()
-        await model_manager.load_models()
+        model_manager = getattr(app.state, "preloaded_model_manager", None)
+        if model_manager is not None:
+            # Loaded by the pre-fork parent, shared with the other workers
+            model_manager.attach(
+                member_pool=getattr(app.state, "member_pool", None),
+                prediction_cache=getattr(app.state, "prediction_cache", None)
+            )
+        else:
+            model_manager = ModelManager(
+                member_pool=getattr(app.state, "member_pool", None),
+                prediction_cache=getattr(app.state, "prediction_cache", None)
+            )
+            await model_manager.load_models()
+            startup_report.mark('models_loaded')
         app.state.model_manager = model_manager
         logger.info("✅ Models loaded successfully")
+
+        # Serve /health while warming up, /ready turns green once done
+        if model_manager.is_ready() and not model_manager.warmed_up:
+            app.state.warmup_task = asyncio.create_task(_warm_up(model_manager))
+
+        if settings.enable_request_batching:
+            from src.services.batcher import PredictionBatcher
+            batcher = PredictionBatcher(
+                model_manager,
+                app.state.inference_executor,
+                window_ms=settings.batching_window_ms,
+                max_batch_size=settings.batching_max_size
+            )
+            batcher.start()
+            app.state.prediction_batcher = batcher
     except Exception as e:
         logger.warning(f"⚠️ Could not load models: {e}")
         logger.info("Service will use fallback until models are trained")
 
+    from src.services.model_registry import ModelRegistry
+    app.state.model_registry = ModelRegistry(
+        app.state,
+        memory_budget_mb=settings.model_memory_budget_mb,
+        chain_versions=settings.chain_model_versions_map,
+        allowed_versions=settings.allowed_model_versions_list,
+        drain_timeout_s=settings.model_reload_drain_timeout_s
+    )
+
+    from src.services.model_reloader import ModelReloader
+    app.state.model_reloader = ModelReloader(app.state, drain_timeout_s=settings.model_reload_drain_timeout_s)
+    if settings.model_reload_poll_s > 0:
+        app.state.model_reloader.start_watching(settings.model_reload_poll_s)
+        logger.info(f"Watching {settings.model_dir} for new models every {settings.model_reload_poll_s}s")
+
+    startup_report.mark('ready')
+    startup_report.log()
+
     yield
 
     # Shutdown
     logger.info("🛑 ML Service shutting down...")
+    warmup_task = getattr(app.state, "warmup_task", None)
+    if warmup_task is not None:
+        warmup_task.cancel()
+    await app.state.model_reloader.stop()
+    await app.state.model_registry.stop()
+    model_manager = getattr(app.state, "model_manager", None)
+    if model_manager is not None:
+        model_manager.stop_shadow()
+    batcher = getattr(app.state, "prediction_batcher", None)
+    if batcher:
+        await batcher.stop()
+    await app.state.loop_monitor.stop()
+    if app.state.continuous_profiler is not None:
+        app.state.continuous_profiler.stop()
+    app.state.inference_executor.shutdown()
+    member_pool = getattr(app.state, "member_pool", None)
+    if member_pool:
+        member_pool.shutdown()
+    prediction_cache = getattr(app.state, "prediction_cache", None)
+    if prediction_cache is not None:
+        await prediction_cache.close()
 
 
 # Create FastAPI app
@@ -48,6 +208,7 @@ app = FastAPI(
     version=settings.model_version,
     lifespan=lifespan
 )
+app.state.access_logger = access_logger
 
 # CORS middleware
 app.add_middleware(
@@ -59,12 +220,122 @@ app.add_middleware(
 )
 
 
+# Bulk routes pace themselves against the inference executor instead
+_UNADMITTED_ROUTES = ("/api/predict/stream", "/api/predict/columnar")
+
+
+def _request_deadline(request, arrived: float):
+    """Deadline from the caller's X-Request-Timeout-Ms budget, or the default."""
+    timeout_ms = settings.admission_default_timeout_ms
+    header = request.headers.get("x-request-timeout-ms")
+    if header:
+        try:
+            timeout_ms = float(header)
+        except ValueError:
+            pass
+    return arrived + timeout_ms / 1000 if timeout_ms > 0 else None
+
+
+# Model pinning middleware
+@app.middleware("http")
+async def pin_models(request, call_next):
+    """Serve each prediction from the models that were current when it was admitted."""
+    model_manager = getattr(request.app.state, "model_manager", None)
+    if model_manager is None or not request.url.path.startswith("/api/predict"):
+        return await call_next(request)
+
+    # A reload releases the replaced models once no request holds a lease;
+    # streamed bodies keep their own references to the models. Routes
+    # served by other models from the registry add their leases here.
+    request.state.model_manager = model_manager
+    with ExitStack() as leases:
+        leases.enter_context(model_manager.lease())
+        request.state.model_leases = leases
+        return await call_next(request)
+
+
+# Admission control middleware
+@app.middleware("http")
+async def admission_control(request, call_next):
+    """Limit concurrent predictions and shed those that cannot finish in time."""
+    path = request.url.path
+    if not path.startswith("/api/predict") or path.rstrip("/") in _UNADMITTED_ROUTES:
+        return await call_next(request)
+
+    # Routes read the deadline to pick an inference tier
+    deadline = _request_deadline(request, time.monotonic())
+    request.state.deadline = deadline
+
+    controller = getattr(request.app.state, "admission_controller", None)
+    if controller is None:
+        return await call_next(request)
+
+    # Routes that can fall back to a cheaper tier are only shed if even that is too slow
+    tier_selector = getattr(request.app.state, "tier_selector", None)
+    min_service_s = tier_selector.min_cost_s(path) if tier_selector is not None else None
+    try:
+        async with controller.admit(path, deadline, min_service_s):
+            return await call_next(request)
+    except AdmissionRejected as e:
+        return JSONResponse(
+            status_code=503,
+            content={"detail": str(e)},
+            headers={"Retry-After": str(e.retry_after_s)}
+        )
+
+
 # Request logging middleware
 @app.middleware("http")
 async def log_requests(request, call_next):
-    """Log all requests."""
-    logger.info(f"{request.method} {request.url.path}")
-    response = await call_next(request)
+    """Log errors, slow requests and a sample of the rest, with stage timings."""
+    started = time.perf_counter()
+    stages = track_request_stages()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        access_logger.log(
+            request.method,
+            request.url.path,
+            status,
+            (time.perf_counter() - started) * 1000,
+            stages,
+            client=request.client.host if request.client else None,
+            request_id=request.headers.get("x-request-id")
+        )
+
+
+# Per-request profiling middleware
+@app.middleware("http")
+async def profile_requests(request, call_next):
+    """Sample stacks while a request runs if asked via header or admin toggle."""
+    store = getattr(request.app.state, "profile_store", None)
+    if store is None:
+        return await call_next(request)
+
+    requested = settings.enable_request_profiling and request.headers.get("x-profile") == "1"
+    if not requested and not store.take_armed():
+        return await call_next(request)
+
+    # One bucket holding the whole request; samples every thread, so
+    # concurrent requests show up as well
+    sampler = StackSampler(
+        interval_ms=settings.request_profile_interval_ms,
+        window_s=3600.0,
+        bucket_s=3600.0
+    )
+    started = time.perf_counter()
+    sampler.start()
+    try:
+        response = await call_next(request)
+    finally:
+        sampler.stop()
+    duration_ms = (time.perf_counter() - started) * 1000
+
+    profile_id = store.add(request.method, request.url.path, duration_ms, sampler.counts())
+    response.headers["X-Profile-Id"] = profile_id
     return response
 
 
@@ -80,10 +351,28 @@ async def health_check():
     }
 
 
+@app.get("/ready")
+async def readiness_check(request: Request):
+    """
+    Readiness check: 200 once models are loaded and warmed up, 503 before.
+
+    Liveness stays on /health; point load balancers and readiness probes here.
+    """
+    model_manager = getattr(request.app.state, "model_manager", None)
+    if model_manager is None:
+        readiness = {"ready": False, "models_loaded": False, "warmed_up": False}
+    else:
+        readiness = model_manager.get_readiness()
+    readiness["startup_s"] = startup_report.get_report()["phases_s"]
+    return JSONResponse(status_code=200 if readiness["ready"] else 503, content=readiness)
+
+
 # Include routers
 app.include_router(predict.router, prefix="/api/predict", tags=["Prediction"])
 app.include_router(train.router, prefix="/api/train", tags=["Training"])
 app.include_router(metrics.router, prefix="/api/metrics", tags=["Metrics"])
+app.add_api_route("/metrics", metrics.prometheus_metrics, methods=["GET"], include_in_schema=False)
+app.include_router(admin.router, prefix="/admin", tags=["Admin"])
 
 
 # Error handlers
@@ -100,6 +389,9 @@ async def global_exception_handler(request, exc):
     )
 
 
+startup_report.mark('app_imported')
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -108,5 +400,6 @@ if __name__ == "__main__":
         host=settings.host,
         port=settings.port,
         reload=settings.env == "development",
-        log_level=settings.log_level.lower()
+        log_level=settings.log_level.lower(),
+        access_log=False  # replaced by the sampled JSON access log
     )
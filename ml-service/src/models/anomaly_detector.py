@@ -1,15 +1,21 @@
 """Anomaly detection using Isolation Forest."""
 import logging
+import threading
+import time
 import joblib
 import numpy as np
 import pandas as pd
+from operator import itemgetter
 from pathlib import Path
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, Tuple, Mapping, Sequence, Union
 from datetime import datetime
 
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
 
+from src.utils.metrics_registry import observe_stage, time_stage
+from src.utils.startup import load_artifacts, strip_feature_names
+
 logger = logging.getLogger(__name__)
 
 
@@ -35,10 +41,74 @@ class AnomalyDetector:
         self.model: Optional[IsolationForest] = None
         self.scaler: Optional[StandardScaler] = None
 
+        # onnxruntime backend for the scaler + model pipeline, see load_onnx()
+        self.onnx_pipeline = None
+        self.onnx_max_rows: int = 256
+
         self.feature_names: list[str] = []
         self.training_date: Optional[datetime] = None
         self.threshold: float = 0.0
 
+        # Feature layout, compiled from feature_names once models are available
+        self.feature_index: Dict[str, int] = {}
+        self._get_features: Optional[itemgetter] = None
+        self._buffers = threading.local()
+
+    def compile_feature_layout(self) -> None:
+        """
+        Precompute how request features map onto model input columns.
+
+        Must be called whenever feature_names changes.
+        """
+        self.feature_index = {name: i for i, name in enumerate(self.feature_names)}
+        self._get_features = itemgetter(*self.feature_names) if self.feature_names else None
+        self._buffers = threading.local()
+
+    def vectorize(self, records: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        """
+        Write feature dicts straight into a model input matrix.
+
+        The matrix is float64 because features are standardized before the
+        Isolation Forest sees them; scaling float32 inputs shifts scores.
+        A single record reuses a per-thread buffer, so the result is only
+        valid until the next call on the same thread.
+
+        Args:
+            records: Feature dicts containing every name in feature_names
+
+        Returns:
+            Contiguous float64 array of shape (len(records), n_features)
+        """
+        if self._get_features is None:
+            raise ValueError("Feature layout not compiled. Call train() or load() first.")
+
+        started = time.perf_counter()
+        if len(records) == 1:
+            X = getattr(self._buffers, 'row', None)
+            if X is None:
+                X = np.empty((1, len(self.feature_names)), dtype=np.float64)
+                self._buffers.row = X
+        else:
+            X = np.empty((len(records), len(self.feature_names)), dtype=np.float64)
+
+        for i, record in enumerate(records):
+            X[i] = self._get_features(record)
+
+        observe_stage('feature_layout', started)
+        return X
+
+    def _as_matrix(self, X: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+        """Convert input to a float64 matrix in feature_names order."""
+        if isinstance(X, pd.DataFrame):
+            # Ensure features match
+            return X[self.feature_names].to_numpy(dtype=np.float64)
+
+        if X.ndim != 2 or X.shape[1] != len(self.feature_names):
+            raise ValueError(
+                f"Expected array of shape (n, {len(self.feature_names)}), got {X.shape}"
+            )
+        return np.asarray(X, dtype=np.float64)
+
     def train(
         self,
         X_train: pd.DataFrame,
@@ -58,10 +128,13 @@ class AnomalyDetector:
 
         self.feature_names = list(X_train.columns)
         self.training_date = datetime.now()
+        self.compile_feature_layout()
+        self.onnx_pipeline = None
 
         # Fit scaler
         self.scaler = StandardScaler()
         X_scaled = self.scaler.fit_transform(X_train)
+        strip_feature_names(self.scaler)
 
         # Default parameters
         params = {
@@ -90,31 +163,76 @@ class AnomalyDetector:
 
     def predict(
         self,
-        X: pd.DataFrame
+        X: Union[pd.DataFrame, np.ndarray]
     ) -> Tuple[np.ndarray, np.ndarray]:
         """
         Predict anomalies.
 
         Args:
-            X: Features
+            X: Features, as a DataFrame or an array from vectorize()
 
         Returns:
             Tuple of (predictions, anomaly_scores)
             predictions: -1 for anomalies, 1 for normal
             anomaly_scores: Higher score = more anomalous
         """
+        predictions, anomaly_scores, _ = self.score(X)
+        return predictions, anomaly_scores
+
+    def score(self, X: Union[pd.DataFrame, np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Scale features and predict anomalies, on onnxruntime if loaded and
+        X has at most onnx_max_rows rows.
+
+        Args:
+            X: Features, as a DataFrame or an array from vectorize()
+
+        Returns:
+            Tuple of (predictions, anomaly_scores, scaled features), the
+            scaled features reusable by explain_anomaly
+        """
+        if self.onnx_pipeline is None or len(X) > self.onnx_max_rows:
+            X_scaled = self.scale(X)
+            return (*self.predict_scaled(X_scaled), X_scaled)
+
         if self.model is None or self.scaler is None:
             raise ValueError("Model not trained. Call train() first.")
+        X = self._as_matrix(X)
+        with time_stage('isolation_forest'):
+            predictions, scores, X_scaled = self.onnx_pipeline.run(X)
+        return predictions, -scores, X_scaled
 
-        # Ensure features match
-        X = X[self.feature_names]
+    def scale(self, X: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+        """
+        Standardize features for the Isolation Forest.
 
-        # Scale features
-        X_scaled = self.scaler.transform(X)
+        Args:
+            X: Features, as a DataFrame or an array from vectorize()
 
-        # Predict
-        predictions = self.model.predict(X_scaled)  # -1 or 1
-        scores = self.model.score_samples(X_scaled)  # Anomaly scores
+        Returns:
+            Scaled float64 array, reusable by predict_scaled and explain_anomaly
+        """
+        if self.model is None or self.scaler is None:
+            raise ValueError("Model not trained. Call train() first.")
+
+        with time_stage('scaling'):
+            return self.scaler.transform(self._as_matrix(X))
+
+    def predict_scaled(self, X_scaled: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Predict anomalies from already scaled features.
+
+        Args:
+            X_scaled: Output of scale()
+
+        Returns:
+            Same as predict
+        """
+        with time_stage('isolation_forest'):
+            scores = self.model.score_samples(X_scaled)  # Anomaly scores
+
+        # Same rule as IsolationForest.predict, without walking the trees twice
+        predictions = np.where(scores - self.model.offset_ < 0, -1, 1)  # -1 or 1
 
         # Convert scores: lower score = more anomalous
         # Invert so higher score = more anomalous
@@ -150,15 +268,17 @@ class AnomalyDetector:
 
     def explain_anomaly(
         self,
-        X: pd.DataFrame,
-        feature_threshold: float = 2.0
+        X: Union[pd.DataFrame, np.ndarray],
+        feature_threshold: float = 2.0,
+        X_scaled: Optional[np.ndarray] = None
     ) -> list[Dict[str, Any]]:
         """
         Explain why samples are anomalous.
 
         Args:
-            X: Features
+            X: Features, as a DataFrame or an array from vectorize()
             feature_threshold: Z-score threshold for unusual features
+            X_scaled: Output of scale() for X, to avoid scaling again
 
         Returns:
             List of anomaly explanations
@@ -166,8 +286,11 @@ class AnomalyDetector:
         if self.scaler is None:
             raise ValueError("Model not trained")
 
+        X = self._as_matrix(X)
+
         # Calculate z-scores for each feature
-        X_scaled = self.scaler.transform(X[self.feature_names])
+        if X_scaled is None:
+            X_scaled = self.scaler.transform(X)
 
         explanations = []
         for i in range(len(X)):
@@ -180,7 +303,7 @@ class AnomalyDetector:
                     unusual_features.append({
                         'feature': feature_name,
                         'z_score': float(z_score),
-                        'value': float(X.iloc[i][feature_name]),
+                        'value': float(X[i, j]),
                         'reason': f"{feature_name} is {z_score:.2f} standard deviations from normal"
                     })
 
@@ -226,33 +349,122 @@ class AnomalyDetector:
         joblib.dump(metadata, metadata_path)
         logger.info(f"Saved metadata to {metadata_path}")
 
-    def load(self, version: str = "1.0.0") -> None:
+    def export_onnx(self, version: str = "1.0.0") -> Path:
+        """
+        Export the scaler and Isolation Forest as one ONNX graph next to the joblib model.
+
+        Args:
+            version: Model version string
+
+        Returns:
+            Written path
+
+        Raises:
+            ImportError: If skl2onnx is not installed
+        """
+        from src.models.onnx_backend import export_anomaly_pipeline
+
+        if self.model is None or self.scaler is None:
+            raise ValueError("Model not trained. Call train() first.")
+        return export_anomaly_pipeline(self.scaler, self.model, len(self.feature_names), self.model_dir, version)
+
+    def load_onnx(
+        self,
+        version: str = "1.0.0",
+        intra_op_threads: int = 1,
+        inter_op_threads: int = 1,
+        tolerance: float = 1e-5,
+        max_rows: int = 256
+    ) -> bool:
+        """
+        Run the scaler and Isolation Forest on onnxruntime.
+
+        A graph missing or no longer matching the model is exported again first.
+
+        Args:
+            version: Model version string
+            intra_op_threads: Threads one graph evaluation may use
+            inter_op_threads: Threads for running independent graph nodes
+            tolerance: Largest accepted score difference to the native
+                model on probe rows
+            max_rows: Largest input scored on onnxruntime; sklearn is
+                faster on larger batches
+
+        Returns:
+            True if the backend is in use, False if inference stays native
+        """
+        if self.model is None or self.scaler is None:
+            raise ValueError("Model not trained. Call train() first.")
+
+        try:
+            from src.models.onnx_backend import OnnxAnomalyPipeline
+        except ImportError as e:
+            logger.warning(f"onnxruntime backend unavailable, using native anomaly detection: {e}")
+            return False
+
+        probe = OnnxAnomalyPipeline.probe_matrix(self.scaler, self.model, len(self.feature_names))
+        pipeline = None
+        try:
+            pipeline = OnnxAnomalyPipeline.load(
+                self.model_dir, version, self.model.offset_, intra_op_threads, inter_op_threads
+            )
+            if not pipeline.verify(self.scaler, self.model, probe, tolerance):
+                pipeline = None
+        except FileNotFoundError:
+            pass
+        except ImportError as e:
+            logger.warning(f"onnxruntime backend unavailable, using native anomaly detection: {e}")
+            return False
+
+        if pipeline is None:
+            try:
+                self.export_onnx(version)
+                pipeline = OnnxAnomalyPipeline.load(
+                    self.model_dir, version, self.model.offset_, intra_op_threads, inter_op_threads
+                )
+            except (ImportError, OSError) as e:
+                logger.warning(f"Cannot export anomaly pipeline to ONNX, using native anomaly detection: {e}")
+                return False
+            if not pipeline.verify(self.scaler, self.model, probe, tolerance):
+                logger.warning("ONNX anomaly pipeline failed verification, using native anomaly detection")
+                return False
+
+        self.onnx_pipeline = pipeline
+        self.onnx_max_rows = max_rows
+        logger.info(f"onnxruntime anomaly backend enabled for up to {max_rows} rows")
+        return True
+
+    def load(self, version: str = "1.0.0", max_workers: int = 1) -> None:
         """
         Load model from disk.
 
         Args:
             version: Model version string
+            max_workers: Artifacts deserialized concurrently
         """
         logger.info(f"Loading Isolation Forest version {version}...")
 
-        # Load model
         model_path = self.model_dir / f"isolation_forest_v{version}.joblib"
         if not model_path.exists():
             raise FileNotFoundError(f"Model not found: {model_path}")
-        self.model = joblib.load(model_path)
-        logger.info(f"Loaded model from {model_path}")
-
-        # Load scaler
         scaler_path = self.model_dir / f"anomaly_scaler_v{version}.joblib"
         if not scaler_path.exists():
             raise FileNotFoundError(f"Scaler not found: {scaler_path}")
-        self.scaler = joblib.load(scaler_path)
-        logger.info(f"Loaded scaler from {scaler_path}")
-
-        # Load metadata
+        paths = {'model': model_path, 'scaler': scaler_path}
         metadata_path = self.model_dir / f"anomaly_metadata_v{version}.joblib"
         if metadata_path.exists():
-            metadata = joblib.load(metadata_path)
+            paths['metadata'] = metadata_path
+
+        artifacts = load_artifacts(paths, max_workers=max_workers)
+        self.onnx_pipeline = None
+        self.model = artifacts['model']
+        self.scaler = artifacts['scaler']
+        # Artifacts trained before the names were stripped at fit time
+        strip_feature_names(self.scaler, self.model)
+        logger.info(f"Loaded {', '.join(path.name for path in paths.values())} from {self.model_dir}")
+
+        if 'metadata' in artifacts:
+            metadata = artifacts['metadata']
             self.feature_names = metadata.get('feature_names', [])
             self.contamination = metadata.get('contamination', 0.1)
             self.threshold = metadata.get('threshold', 0.0)
@@ -260,4 +472,6 @@ class AnomalyDetector:
             self.training_date = datetime.fromisoformat(training_date_str) if training_date_str else None
             logger.info(f"Loaded metadata from {metadata_path}")
 
+        self.compile_feature_layout()
+
         logger.info("Isolation Forest loaded successfully")
@@ -0,0 +1,200 @@
+"""Smaller serving models derived from a trained ensemble.
+
+Three ways to trade accuracy for latency and size without retraining the
+ensemble on labels:
+
+- tree subsets: keep the random forest trees whose average best matches
+  the full forest, chosen greedily so every prefix is a usable subset
+- depth caps: cut every random forest tree at a depth, internal nodes
+  becoming leaves with the class fractions they already hold; boosting
+  rounds are cut instead for XGBoost, whose internal nodes have no output
+- distillation: fit one compact student to the ensemble probabilities
+
+See derive_compact_models.py for the latency/accuracy report built on these.
+"""
+import copy
+import logging
+from typing import List, Optional, Union
+
+import numpy as np
+import xgboost as xgb
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeRegressor
+from sklearn.tree._tree import TREE_LEAF, TREE_UNDEFINED, Tree
+
+logger = logging.getLogger(__name__)
+
+
+def rank_trees(rf_model: RandomForestClassifier, X: np.ndarray, max_rows: int = 5000, seed: int = 0) -> np.ndarray:
+    """
+    Order random forest trees by greedy forward selection.
+
+    Each step adds the tree that brings the average of the selected trees
+    closest (mean squared error) to the full forest's probability, so the
+    first n indices are the chosen n-tree subset for every n.
+
+    Args:
+        rf_model: Fitted RandomForestClassifier
+        X: Unlabeled rows to match the forest on, e.g. the training set
+        max_rows: Rows sampled from X at most
+        seed: Sampling seed
+
+    Returns:
+        Tree indices, best first
+    """
+    if len(X) > max_rows:
+        X = X[np.random.default_rng(seed).choice(len(X), max_rows, replace=False)]
+    per_tree = np.column_stack([estimator.predict_proba(X)[:, 1] for estimator in rf_model.estimators_])
+    target = per_tree.mean(axis=1)
+
+    n_trees = per_tree.shape[1]
+    order: List[int] = []
+    remaining = np.ones(n_trees, dtype=bool)
+    selected_sum = np.zeros(len(X))
+    for k in range(1, n_trees + 1):
+        errors = (((selected_sum[:, None] + per_tree) / k - target[:, None]) ** 2).mean(axis=0)
+        errors[~remaining] = np.inf
+        best = int(np.argmin(errors))
+        order.append(best)
+        remaining[best] = False
+        selected_sum += per_tree[:, best]
+    return np.array(order)
+
+
+def subset_forest(rf_model: RandomForestClassifier, indices: np.ndarray) -> RandomForestClassifier:
+    """
+    Copy a random forest keeping only some of its trees.
+
+    Args:
+        rf_model: Fitted RandomForestClassifier
+        indices: Trees to keep
+
+    Returns:
+        Forest sharing the kept trees with rf_model
+    """
+    forest = copy.copy(rf_model)
+    forest.estimators_ = [rf_model.estimators_[i] for i in indices]
+    forest.n_estimators = len(forest.estimators_)
+    return forest
+
+
+def _cap_tree(tree: Tree, max_depth: int) -> Tree:
+    """Rebuild a fitted tree with nodes below max_depth removed."""
+    state = tree.__getstate__()
+    nodes, values = state['nodes'], state['values']
+
+    # Breadth-first renumbering keeps parents before children
+    keep = [0]
+    depth = {0: 0}
+    new_index = {0: 0}
+    for node in keep:
+        if depth[node] >= max_depth or nodes['left_child'][node] == TREE_LEAF:
+            continue
+        for child in (nodes['left_child'][node], nodes['right_child'][node]):
+            depth[child] = depth[node] + 1
+            new_index[child] = len(keep)
+            keep.append(child)
+
+    new_nodes = nodes[keep].copy()
+    for i, node in enumerate(keep):
+        if depth[node] >= max_depth or nodes['left_child'][node] == TREE_LEAF:
+            new_nodes['left_child'][i] = TREE_LEAF
+            new_nodes['right_child'][i] = TREE_LEAF
+            new_nodes['feature'][i] = TREE_UNDEFINED
+            new_nodes['threshold'][i] = TREE_UNDEFINED
+        else:
+            new_nodes['left_child'][i] = new_index[nodes['left_child'][node]]
+            new_nodes['right_child'][i] = new_index[nodes['right_child'][node]]
+
+    capped = Tree(tree.n_features, np.array(tree.n_classes, dtype=np.intp), tree.n_outputs)
+    capped.__setstate__({
+        'max_depth': min(tree.max_depth, max_depth),
+        'node_count': len(keep),
+        'nodes': new_nodes,
+        'values': values[keep].copy()
+    })
+    return capped
+
+
+def cap_forest_depth(rf_model: RandomForestClassifier, max_depth: int) -> RandomForestClassifier:
+    """
+    Copy a random forest with every tree cut at a depth.
+
+    Nodes at max_depth become leaves predicting the class fractions of the
+    training samples that reached them, as if the tree had been grown to
+    that depth.
+
+    Args:
+        rf_model: Fitted RandomForestClassifier
+        max_depth: Depth of the deepest kept split plus one
+
+    Returns:
+        Forest of new, shallower trees
+    """
+    forest = copy.copy(rf_model)
+    forest.estimators_ = []
+    for estimator in rf_model.estimators_:
+        capped = copy.copy(estimator)
+        capped.tree_ = _cap_tree(estimator.tree_, max_depth)
+        capped.max_depth = capped.tree_.max_depth
+        forest.estimators_.append(capped)
+    forest.max_depth = max_depth if rf_model.max_depth is None else min(rf_model.max_depth, max_depth)
+    return forest
+
+
+def truncate_boosting(xgb_model: xgb.XGBClassifier, n_rounds: int) -> xgb.XGBClassifier:
+    """
+    Copy an XGBoost model keeping its first boosting rounds.
+
+    Args:
+        xgb_model: Fitted XGBClassifier
+        n_rounds: Rounds to keep
+
+    Returns:
+        Model predicting like xgb_model with iteration_range=(0, n_rounds)
+    """
+    model = copy.deepcopy(xgb_model)
+    model._Booster = xgb_model.get_booster()[:n_rounds]
+    model.n_estimators = n_rounds
+    return model
+
+
+def distill_student(
+    X: np.ndarray,
+    teacher_proba: np.ndarray,
+    max_depth: int = 6,
+    n_estimators: int = 1
+) -> Union[DecisionTreeRegressor, xgb.XGBRegressor]:
+    """
+    Fit a compact regressor to an ensemble's fraud probabilities.
+
+    Args:
+        X: Unlabeled features to distill on, typically the training set
+        teacher_proba: Ensemble probabilities for X
+        max_depth: Depth of the student's trees
+        n_estimators: 1 for a single regression tree, else boosting rounds
+            of an XGBoost student with a logistic output
+
+    Returns:
+        Student whose predict() returns fraud probabilities
+    """
+    if n_estimators == 1:
+        student = DecisionTreeRegressor(max_depth=max_depth, random_state=42)
+    else:
+        student = xgb.XGBRegressor(
+            n_estimators=n_estimators,
+            max_depth=max_depth,
+            learning_rate=0.1,
+            objective='reg:logistic',
+            random_state=42,
+            n_jobs=1
+        )
+    student.fit(X, teacher_proba)
+    return student
+
+
+def forest_depth(rf_model: RandomForestClassifier) -> Optional[int]:
+    """Depth of the deepest tree in a fitted forest."""
+    if not rf_model.estimators_:
+        return None
+    return max(estimator.tree_.max_depth for estimator in rf_model.estimators_)
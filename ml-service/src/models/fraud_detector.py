@@ -1,13 +1,19 @@
 """Fraud detection models using Random Forest and XGBoost."""
+import copy
+import functools
 import logging
+import threading
+import time
 import joblib
 import numpy as np
 import pandas as pd
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, Tuple, Optional, Any
+from typing import Dict, Tuple, Optional, Any, Mapping, Sequence, Union
 from datetime import datetime
 
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeRegressor
 from sklearn.metrics import (
     accuracy_score, precision_score, recall_score,
     f1_score, roc_auc_score, confusion_matrix,
@@ -15,8 +21,16 @@ from sklearn.metrics import (
 )
 import xgboost as xgb
 
+from src.models.compaction import distill_student
+from src.models.tree_engine import CompiledEnsemble
+from src.utils.metrics_registry import observe_stage, time_stage
+from src.utils.startup import load_artifacts, strip_feature_names
+
 logger = logging.getLogger(__name__)
 
+# Inference tiers from most to least accurate, see predict_proba()
+TIERS = ('full', 'xgboost', 'fallback')
+
 
 class FraudDetector:
     """Ensemble fraud detection model using Random Forest and XGBoost."""
@@ -40,10 +54,406 @@ class FraudDetector:
         self.rf_model: Optional[RandomForestClassifier] = None
         self.xgb_model: Optional[xgb.XGBClassifier] = None
 
+        # Shallow tree distilled from the ensemble, the cheapest degraded tier
+        # (or a student from derive_compact_models.py, anything with predict())
+        self.fallback_model: Optional[DecisionTreeRegressor] = None
+
         self.feature_names: list[str] = []
         self.metrics: Dict[str, Any] = {}
         self.training_date: Optional[datetime] = None
 
+        # Array-backed engine for the ensemble, see compile_engine()
+        self.compiled_engine: Optional[CompiledEnsemble] = None
+        self.compiled_max_rows: int = 256
+
+        # onnxruntime backend for the ensemble members, see load_onnx()
+        self.onnx_engine = None
+
+        # Shared pool running ensemble members concurrently, set by ModelManager
+        self.member_pool = None
+
+        # Confidence-gated cascade, see configure_cascade()
+        self.cascade_band: Optional[float] = None
+        self.cascade_first_model: str = "xgboost"
+        self.cascade_threshold: float = 0.5
+        self.path_counts: Dict[str, int] = {}
+        self._path_lock = threading.Lock()
+
+        # Feature layout, compiled from feature_names once models are available
+        self.feature_index: Dict[str, int] = {}
+        self._get_features: Optional[itemgetter] = None
+        self._buffers = threading.local()
+
+    def compile_feature_layout(self) -> None:
+        """
+        Precompute how request features map onto model input columns.
+
+        Must be called whenever feature_names changes.
+        """
+        self.feature_index = {name: i for i, name in enumerate(self.feature_names)}
+        self._get_features = itemgetter(*self.feature_names) if self.feature_names else None
+        self._buffers = threading.local()
+
+    def _row_buffer(self) -> np.ndarray:
+        """Get this thread's reusable single-row input buffer."""
+        buffer = getattr(self._buffers, 'row', None)
+        if buffer is None:
+            buffer = np.empty((1, len(self.feature_names)), dtype=np.float32)
+            self._buffers.row = buffer
+        return buffer
+
+    def vectorize(self, records: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        """
+        Write feature dicts straight into a float32 model input matrix.
+
+        A single record reuses a per-thread buffer, so the result is only
+        valid until the next call on the same thread.
+
+        Args:
+            records: Feature dicts containing every name in feature_names
+
+        Returns:
+            Contiguous float32 array of shape (len(records), n_features)
+        """
+        if self._get_features is None:
+            raise ValueError("Feature layout not compiled. Call train() or load() first.")
+
+        started = time.perf_counter()
+        if len(records) == 1:
+            X = self._row_buffer()
+        else:
+            X = np.empty((len(records), len(self.feature_names)), dtype=np.float32)
+
+        for i, record in enumerate(records):
+            X[i] = self._get_features(record)
+
+        observe_stage('feature_layout', started)
+        return X
+
+    def _as_matrix(self, X: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+        """Convert input to a float32 matrix in feature_names order."""
+        if isinstance(X, pd.DataFrame):
+            # Ensure features match training
+            return X[self.feature_names].to_numpy(dtype=np.float32)
+
+        if X.ndim != 2 or X.shape[1] != len(self.feature_names):
+            raise ValueError(
+                f"Expected array of shape (n, {len(self.feature_names)}), got {X.shape}"
+            )
+        return np.asarray(X, dtype=np.float32)
+
+    def _verify_engine(self, engine: CompiledEnsemble) -> bool:
+        """Check a compiled engine is bit-compatible with the native models."""
+        # Compare against sequential RF accumulation; with n_jobs > 1
+        # sklearn's own result depends on thread completion order
+        rf_sequential = copy.copy(self.rf_model)
+        rf_sequential.n_jobs = 1
+        rf_sequential.verbose = 0
+        probe = engine.probe_matrix(len(self.feature_names))
+        return engine.verify(rf_sequential, self.xgb_model, probe)
+
+    def compile_engine(
+        self,
+        verify: bool = True,
+        max_rows: int = 256,
+        cache_path: Optional[Path] = None
+    ) -> bool:
+        """
+        Export RF and XGBoost into the compiled tree engine.
+
+        Once compiled, predict_proba evaluates the ensemble with the engine
+        instead of calling sklearn and XGBoost. Larger inputs stay on the
+        native models, whose C loops win once per-call overhead is amortized.
+
+        Args:
+            verify: Check bit-compatibility with the native models first
+            max_rows: Largest input evaluated with the engine
+            cache_path: File holding the compiled arrays. They are
+                memory-mapped from it, so workers on one host share a
+                single copy; it is (re)written when missing or stale.
+
+        Returns:
+            True if the engine is in use, False if inference stays native
+        """
+        if self.rf_model is None or self.xgb_model is None:
+            raise ValueError("Models not trained. Call train() first.")
+
+        engine = None
+        if cache_path is not None and cache_path.exists():
+            try:
+                engine = CompiledEnsemble.load(cache_path)
+            except Exception as e:
+                logger.warning(f"Could not map compiled engine {cache_path}: {e}")
+            # A cached engine from models since retrained must not be used
+            if engine is not None and not self._verify_engine(engine):
+                logger.warning(f"Compiled engine {cache_path} does not match the models, recompiling")
+                engine = None
+
+        if engine is None:
+            try:
+                engine = CompiledEnsemble.from_models(self.rf_model, self.xgb_model)
+            except NotImplementedError as e:
+                logger.warning(f"Cannot compile ensemble, using native inference: {e}")
+                return False
+
+            if verify and not self._verify_engine(engine):
+                logger.warning("Compiled ensemble failed verification, using native inference")
+                return False
+
+            if cache_path is not None:
+                try:
+                    engine.save(cache_path)
+                    engine = CompiledEnsemble.load(cache_path)
+                except OSError as e:
+                    logger.warning(f"Could not write compiled engine {cache_path}: {e}")
+
+        self.compiled_engine = engine
+        self.compiled_max_rows = max_rows
+        logger.info(f"Compiled tree engine enabled for up to {max_rows} rows")
+        return True
+
+    def export_onnx(self, version: str = "1.0.0") -> Dict[str, Path]:
+        """
+        Export RF and XGBoost to ONNX graphs next to the joblib models.
+
+        Args:
+            version: Model version string
+
+        Returns:
+            Written paths keyed by member
+
+        Raises:
+            ImportError: If skl2onnx or onnxmltools is not installed
+        """
+        from src.models.onnx_backend import export_fraud_models
+
+        if self.rf_model is None or self.xgb_model is None:
+            raise ValueError("Models not trained. Call train() first.")
+        return export_fraud_models(self.rf_model, self.xgb_model, len(self.feature_names), self.model_dir, version)
+
+    def load_onnx(
+        self,
+        version: str = "1.0.0",
+        intra_op_threads: int = 1,
+        inter_op_threads: int = 1,
+        tolerance: float = 1e-5
+    ) -> bool:
+        """
+        Run the ensemble members on onnxruntime.
+
+        Graphs missing or no longer matching the models (e.g. after
+        retraining) are exported again first.
+
+        Args:
+            version: Model version string
+            intra_op_threads: Threads one graph evaluation may use
+            inter_op_threads: Threads for running independent graph nodes
+            tolerance: Largest accepted probability difference to the
+                native models on probe rows
+
+        Returns:
+            True if the backend is in use, False if inference stays native
+        """
+        if self.rf_model is None or self.xgb_model is None:
+            raise ValueError("Models not trained. Call train() first.")
+
+        try:
+            from src.models.onnx_backend import OnnxEnsemble
+        except ImportError as e:
+            logger.warning(f"onnxruntime backend unavailable, using native inference: {e}")
+            return False
+
+        probe = OnnxEnsemble.probe_matrix(self.rf_model, len(self.feature_names))
+        rf_sequential = copy.copy(self.rf_model)
+        rf_sequential.n_jobs = 1
+        rf_sequential.verbose = 0
+
+        engine = None
+        try:
+            engine = OnnxEnsemble.load(self.model_dir, version, intra_op_threads, inter_op_threads)
+            if not engine.verify(rf_sequential, self.xgb_model, probe, tolerance):
+                engine = None
+        except FileNotFoundError:
+            pass
+        except ImportError as e:
+            logger.warning(f"onnxruntime backend unavailable, using native inference: {e}")
+            return False
+
+        if engine is None:
+            try:
+                self.export_onnx(version)
+                engine = OnnxEnsemble.load(self.model_dir, version, intra_op_threads, inter_op_threads)
+            except (ImportError, OSError) as e:
+                logger.warning(f"Cannot export ensemble to ONNX, using native inference: {e}")
+                return False
+            if not engine.verify(rf_sequential, self.xgb_model, probe, tolerance):
+                logger.warning("ONNX ensemble failed verification, using native inference")
+                return False
+
+        self.onnx_engine = engine
+        logger.info(f"onnxruntime backend enabled ({intra_op_threads} intra-op, {inter_op_threads} inter-op threads)")
+        return True
+
+    def configure_cascade(
+        self,
+        band: Optional[float],
+        first_model: str = "xgboost",
+        threshold: float = 0.5
+    ) -> None:
+        """
+        Enable or disable confidence-gated cascade inference.
+
+        In cascade mode only first_model is run for every row; the other
+        member is run, and the usual weighted ensemble returned, only for
+        rows whose first probability lies strictly within band of
+        threshold. Confident rows get the first model's probability.
+
+        Args:
+            band: Half-width of the uncertainty band, or None to always run
+                the full ensemble
+            first_model: 'xgboost' or 'random_forest'
+            threshold: Decision threshold the band is centred on
+        """
+        if first_model not in ('xgboost', 'random_forest'):
+            raise ValueError(f"Unknown cascade model: {first_model}")
+
+        self.cascade_band = band
+        self.cascade_first_model = first_model
+        self.cascade_threshold = threshold
+
+        if band is not None:
+            logger.info(
+                f"Cascade inference enabled ({first_model} first, "
+                f"band {threshold - band:.2f}-{threshold + band:.2f})"
+            )
+
+    def _member_proba(self, X: np.ndarray, member: str) -> np.ndarray:
+        """Predict fraud probability with one ensemble member."""
+        with time_stage(member):
+            if self.onnx_engine is not None:
+                return self.onnx_engine.predict_member(X, member)
+
+            if self.compiled_engine is not None and len(X) <= self.compiled_max_rows:
+                return self.compiled_engine.predict_member(X, member)
+
+            model = self.rf_model if member == 'random_forest' else self.xgb_model
+            return model.predict_proba(X)[:, 1]
+
+    def _run_members(self, X: np.ndarray, members: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Predict with several ensemble members, concurrently if a member pool is set."""
+        tasks = {member: functools.partial(self._member_proba, X, member) for member in members}
+        if self.member_pool is None:
+            return {member: task() for member, task in tasks.items()}
+        return self.member_pool.run(tasks)
+
+    def _ensemble_proba(self, X: np.ndarray) -> np.ndarray:
+        """Predict the weighted RF + XGBoost ensemble probability."""
+        if (
+            self.member_pool is None
+            and self.compiled_engine is not None
+            and len(X) <= self.compiled_max_rows
+        ):
+            # Both members in one pass over the compiled trees
+            with time_stage('compiled_ensemble'):
+                return self.compiled_engine.predict_proba(X)
+
+        # RF first: it is the slower member and runs on the calling thread
+        members = self._run_members(X, ('random_forest', 'xgboost'))
+
+        # Weighted ensemble: 60% RF, 40% XGBoost
+        return 0.6 * members['random_forest'] + 0.4 * members['xgboost']
+
+    def _cascade_proba(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Predict with the cheaper member, escalating uncertain rows."""
+        first = self.cascade_first_model
+        second = 'random_forest' if first == 'xgboost' else 'xgboost'
+        first_proba = self._run_members(X, (first,))[first]
+
+        proba = first_proba.astype(np.float64)
+        paths = np.full(len(X), first, dtype=object)
+
+        uncertain = np.abs(proba - self.cascade_threshold) < self.cascade_band
+        if uncertain.any():
+            members = {
+                first: first_proba[uncertain],
+                second: self._run_members(X[uncertain], (second,))[second]
+            }
+
+            # Same expression as the full ensemble, so escalated rows match it exactly
+            proba[uncertain] = 0.6 * members['random_forest'] + 0.4 * members['xgboost']
+            paths[uncertain] = 'ensemble'
+
+        return proba, paths
+
+    def _fallback_proba(self, X: np.ndarray) -> np.ndarray:
+        """Predict fraud probability with the distilled fallback tree."""
+        with time_stage('fallback'):
+            return np.clip(self.fallback_model.predict(X), 0.0, 1.0)
+
+    @property
+    def available_tiers(self) -> Tuple[str, ...]:
+        """Inference tiers this detector can serve, most accurate first."""
+        if self.fallback_model is None:
+            return TIERS[:2]
+        return TIERS
+
+    def distill_fallback(
+        self,
+        X: Union[pd.DataFrame, np.ndarray],
+        max_depth: int = 6,
+        X_eval: Optional[Union[pd.DataFrame, np.ndarray]] = None
+    ) -> Dict[str, float]:
+        """
+        Fit the fallback tier: a shallow regression tree on ensemble probabilities.
+
+        Args:
+            X: Unlabeled features to distill on, typically the training set
+            max_depth: Depth of the fallback tree; one root-to-leaf walk per row
+            X_eval: Features to measure fidelity on, X if not given
+
+        Returns:
+            Fidelity to the ensemble: mean absolute probability error and
+            agreement of the 0.5-threshold labels
+        """
+        X = self._as_matrix(X)
+        self.fallback_model = distill_student(X, self._ensemble_proba(X), max_depth=max_depth)
+
+        if X_eval is not None:
+            X = self._as_matrix(X_eval)
+        teacher = self._ensemble_proba(X)
+        student = self._fallback_proba(X)
+        fidelity = {
+            'fallback_mae': float(np.abs(student - teacher).mean()),
+            'fallback_agreement': float(((student >= 0.5) == (teacher >= 0.5)).mean())
+        }
+        logger.info(
+            f"Distilled depth-{max_depth} fallback: MAE {fidelity['fallback_mae']:.4f}, "
+            f"label agreement {fidelity['fallback_agreement']:.4f}"
+        )
+        return fidelity
+
+    def _record_paths(self, paths: np.ndarray) -> None:
+        """Count how many predictions took each inference path."""
+        names, counts = np.unique(paths.astype(str), return_counts=True)
+        with self._path_lock:
+            for name, count in zip(names, counts):
+                self.path_counts[name] = self.path_counts.get(name, 0) + int(count)
+
+    def get_cascade_stats(self) -> Dict[str, Any]:
+        """Get cascade settings and per-path prediction counts."""
+        with self._path_lock:
+            paths = dict(self.path_counts)
+
+        total = sum(paths.values())
+        stats = {
+            'enabled': self.cascade_band is not None,
+            'first_model': self.cascade_first_model,
+            'band': self.cascade_band,
+            'paths': paths,
+            'escalation_rate': paths.get('ensemble', 0) / total if total else 0.0
+        }
+        return stats
+
     def train_random_forest(
         self,
         X_train: pd.DataFrame,
@@ -152,13 +562,18 @@ class FraudDetector:
         """
         self.feature_names = list(X_train.columns)
         self.training_date = datetime.now()
+        self.compile_feature_layout()
+        self.compiled_engine = None
+        self.onnx_engine = None
 
         # Train models
         self.train_random_forest(X_train, y_train, **(rf_params or {}))
         self.train_xgboost(X_train, y_train, **(xgb_params or {}))
+        strip_feature_names(self.rf_model)
 
         # Evaluate
         metrics = self.evaluate(X_test, y_test)
+        metrics.update(self.distill_fallback(X_train, X_eval=X_test))
         self.metrics = metrics
 
         logger.info("\n=== Training Complete ===")
@@ -170,31 +585,82 @@ class FraudDetector:
 
         return metrics
 
-    def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
+    def predict_proba(
+        self,
+        X: Union[pd.DataFrame, np.ndarray],
+        return_path: bool = False,
+        tier: str = 'full',
+        record_paths: bool = True
+    ) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
         """
         Predict fraud probabilities.
 
         Args:
-            X: Features
+            X: Features, as a DataFrame or an array from vectorize()
+            return_path: Also return which models produced each probability
+            tier: 'full' for the configured ensemble or cascade, 'xgboost'
+                for XGBoost alone, or 'fallback' for the distilled tree
+                (XGBoost if none is loaded)
+            record_paths: Count the paths in the cascade statistics; off
+                for synthetic rows such as warm-up batches
 
         Returns:
-            Array of probabilities (0-1) for fraud class
+            Array of probabilities (0-1) for fraud class, and with
+            return_path an array of paths ('ensemble', 'xgboost',
+            'random_forest' or 'fallback')
         """
         if self.rf_model is None or self.xgb_model is None:
             raise ValueError("Models not trained. Call train() first.")
+        if tier not in TIERS:
+            raise ValueError(f"Unknown inference tier: {tier}")
+
+        X = self._as_matrix(X)
+
+        if tier == 'fallback' and self.fallback_model is not None:
+            proba = self._fallback_proba(X)
+            paths = np.full(len(X), 'fallback', dtype=object)
+        elif tier != 'full':
+            proba = self._run_members(X, ('xgboost',))['xgboost'].astype(np.float64)
+            paths = np.full(len(X), 'xgboost', dtype=object)
+        elif not self.use_ensemble:
+            # Use Random Forest only
+            proba = self.rf_model.predict_proba(X)[:, 1]
+            paths = np.full(len(X), 'random_forest', dtype=object)
+        elif self.cascade_band is not None:
+            proba, paths = self._cascade_proba(X)
+        else:
+            proba = self._ensemble_proba(X)
+            paths = np.full(len(X), 'ensemble', dtype=object)
 
-        # Ensure features match training
-        X = X[self.feature_names]
+        if record_paths:
+            self._record_paths(paths)
 
-        if self.use_ensemble:
-            # Weighted ensemble: 60% RF, 40% XGBoost
-            rf_proba = self.rf_model.predict_proba(X)[:, 1]
-            xgb_proba = self.xgb_model.predict_proba(X)[:, 1]
-            ensemble_proba = 0.6 * rf_proba + 0.4 * xgb_proba
-            return ensemble_proba
-        else:
-            # Use Random Forest only
-            return self.rf_model.predict_proba(X)[:, 1]
+        if return_path:
+            return proba, paths
+        return proba
+
+    def predict_proba_records(
+        self,
+        records: Sequence[Mapping[str, Any]],
+        return_path: bool = False,
+        tier: str = 'full',
+        record_paths: bool = True
+    ) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Predict fraud probabilities for feature dicts without building a DataFrame.
+
+        Args:
+            records: Feature dicts containing every name in feature_names
+            return_path: Also return which models produced each probability
+            tier: Inference tier, see predict_proba
+            record_paths: Count the paths, see predict_proba
+
+        Returns:
+            Same as predict_proba
+        """
+        return self.predict_proba(
+            self.vectorize(records), return_path=return_path, tier=tier, record_paths=record_paths
+        )
 
     def predict(self, X: pd.DataFrame, threshold: float = 0.5) -> np.ndarray:
         """
@@ -228,11 +694,12 @@ class FraudDetector:
         logger.info("Evaluating models...")
 
         # Predictions
-        rf_pred = self.rf_model.predict(X_test)
-        rf_proba = self.rf_model.predict_proba(X_test)[:, 1]
+        X = self._as_matrix(X_test)
+        rf_pred = self.rf_model.predict(X)
+        rf_proba = self.rf_model.predict_proba(X)[:, 1]
 
-        xgb_pred = self.xgb_model.predict(X_test)
-        xgb_proba = self.xgb_model.predict_proba(X_test)[:, 1]
+        xgb_pred = self.xgb_model.predict(X)
+        xgb_proba = self.xgb_model.predict_proba(X)[:, 1]
 
         ensemble_proba = 0.6 * rf_proba + 0.4 * xgb_proba
         ensemble_pred = (ensemble_proba >= 0.5).astype(int)
@@ -306,6 +773,12 @@ class FraudDetector:
         joblib.dump(self.xgb_model, xgb_path)
         logger.info(f"Saved XGBoost to {xgb_path}")
 
+        # Save distilled fallback
+        if self.fallback_model is not None:
+            fallback_path = self.model_dir / f"fallback_v{version}.joblib"
+            joblib.dump(self.fallback_model, fallback_path)
+            logger.info(f"Saved fallback model to {fallback_path}")
+
         # Save metadata
         metadata = {
             'version': version,
@@ -318,33 +791,45 @@ class FraudDetector:
         joblib.dump(metadata, metadata_path)
         logger.info(f"Saved metadata to {metadata_path}")
 
-    def load(self, version: str = "1.0.0") -> None:
+    def load(self, version: str = "1.0.0", max_workers: int = 1) -> None:
         """
         Load models from disk.
 
         Args:
             version: Model version string
+            max_workers: Artifacts deserialized concurrently
         """
         logger.info(f"Loading models version {version}...")
 
-        # Load Random Forest
+        self.compiled_engine = None
+        self.onnx_engine = None
+
         rf_path = self.model_dir / f"random_forest_v{version}.joblib"
         if not rf_path.exists():
             raise FileNotFoundError(f"Random Forest model not found: {rf_path}")
-        self.rf_model = joblib.load(rf_path)
-        logger.info(f"Loaded Random Forest from {rf_path}")
-
-        # Load XGBoost
         xgb_path = self.model_dir / f"xgboost_v{version}.joblib"
         if not xgb_path.exists():
             raise FileNotFoundError(f"XGBoost model not found: {xgb_path}")
-        self.xgb_model = joblib.load(xgb_path)
-        logger.info(f"Loaded XGBoost from {xgb_path}")
+        paths = {'random_forest': rf_path, 'xgboost': xgb_path}
 
-        # Load metadata
+        # Distilled fallback is optional, models trained before it lack one
+        fallback_path = self.model_dir / f"fallback_v{version}.joblib"
+        if fallback_path.exists():
+            paths['fallback'] = fallback_path
         metadata_path = self.model_dir / f"metadata_v{version}.joblib"
         if metadata_path.exists():
-            metadata = joblib.load(metadata_path)
+            paths['metadata'] = metadata_path
+
+        artifacts = load_artifacts(paths, max_workers=max_workers)
+        self.rf_model = artifacts['random_forest']
+        self.xgb_model = artifacts['xgboost']
+        self.fallback_model = artifacts.get('fallback')
+        # Artifacts trained before the names were stripped at fit time
+        strip_feature_names(self.rf_model, self.fallback_model)
+        logger.info(f"Loaded {', '.join(path.name for path in paths.values())} from {self.model_dir}")
+
+        if 'metadata' in artifacts:
+            metadata = artifacts['metadata']
             self.feature_names = metadata.get('feature_names', [])
             self.metrics = metadata.get('metrics', {})
             training_date_str = metadata.get('training_date')
@@ -352,4 +837,6 @@ class FraudDetector:
             self.use_ensemble = metadata.get('use_ensemble', True)
             logger.info(f"Loaded metadata from {metadata_path}")
 
+        self.compile_feature_layout()
+
         logger.info("Models loaded successfully")
@@ -0,0 +1,365 @@
+"""ONNX export of the models and an onnxruntime inference backend.
+
+RF and XGBoost are exported as one graph each, and the anomaly scaler and
+Isolation Forest as a single pipeline graph. The graphs are run on
+onnxruntime's CPU provider with bounded thread pools.
+
+Results are not bit-identical to the native models: onnxruntime sums tree
+outputs in float32. ``OnnxEnsemble.verify`` and ``OnnxAnomalyPipeline.verify``
+bound the difference on rows placed at the split thresholds before a
+backend is used.
+
+skl2onnx, onnxmltools and onnxruntime are optional dependencies, imported
+on first use; without them inference stays on the native models.
+"""
+import copy
+import logging
+from pathlib import Path
+from typing import Any, Dict, Tuple, Union
+
+import numpy as np
+
+from src.models.tree_engine import RF_WEIGHT, XGB_WEIGHT, threshold_probe
+
+logger = logging.getLogger(__name__)
+
+# Opsets supported by both converters and onnxruntime's tree ensemble kernels
+_OPSET = 15
+_ML_OPSET = 3
+
+MEMBERS = ('random_forest', 'xgboost')
+
+
+def fraud_graph_paths(model_dir: Union[str, Path], version: str) -> Dict[str, Path]:
+    """Paths of a version's RF and XGBoost graphs."""
+    model_dir = Path(model_dir)
+    return {member: model_dir / f"{member}_v{version}.onnx" for member in MEMBERS}
+
+
+def anomaly_graph_path(model_dir: Union[str, Path], version: str) -> Path:
+    """Path of a version's scaler + Isolation Forest graph."""
+    return Path(model_dir) / f"anomaly_pipeline_v{version}.onnx"
+
+
+def _write(model, path: Path) -> None:
+    """Write a graph next to its final name and rename it into place."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(model.SerializeToString())
+    tmp.replace(path)
+
+
+def export_fraud_models(rf_model, xgb_model, n_features: int, model_dir: Union[str, Path], version: str) -> Dict[str, Path]:
+    """
+    Export RF and XGBoost to ONNX graphs taking float32 feature matrices.
+
+    Args:
+        rf_model: Fitted RandomForestClassifier
+        xgb_model: Fitted XGBClassifier
+        n_features: Number of model features
+        model_dir: Directory to write the graphs to
+        version: Model version string
+
+    Returns:
+        Written paths keyed by member
+
+    Raises:
+        ImportError: If skl2onnx or onnxmltools is not installed
+    """
+    from onnxmltools import convert_xgboost
+    from onnxmltools.convert.common.data_types import FloatTensorType as XGBFloatTensorType
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+
+    paths = fraud_graph_paths(model_dir, version)
+
+    rf_graph = convert_sklearn(
+        rf_model,
+        initial_types=[('X', FloatTensorType([None, n_features]))],
+        options={id(rf_model): {'zipmap': False}},
+        target_opset={'': _OPSET, 'ai.onnx.ml': _ML_OPSET}
+    )
+    _write(rf_graph, paths['random_forest'])
+
+    # The converter only accepts positional feature names (f0, f1, ...)
+    xgb_positional = copy.deepcopy(xgb_model)
+    xgb_positional.get_booster().feature_names = None
+    xgb_graph = convert_xgboost(
+        xgb_positional,
+        initial_types=[('X', XGBFloatTensorType([None, n_features]))],
+        target_opset=_OPSET
+    )
+    _write(xgb_graph, paths['xgboost'])
+
+    logger.info(f"Exported ONNX graphs {', '.join(path.name for path in paths.values())}")
+    return paths
+
+
+def export_anomaly_pipeline(scaler, iforest, n_features: int, model_dir: Union[str, Path], version: str) -> Path:
+    """
+    Export the scaler and Isolation Forest as one ONNX graph.
+
+    The graph takes the raw float64 features, standardizes them in float64
+    and casts them to float32 for the trees, like sklearn. Besides the label
+    and scores it outputs the scaled features, which explanations use.
+
+    Args:
+        scaler: Fitted StandardScaler
+        iforest: Fitted IsolationForest
+        n_features: Number of model features
+        model_dir: Directory to write the graph to
+        version: Model version string
+
+    Returns:
+        Written path
+
+    Raises:
+        ImportError: If skl2onnx is not installed
+    """
+    from onnx import TensorProto, helper
+    from sklearn.pipeline import Pipeline
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import DoubleTensorType
+    from skl2onnx.sklapi import CastTransformer
+
+    pipeline = Pipeline([
+        ('scaler', scaler),
+        ('cast', CastTransformer(dtype=np.float32)),
+        ('iforest', iforest)
+    ])
+    graph = convert_sklearn(
+        pipeline,
+        initial_types=[('X', DoubleTensorType([None, n_features]))],
+        target_opset={'': _OPSET, 'ai.onnx.ml': _ML_OPSET}
+    )
+
+    # Expose the scaler output, the input of the cast to float32
+    cast = next(node for node in graph.graph.node if node.op_type == 'Cast')
+    graph.graph.output.append(
+        helper.make_tensor_value_info(cast.input[0], TensorProto.DOUBLE, [None, n_features])
+    )
+
+    path = anomaly_graph_path(model_dir, version)
+    _write(graph, path)
+    logger.info(f"Exported ONNX graph {path.name}")
+    return path
+
+
+def _session(path: Path, intra_op_threads: int, inter_op_threads: int):
+    """Open a graph on the CPU provider with the given thread pool sizes."""
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = intra_op_threads
+    options.inter_op_num_threads = inter_op_threads
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return ort.InferenceSession(str(path), sess_options=options, providers=['CPUExecutionProvider'])
+
+
+class OnnxEnsemble:
+    """RF and XGBoost graphs on onnxruntime, used like CompiledEnsemble."""
+
+    def __init__(self, sessions: Dict[str, Any], nbytes: int = 0):
+        """
+        Initialize ensemble.
+
+        Args:
+            sessions: onnxruntime sessions keyed by member
+            nbytes: Size of the serialized graphs
+        """
+        self.sessions = sessions
+        self.nbytes = nbytes
+        self.intra_op_threads = None
+        self.inter_op_threads = None
+
+    @classmethod
+    def load(
+        cls,
+        model_dir: Union[str, Path],
+        version: str,
+        intra_op_threads: int = 1,
+        inter_op_threads: int = 1
+    ) -> "OnnxEnsemble":
+        """
+        Open a version's graphs.
+
+        Args:
+            model_dir: Directory holding the graphs
+            version: Model version string
+            intra_op_threads: Threads one graph evaluation may use
+            inter_op_threads: Threads for running independent graph nodes
+
+        Raises:
+            FileNotFoundError: If a graph is missing
+            ImportError: If onnxruntime is not installed
+        """
+        paths = fraud_graph_paths(model_dir, version)
+        for path in paths.values():
+            if not path.exists():
+                raise FileNotFoundError(f"ONNX graph not found: {path}")
+        ensemble = cls(
+            {member: _session(path, intra_op_threads, inter_op_threads) for member, path in paths.items()},
+            nbytes=sum(path.stat().st_size for path in paths.values())
+        )
+        ensemble.intra_op_threads = intra_op_threads
+        ensemble.inter_op_threads = inter_op_threads
+        return ensemble
+
+    def predict_member(self, X: np.ndarray, member: str) -> np.ndarray:
+        """
+        Predict fraud probability with one member.
+
+        Args:
+            X: float32 matrix in feature_names order
+            member: 'random_forest' or 'xgboost'
+
+        Returns:
+            float64 probabilities of the fraud class
+        """
+        _, probabilities = self.sessions[member].run(None, {'X': np.ascontiguousarray(X, dtype=np.float32)})
+        return probabilities[:, 1].astype(np.float64)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Predict the weighted ensemble probability."""
+        return RF_WEIGHT * self.predict_member(X, 'random_forest') + XGB_WEIGHT * self.predict_member(X, 'xgboost')
+
+    def verify(self, rf_model, xgb_model, X: np.ndarray, tolerance: float) -> bool:
+        """
+        Check both members stay within tolerance of the native models.
+
+        Args:
+            rf_model: Native RandomForestClassifier
+            xgb_model: Native XGBClassifier
+            X: Probe matrix
+            tolerance: Largest accepted absolute probability difference
+
+        Returns:
+            True if both members are within tolerance
+        """
+        diffs = {
+            'random_forest': float(np.abs(self.predict_member(X, 'random_forest') - rf_model.predict_proba(X)[:, 1]).max()),
+            'xgboost': float(np.abs(self.predict_member(X, 'xgboost') - xgb_model.predict_proba(X)[:, 1]).max())
+        }
+        if max(diffs.values()) > tolerance:
+            logger.warning(
+                f"ONNX ensemble differs from native models beyond {tolerance:.3g} "
+                f"(rf max diff {diffs['random_forest']:.3g}, xgb max diff {diffs['xgboost']:.3g})"
+            )
+            return False
+        logger.info(f"ONNX ensemble verified (rf max diff {diffs['random_forest']:.3g}, xgb max diff {diffs['xgboost']:.3g})")
+        return True
+
+    @staticmethod
+    def probe_matrix(rf_model, n_features: int, n_rows: int = 256, seed: int = 0) -> np.ndarray:
+        """Rows on both sides of the random forest's split thresholds."""
+        feature = np.concatenate([estimator.tree_.feature for estimator in rf_model.estimators_])
+        threshold = np.concatenate([estimator.tree_.threshold for estimator in rf_model.estimators_])
+        threshold = np.where(feature >= 0, threshold, np.nan)
+        return threshold_probe(feature, threshold, n_features, n_rows, seed)
+
+    def get_info(self) -> Dict[str, Any]:
+        """Get backend summary."""
+        return {
+            'members': list(self.sessions),
+            'intra_op_threads': self.intra_op_threads,
+            'inter_op_threads': self.inter_op_threads,
+            'nbytes': self.nbytes
+        }
+
+
+class OnnxAnomalyPipeline:
+    """Scaler + Isolation Forest graph on onnxruntime."""
+
+    def __init__(self, session, offset: float, nbytes: int = 0):
+        """
+        Initialize pipeline.
+
+        Args:
+            session: onnxruntime session of the pipeline graph
+            offset: IsolationForest.offset_, to turn decision scores back
+                into score_samples
+            nbytes: Size of the serialized graph
+        """
+        self.session = session
+        self.offset = offset
+        self.nbytes = nbytes
+
+    @classmethod
+    def load(
+        cls,
+        model_dir: Union[str, Path],
+        version: str,
+        offset: float,
+        intra_op_threads: int = 1,
+        inter_op_threads: int = 1
+    ) -> "OnnxAnomalyPipeline":
+        """
+        Open a version's pipeline graph.
+
+        Raises:
+            FileNotFoundError: If the graph is missing
+            ImportError: If onnxruntime is not installed
+        """
+        path = anomaly_graph_path(model_dir, version)
+        if not path.exists():
+            raise FileNotFoundError(f"ONNX graph not found: {path}")
+        return cls(_session(path, intra_op_threads, inter_op_threads), offset, nbytes=path.stat().st_size)
+
+    def run(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Scale and score raw features.
+
+        Args:
+            X: float64 matrix in feature_names order
+
+        Returns:
+            Tuple of (predictions, IsolationForest.score_samples values,
+            scaled features)
+        """
+        labels, decision, X_scaled = self.session.run(None, {'X': np.ascontiguousarray(X, dtype=np.float64)})
+        scores = decision.reshape(-1).astype(np.float64) + self.offset
+        return labels.reshape(-1), scores, X_scaled
+
+    def verify(self, scaler, iforest, X: np.ndarray, tolerance: float) -> bool:
+        """
+        Check labels match and scores stay within tolerance of the native pipeline.
+
+        Args:
+            scaler: Native StandardScaler
+            iforest: Native IsolationForest
+            X: Probe matrix of raw features
+            tolerance: Largest accepted absolute score difference
+
+        Returns:
+            True if within tolerance
+        """
+        labels, scores, _ = self.run(X)
+        native = iforest.score_samples(scaler.transform(X))
+        max_diff = float(np.abs(scores - native).max())
+        # Rows closer to the threshold than the tolerance may flip
+        decided = np.abs(native - iforest.offset_) > tolerance
+        labels_match = np.array_equal(labels[decided], np.where(native - iforest.offset_ < 0, -1, 1)[decided])
+        if max_diff > tolerance or not labels_match:
+            logger.warning(
+                f"ONNX anomaly pipeline differs from native models beyond {tolerance:.3g} "
+                f"(max score diff {max_diff:.3g}, labels match: {labels_match})"
+            )
+            return False
+        logger.info(f"ONNX anomaly pipeline verified (max score diff {max_diff:.3g})")
+        return True
+
+    @staticmethod
+    def probe_matrix(scaler, iforest, n_features: int, n_rows: int = 256, seed: int = 0) -> np.ndarray:
+        """Raw rows near the Isolation Forest's split thresholds."""
+        features = []
+        thresholds = []
+        for estimator, estimator_features in zip(iforest.estimators_, iforest.estimators_features_):
+            tree = estimator.tree_
+            is_split = tree.feature >= 0
+            features.append(np.where(is_split, np.asarray(estimator_features)[np.maximum(tree.feature, 0)], -1))
+            thresholds.append(np.where(is_split, tree.threshold, np.nan))
+        X_scaled = threshold_probe(np.concatenate(features), np.concatenate(thresholds), n_features, n_rows, seed)
+        return X_scaled.astype(np.float64) * scaler.scale_ + scaler.mean_
+
+    def get_info(self) -> Dict[str, Any]:
+        """Get backend summary."""
+        return {'nbytes': self.nbytes}
@@ -0,0 +1,538 @@
+"""Compiled tree inference engine for the RF + XGBoost fraud ensemble.
+
+Both forests are exported at load time into one structure-of-arrays layout
+(split feature, threshold, children, leaf value) and evaluated with
+vectorized NumPy traversal over a whole batch, bypassing sklearn's
+per-estimator dispatch and the separate XGBoost call.
+
+Results are bit-compatible with ``FraudDetector.predict_proba``: splits,
+leaf values and accumulation order reproduce what sklearn and XGBoost
+compute, and ``CompiledEnsemble.verify`` checks this against the native
+models before the engine is used.
+"""
+import ctypes
+import ctypes.util
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import joblib
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Weights of the ensemble members, as in FraudDetector.predict_proba
+RF_WEIGHT = 0.6
+XGB_WEIGHT = 0.4
+
+
+def _load_expf():
+    """Load the C library expf that XGBoost uses for its sigmoid."""
+    try:
+        libm = ctypes.CDLL(ctypes.util.find_library('m'))
+        expf = libm.expf
+        expf.restype = ctypes.c_float
+        expf.argtypes = [ctypes.c_float]
+        return expf
+    except (OSError, AttributeError, TypeError):
+        return None
+
+
+_expf = _load_expf()
+
+# expf is within 0.502 ulp, so it can only round differently from exp in
+# float64 when the exact result lies this close to a float32 midpoint
+_EXPF_MIDPOINT_BAND = 0.49
+
+
+def _expf_f32(x: np.ndarray) -> np.ndarray:
+    """
+    Vectorized C library expf, bit for bit.
+
+    exp is computed in float64 and rounded to float32, which is the
+    correctly rounded result. Only the few values (about 2%) whose exact
+    result is near the midpoint of two float32 values, where expf may
+    round the other way, go through expf itself.
+
+    Args:
+        x: float32 exponents
+
+    Returns:
+        float32 exp(x)
+    """
+    exact = np.exp(x.astype(np.float64))
+    rounded = exact.astype(np.float32)
+    if _expf is None:
+        return rounded
+
+    rounded64 = rounded.astype(np.float64)
+    towards = np.where(exact >= rounded64, np.float32(np.inf), np.float32(-np.inf))
+    gap = np.abs(np.nextafter(rounded, towards).astype(np.float64) - rounded64)
+    # 0 when exact is a float32, 0.5 at the midpoint to the next float32
+    position = np.abs(exact - rounded64) / gap
+    near_midpoint = np.flatnonzero(position > _EXPF_MIDPOINT_BAND)
+    if len(near_midpoint):
+        rounded[near_midpoint] = [_expf(v) for v in x[near_midpoint].tolist()]
+    return rounded
+
+
+def _sigmoid_f32(margin: np.ndarray) -> np.ndarray:
+    """
+    Logistic transform matching XGBoost's float32 implementation.
+
+    Args:
+        margin: float32 raw margins
+
+    Returns:
+        float32 probabilities
+    """
+    x = np.minimum(-margin, np.float32(88.7))
+    exp_x = _expf_f32(x)
+    return np.float32(1.0) / (exp_x + np.float32(1.0) + np.float32(1e-16))
+
+
+def _export_random_forest(rf_model) -> Dict[str, Any]:
+    """Export sklearn RandomForestClassifier trees as flat arrays."""
+    if rf_model.n_outputs_ != 1 or rf_model.n_classes_ != 2:
+        raise NotImplementedError("Only single-output binary random forests can be compiled")
+
+    trees = []
+    for estimator in rf_model.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left == -1
+
+        # Leaf probability exactly as DecisionTreeClassifier.predict_proba
+        proba = tree.value[:, 0, :2].copy()
+        normalizer = proba.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        proba /= normalizer
+
+        missing_left = getattr(tree, 'missing_go_to_left', None)
+        if missing_left is None:
+            missing_left = np.ones(tree.node_count, dtype=bool)
+
+        # sklearn goes left when float32 x <= float64 threshold, which is
+        # x <= the threshold rounded down to float32
+        threshold = tree.threshold.astype(np.float32)
+        rounded_up = threshold.astype(np.float64) > tree.threshold
+        threshold[rounded_up] = np.nextafter(threshold[rounded_up], np.float32(-np.inf))
+
+        trees.append({
+            'feature': np.where(is_leaf, 0, tree.feature),
+            'threshold': threshold,
+            'left': tree.children_left,
+            'right': tree.children_right,
+            'missing_left': np.asarray(missing_left, dtype=bool),
+            'value': proba[:, 1],
+            'is_leaf': is_leaf,
+            'depth': tree.max_depth
+        })
+
+    return {'trees': trees}
+
+
+def _export_xgboost(xgb_model) -> Dict[str, Any]:
+    """Export an XGBClassifier gbtree booster as flat arrays."""
+    booster = xgb_model.get_booster()
+    config = json.loads(booster.save_raw('json'))['learner']
+
+    if config['objective']['name'] != 'binary:logistic':
+        raise NotImplementedError("Only binary:logistic XGBoost models can be compiled")
+    if config['gradient_booster']['name'] != 'gbtree':
+        raise NotImplementedError("Only gbtree XGBoost models can be compiled")
+
+    model = config['gradient_booster']['model']
+    if int(model['gbtree_model_param'].get('num_parallel_tree', 1)) != 1:
+        raise NotImplementedError("Boosted random forests cannot be compiled")
+
+    base_score = np.float32(float(config['learner_model_param']['base_score'].strip('[]')))
+    base_margin = np.float32(-np.log(np.float32(1.0) / base_score - np.float32(1.0)))
+
+    tree_list = model['trees']
+    best_iteration = getattr(xgb_model, 'best_iteration', None)
+    if best_iteration is not None:
+        tree_list = tree_list[:best_iteration + 1]
+
+    trees = []
+    for tree in tree_list:
+        left = np.asarray(tree['left_children'], dtype=np.int64)
+        right = np.asarray(tree['right_children'], dtype=np.int64)
+        condition = np.asarray(tree['split_conditions'], dtype=np.float32)
+        is_leaf = left == -1
+
+        # XGBoost goes left when x < condition on float32 values, which is
+        # x <= the next float32 below condition
+        threshold = np.nextafter(condition, np.float32(-np.inf))
+
+        depth = np.zeros(len(left), dtype=np.int64)
+        for node in range(len(left)):
+            if not is_leaf[node]:
+                depth[left[node]] = depth[node] + 1
+                depth[right[node]] = depth[node] + 1
+
+        trees.append({
+            'feature': np.where(is_leaf, 0, np.asarray(tree['split_indices'], dtype=np.int64)),
+            'threshold': threshold,
+            'left': left,
+            'right': right,
+            'missing_left': np.asarray(tree['default_left'], dtype=bool),
+            # Leaf weights live in split_conditions
+            'value': condition.astype(np.float64),
+            'is_leaf': is_leaf,
+            'depth': int(depth.max())
+        })
+
+    return {'trees': trees, 'base_margin': base_margin}
+
+
+def threshold_probe(
+    feature: np.ndarray,
+    threshold: np.ndarray,
+    n_features: int,
+    n_rows: int = 256,
+    seed: int = 0
+) -> np.ndarray:
+    """
+    Build rows that land on both sides of many split thresholds.
+
+    Args:
+        feature: Split feature per node
+        threshold: Split threshold per node, non-finite for leaves
+        n_features: Number of model features
+        n_rows: Number of probe rows
+        seed: Random seed
+
+    Returns:
+        float32 probe matrix
+    """
+    rng = np.random.default_rng(seed)
+    is_split = np.isfinite(threshold)
+    X = np.zeros((n_rows, n_features), dtype=np.float32)
+
+    for j in range(n_features):
+        cuts = threshold[is_split & (feature == j)]
+        if len(cuts) == 0:
+            continue
+        picks = rng.choice(cuts, size=n_rows).astype(np.float32)
+        X[:, j] = np.where(
+            rng.random(n_rows) < 0.5,
+            np.nextafter(picks, np.float32(np.inf)),
+            picks
+        )
+    return X
+
+
+class CompiledEnsemble:
+    """RF + XGBoost ensemble flattened into one structure-of-arrays layout."""
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children: np.ndarray,
+        missing_right: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        depths: np.ndarray,
+        n_rf_trees: int,
+        xgb_base_margin: float
+    ):
+        """
+        Initialize engine from flat arrays (see from_models).
+
+        Args:
+            feature: Split feature per node (0 for leaves)
+            threshold: Go right when x > threshold (+inf for leaves)
+            children: Interleaved (left, right) child per node; leaves point
+                to themselves so traversal can run a fixed number of steps
+            missing_right: Whether NaN goes right at each node
+            value: Leaf value per node (RF fraud probability or XGB weight)
+            roots: Root node of each tree, RF trees first
+            depths: Depth of each tree
+            n_rf_trees: Number of leading RF trees in roots
+            xgb_base_margin: XGBoost starting margin
+        """
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.missing_right = missing_right
+        self.value = value
+        self.roots = roots
+        self.depths = depths
+        self.n_rf_trees = n_rf_trees
+        self.xgb_base_margin = np.float32(xgb_base_margin)
+        self.max_depth = int(depths.max()) if len(depths) else 0
+
+        # Traversal schedules for the whole ensemble and for each member
+        n_trees = len(roots)
+        self._schedules = {
+            'ensemble': self._schedule(np.arange(n_trees)),
+            'random_forest': self._schedule(np.arange(n_rf_trees)),
+            'xgboost': self._schedule(np.arange(n_rf_trees, n_trees))
+        }
+
+    def _schedule(self, trees: np.ndarray) -> Tuple[np.ndarray, np.ndarray, List[int]]:
+        """
+        Plan traversal of a subset of trees.
+
+        Deepest trees go first so each step only touches the trees that can
+        still be below a leaf.
+
+        Args:
+            trees: Tree indices in accumulation order
+
+        Returns:
+            Tuple of (roots in traversal order, permutation restoring
+            accumulation order, number of active trees per step)
+        """
+        depths = self.depths[trees]
+        order = np.argsort(-depths, kind='stable')
+        restore = np.argsort(order, kind='stable')
+        max_depth = int(depths.max()) if len(depths) else 0
+        active = [int((depths > step).sum()) for step in range(max_depth)]
+        return self.roots[trees][order], restore, active
+
+    @classmethod
+    def from_models(cls, rf_model, xgb_model) -> "CompiledEnsemble":
+        """
+        Compile a trained RF and XGBoost pair.
+
+        Args:
+            rf_model: Trained RandomForestClassifier
+            xgb_model: Trained XGBClassifier
+
+        Returns:
+            Compiled engine
+        """
+        rf = _export_random_forest(rf_model)
+        xgb = _export_xgboost(xgb_model)
+        trees = rf['trees'] + xgb['trees']
+
+        sizes = np.array([len(tree['feature']) for tree in trees])
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        n_nodes = int(sizes.sum())
+
+        feature = np.empty(n_nodes, dtype=np.int32)
+        threshold = np.empty(n_nodes, dtype=np.float32)
+        children = np.empty(2 * n_nodes, dtype=np.int32)
+        missing_right = np.empty(n_nodes, dtype=bool)
+        value = np.empty(n_nodes, dtype=np.float64)
+
+        for tree, offset, size in zip(trees, offsets, sizes):
+            nodes = np.arange(offset, offset + size)
+            is_leaf = tree['is_leaf']
+
+            feature[nodes] = tree['feature']
+            threshold[nodes] = np.where(is_leaf, np.inf, tree['threshold'])
+            children[2 * nodes] = np.where(is_leaf, nodes, tree['left'] + offset)
+            children[2 * nodes + 1] = np.where(is_leaf, nodes, tree['right'] + offset)
+            missing_right[nodes] = ~tree['missing_left'] & ~is_leaf
+            value[nodes] = tree['value']
+
+        engine = cls(
+            feature=feature,
+            threshold=threshold,
+            children=children,
+            missing_right=missing_right,
+            value=value,
+            roots=offsets.astype(np.int32),
+            depths=np.array([tree['depth'] for tree in trees]),
+            n_rf_trees=len(rf['trees']),
+            xgb_base_margin=xgb['base_margin']
+        )
+
+        logger.info(
+            f"Compiled ensemble: {len(rf['trees'])} RF + {len(xgb['trees'])} XGBoost trees, "
+            f"{n_nodes} nodes, max depth {engine.max_depth}"
+        )
+        return engine
+
+    def _leaf_values(self, X: np.ndarray, member: str = 'ensemble') -> np.ndarray:
+        """
+        Traverse every tree of a member for every row.
+
+        Args:
+            X: float32 matrix in feature_names order
+            member: 'ensemble', 'random_forest' or 'xgboost'
+
+        Returns:
+            Leaf values of shape (n_trees, n_rows), in accumulation order
+        """
+        roots, restore, schedule = self._schedules[member]
+
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        row_offsets = (np.arange(n_rows, dtype=np.int32) * n_features)[np.newaxis, :]
+        has_missing = bool(np.isnan(flat).any())
+
+        node = np.repeat(roots[:, np.newaxis], n_rows, axis=1)
+        for active in schedule:
+            current = node[:active]
+            x = flat.take(row_offsets + self.feature.take(current))
+            go_right = x > self.threshold.take(current)
+            if has_missing:
+                go_right |= np.isnan(x) & self.missing_right.take(current)
+            node[:active] = self.children.take(2 * current + go_right)
+
+        return self.value.take(node)[restore]
+
+    def _rf_proba(self, leaves: np.ndarray) -> np.ndarray:
+        """Average RF leaf probabilities in tree order, as sklearn does."""
+        rf_proba = np.cumsum(leaves, axis=0)[-1]
+        rf_proba /= self.n_rf_trees
+        return rf_proba
+
+    def _xgb_proba(self, leaves: np.ndarray) -> np.ndarray:
+        """Sum XGBoost leaf weights in float32 tree order and apply the sigmoid."""
+        margin = np.cumsum(
+            np.vstack([np.full((1, leaves.shape[1]), self.xgb_base_margin), leaves.astype(np.float32)]),
+            axis=0,
+            dtype=np.float32
+        )[-1]
+        return _sigmoid_f32(margin)
+
+    def predict_members(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Predict fraud probability from each ensemble member.
+
+        Args:
+            X: float32 matrix in feature_names order
+
+        Returns:
+            Tuple of (rf_proba float64, xgb_proba float32)
+        """
+        leaves = self._leaf_values(X)
+        return self._rf_proba(leaves[:self.n_rf_trees]), self._xgb_proba(leaves[self.n_rf_trees:])
+
+    def predict_member(self, X: np.ndarray, member: str) -> np.ndarray:
+        """
+        Predict fraud probability from one ensemble member only.
+
+        Args:
+            X: float32 matrix in feature_names order
+            member: 'random_forest' or 'xgboost'
+
+        Returns:
+            Array of probabilities (0-1) for fraud class
+        """
+        leaves = self._leaf_values(X, member)
+        if member == 'random_forest':
+            return self._rf_proba(leaves)
+        return self._xgb_proba(leaves)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict weighted ensemble fraud probability.
+
+        Args:
+            X: float32 matrix in feature_names order
+
+        Returns:
+            Array of probabilities (0-1) for fraud class
+        """
+        rf_proba, xgb_proba = self.predict_members(X)
+        return RF_WEIGHT * rf_proba + XGB_WEIGHT * xgb_proba
+
+    def verify(self, rf_model, xgb_model, X: np.ndarray) -> bool:
+        """
+        Check that the engine reproduces the native models bit for bit.
+
+        Args:
+            rf_model: RandomForestClassifier the engine was compiled from
+            xgb_model: XGBClassifier the engine was compiled from
+            X: float32 probe matrix
+
+        Returns:
+            True if RF and XGBoost probabilities are identical
+        """
+        rf_proba, xgb_proba = self.predict_members(X)
+        rf_native = rf_model.predict_proba(X)[:, 1]
+        xgb_native = xgb_model.predict_proba(X)[:, 1]
+
+        rf_match = np.array_equal(rf_proba, rf_native)
+        xgb_match = np.array_equal(xgb_proba, xgb_native)
+        if not (rf_match and xgb_match):
+            logger.warning(
+                f"Compiled ensemble differs from native models "
+                f"(rf max diff {np.abs(rf_proba - rf_native).max():.3g}, "
+                f"xgb max diff {np.abs(xgb_proba - xgb_native).max():.3g})"
+            )
+        return rf_match and xgb_match
+
+    def probe_matrix(self, n_features: int, n_rows: int = 256, seed: int = 0) -> np.ndarray:
+        """
+        Build rows that land on both sides of many split thresholds.
+
+        Args:
+            n_features: Number of model features
+            n_rows: Number of probe rows
+            seed: Random seed
+
+        Returns:
+            float32 probe matrix
+        """
+        return threshold_probe(self.feature, self.threshold, n_features, n_rows, seed)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Write the flat arrays to an uncompressed joblib file.
+
+        The file is written next to its final name and renamed into place,
+        so workers never map a partially written file.
+
+        Args:
+            path: Destination file
+        """
+        path = Path(path)
+        arrays = {
+            'feature': self.feature,
+            'threshold': self.threshold,
+            'children': self.children,
+            'missing_right': self.missing_right,
+            'value': self.value,
+            'roots': self.roots,
+            'depths': self.depths,
+            'n_rf_trees': self.n_rf_trees,
+            'xgb_base_margin': float(self.xgb_base_margin)
+        }
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        joblib.dump(arrays, tmp_path)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path], mmap_mode: Optional[str] = 'r') -> "CompiledEnsemble":
+        """
+        Load an engine written by save().
+
+        Args:
+            path: File written by save()
+            mmap_mode: joblib memory-map mode; with 'r' the tree arrays are
+                read-only views of the file, and every process loading it
+                shares the same page cache pages
+
+        Returns:
+            Compiled engine
+        """
+        arrays = joblib.load(path, mmap_mode=mmap_mode)
+        # Plain ndarray views of the maps, so traversal results are not memmaps
+        return cls(**{
+            name: np.asarray(value) if isinstance(value, np.ndarray) else value
+            for name, value in arrays.items()
+        })
+
+    def get_info(self) -> Dict[str, Any]:
+        """Get engine layout summary."""
+        return {
+            'memory_mapped': isinstance(self.feature.base, np.memmap),
+            'rf_trees': self.n_rf_trees,
+            'xgb_trees': len(self.roots) - self.n_rf_trees,
+            'nodes': len(self.feature),
+            'max_depth': self.max_depth,
+            'nbytes': int(
+                self.feature.nbytes + self.threshold.nbytes + self.children.nbytes
+                + self.missing_right.nbytes + self.value.nbytes + self.roots.nbytes
+            )
+        }
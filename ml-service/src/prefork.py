@@ -0,0 +1,157 @@
+"""Pre-fork multi-worker server.
+
+The parent process loads every model once, then forks the uvicorn workers.
+Tree node arrays, the XGBoost booster and the isolation forest live in
+memory the workers only read, so the kernel keeps a single copy of those
+pages shared copy-on-write instead of one per worker. The parent runs no
+predictions; each worker warms the models up after the fork. The parent only
+supervises: it restarts workers that die and forwards shutdown signals.
+
+Usage:
+    WORKERS=4 python -m src.prefork
+"""
+import asyncio
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+from typing import Dict
+
+import uvicorn
+
+from src.config import settings
+from src.main import app
+from src.utils.access_log import configure_logging, shutdown_logging
+from src.utils.model_manager import ModelManager
+from src.utils.startup import startup_report
+
+logger = logging.getLogger(__name__)
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    """Open the listening socket shared by all workers."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(sock: socket.socket) -> None:
+    """Serve requests in a forked worker until told to stop."""
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    config = uvicorn.Config(
+        app,
+        log_level=settings.log_level.lower(),
+        access_log=False  # replaced by the sampled JSON access log
+    )
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+
+
+def _fork_worker(sock: socket.socket) -> int:
+    """
+    Fork one worker.
+
+    Logging threads do not survive fork(), so they are stopped around it
+    and restarted on both sides.
+
+    Args:
+        sock: Listening socket
+
+    Returns:
+        Worker pid
+    """
+    shutdown_logging()
+    pid = os.fork()
+    configure_logging(settings.log_level, queue_size=settings.log_queue_size)
+    if pid == 0:
+        code = 0
+        try:
+            _run_worker(sock)
+        except BaseException:
+            logger.error("Worker crashed", exc_info=True)
+            code = 1
+        finally:
+            shutdown_logging()
+            os._exit(code)
+    return pid
+
+
+def serve(workers: int) -> None:
+    """
+    Load the models and run workers sharing them until SIGINT or SIGTERM.
+
+    Args:
+        workers: Number of worker processes
+    """
+    logger.info(f"Pre-fork server: loading models once for {workers} workers (parent pid {os.getpid()})")
+    model_manager = ModelManager()
+    asyncio.run(model_manager.load_models())
+    startup_report.mark('models_loaded')
+
+    # No predictions before fork(): XGBoost's OpenMP thread pool does not
+    # survive it and a worker could deadlock on its first call. Every worker
+    # warms the models up after the fork instead (see the lifespan in main).
+    app.state.preloaded_model_manager = model_manager
+    app.state.prefork_parent = os.getpid()
+
+    sock = _bind(settings.host, settings.port)
+    logger.info(f"Listening on {settings.host}:{settings.port}")
+
+    # Keep the collector from writing to (and so un-sharing) pages of the
+    # loaded model objects in every worker
+    gc.collect()
+    gc.freeze()
+
+    children: Dict[int, int] = {}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for index in range(workers):
+        children[_fork_worker(sock)] = index
+    logger.info(f"Started workers {sorted(children)}")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        index = children.pop(pid, None)
+        if index is None or stopping:
+            continue
+        logger.warning(f"Worker {index} (pid {pid}) exited with status {status}, restarting")
+        children[_fork_worker(sock)] = index
+
+    sock.close()
+    logger.info("Pre-fork server stopped")
+
+
+def main() -> int:
+    """Entry point for `python -m src.prefork`."""
+    if not hasattr(os, "fork"):
+        logger.error("Pre-fork serving needs fork(); run uvicorn directly on this platform")
+        return 1
+    serve(max(1, settings.workers))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
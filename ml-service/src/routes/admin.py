@@ -0,0 +1,230 @@
+"""Admin API routes for runtime profiling and model reloads."""
+import hmac
+import logging
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from src.services.model_reloader import ReloadInProgress
+from src.utils.profiler import StackSampler
+from src.config import MODEL_VERSION_PATTERN, settings
+
+logger = logging.getLogger(__name__)
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Reject the request unless it carries the configured admin token.
+
+    The admin API is disabled (404) while no ADMIN_TOKEN is configured.
+    """
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not hmac.compare_digest(
+        x_admin_token.encode(), settings.admin_token.encode()
+    ):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+def _folded_response(folded: str, filename: str) -> PlainTextResponse:
+    """Serve a collapsed stack profile as a downloadable file."""
+    return PlainTextResponse(
+        folded,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/profile")
+async def profiling_status(http_request: Request):
+    """
+    Get continuous sampler statistics and stored request profiles.
+
+    Returns:
+        Sampler stats, number of armed requests and profile summaries
+    """
+    sampler = getattr(http_request.app.state, "continuous_profiler", None)
+    store = http_request.app.state.profile_store
+
+    return {
+        'continuous': sampler.get_stats() if sampler else {'running': False},
+        'request_header_enabled': settings.enable_request_profiling,
+        'armed_requests': store.armed,
+        'profiles': store.list()
+    }
+
+
+@router.post("/profile/requests")
+async def arm_request_profiling(http_request: Request, count: int = Query(1, ge=0, le=100)):
+    """
+    Profile the next requests, without needing the X-Profile header.
+
+    Args:
+        count: Number of upcoming requests to profile (0 disarms)
+
+    Returns:
+        Number of armed requests
+    """
+    http_request.app.state.profile_store.arm(count)
+    logger.info(f"Profiling the next {count} requests")
+    return {'armed_requests': count}
+
+
+@router.get("/profile/requests/{profile_id}")
+async def download_request_profile(profile_id: str, http_request: Request):
+    """
+    Download one request profile in collapsed stack format.
+
+    Args:
+        profile_id: Id from the X-Profile-Id response header
+
+    Returns:
+        Folded stacks, one "frame;frame count" line per stack
+    """
+    profile = http_request.app.state.profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    return _folded_response(profile['folded'], f"{profile_id}.folded")
+
+
+@router.get("/profile/continuous")
+async def download_continuous_profile(
+    http_request: Request,
+    window_s: Optional[float] = Query(None, gt=0, description="Most recent seconds to include")
+):
+    """
+    Download the rolling aggregated profile in collapsed stack format.
+
+    Args:
+        window_s: Only include the most recent seconds (default: whole window)
+
+    Returns:
+        Folded stacks of all busy threads
+    """
+    sampler = getattr(http_request.app.state, "continuous_profiler", None)
+    if sampler is None:
+        raise HTTPException(status_code=404, detail="Continuous profiling is not running")
+    return _folded_response(sampler.folded(window_s), "continuous.folded")
+
+
+@router.post("/profile/continuous")
+async def toggle_continuous_profiling(http_request: Request, enabled: bool = Query(...)):
+    """
+    Start or stop the continuous sampler at runtime.
+
+    Args:
+        enabled: Whether the sampler should run
+
+    Returns:
+        Sampler statistics
+    """
+    sampler = getattr(http_request.app.state, "continuous_profiler", None)
+    if enabled and sampler is None:
+        sampler = StackSampler(
+            interval_ms=settings.continuous_profile_interval_ms,
+            window_s=settings.continuous_profile_window_s
+        )
+        sampler.start()
+        http_request.app.state.continuous_profiler = sampler
+    elif not enabled and sampler is not None:
+        sampler.stop()
+        http_request.app.state.continuous_profiler = None
+
+    logger.info(f"Continuous profiling {'enabled' if enabled else 'disabled'}")
+    return sampler.get_stats() if sampler else {'running': False}
+
+
+@router.get("/models")
+async def model_reload_status(http_request: Request):
+    """
+    Get the serving model version, reload state and the per-chain models.
+
+    Returns:
+        Serving version and its in-flight requests, versions still
+        draining, the last reload or error, and the model registry
+    """
+    registry = getattr(http_request.app.state, "model_registry", None)
+    return {
+        **http_request.app.state.model_reloader.get_stats(),
+        'registry': registry.get_stats() if registry is not None else None
+    }
+
+
+@router.post("/models/reload")
+async def reload_models(
+    http_request: Request,
+    version: Optional[str] = Query(
+        None, pattern=MODEL_VERSION_PATTERN, description="Version to load, defaults to the serving version"
+    ),
+    wait: bool = Query(False, description="Respond once the new models serve instead of right away")
+):
+    """
+    Load and warm up a model version, then swap it in without downtime.
+
+    The serving models keep answering until the new ones are warm; requests
+    already running finish on the version they started with.
+
+    Args:
+        version: Model version to load
+        wait: Wait for the swap and return its timings
+
+    Returns:
+        202 once the reload has started, or with wait the reload result
+    """
+    reloader = http_request.app.state.model_reloader
+    try:
+        if wait:
+            return await reloader.reload(version)
+        reloader.start(version)
+    except ReloadInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed, still serving the previous models: {e}")
+
+    logger.info(f"Model reload to version {version or 'current'} requested")
+    return JSONResponse(status_code=202, content={'reloading': True, 'version': version})
+
+
+@router.post("/models/shadow")
+async def start_shadow_scoring(
+    http_request: Request,
+    version: str = Query(..., pattern=MODEL_VERSION_PATTERN, description="Candidate model version")
+):
+    """
+    Score sampled live requests with a candidate version, off the request path.
+
+    Args:
+        version: Candidate model version, replaces any current shadow
+
+    Returns:
+        Shadow scoring statistics
+    """
+    model_manager = http_request.app.state.model_manager
+    try:
+        await model_manager.load_shadow(version)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Shadow load error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    return model_manager.shadow.get_stats()
+
+
+@router.delete("/models/shadow")
+async def stop_shadow_scoring(http_request: Request):
+    """
+    Stop shadow scoring and release the candidate models.
+
+    Returns:
+        Final shadow scoring statistics, None if none was running
+    """
+    model_manager = http_request.app.state.model_manager
+    shadow = model_manager.shadow
+    model_manager.stop_shadow()
+    return {'stopped': shadow.get_stats() if shadow is not None else None}
@@ -1,13 +1,78 @@
 """Metrics API routes."""
 import logging
+import os
+from typing import Any, Dict
 from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 from datetime import datetime
 
 from src.schemas import MetricsResponse, ModelMetrics
+from src.routes.predict import feature_engineer
+from src.utils.memory import memory_report, process_memory
+from src.utils.metrics_registry import FEEDBACK, PREDICTIONS, registry
+from src.utils.route_timing import InstrumentedRoute
+from src.utils.startup import startup_report
 from src.config import settings
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Component statistics, refreshed from app state on every scrape
+_RUNTIME = registry.gauge(
+    "zappay_ml_runtime",
+    "Inference executor, event loop and batcher state.",
+    ("component", "stat")
+)
+_CACHE = registry.gauge(
+    "zappay_ml_cache",
+    "Feature and prediction cache statistics.",
+    ("cache", "stat")
+)
+_MEMORY = registry.gauge(
+    "zappay_ml_process_memory_mb",
+    "Memory of this worker process in MiB: rss, pss, shared (with the pre-fork parent and siblings) and unique.",
+    ("kind",)
+)
+
+
+def _runtime_stats(app) -> Dict[str, Any]:
+    """Collect inference executor, admission, ensemble member, event loop and reload statistics."""
+    runtime = {}
+    executor = getattr(app.state, "inference_executor", None)
+    if executor:
+        runtime['inference_executor'] = executor.get_stats()
+    member_pool = getattr(app.state, "member_pool", None)
+    if member_pool:
+        runtime['ensemble_members'] = member_pool.get_stats()
+    admission_controller = getattr(app.state, "admission_controller", None)
+    if admission_controller:
+        runtime['admission'] = admission_controller.get_stats()
+    loop_monitor = getattr(app.state, "loop_monitor", None)
+    if loop_monitor:
+        runtime['event_loop_lag_ms'] = loop_monitor.get_stats()
+    access_logger = getattr(app.state, "access_logger", None)
+    if access_logger:
+        runtime['access_log'] = access_logger.get_stats()
+    model_reloader = getattr(app.state, "model_reloader", None)
+    if model_reloader:
+        runtime['model_reload'] = model_reloader.get_stats()
+    model_registry = getattr(app.state, "model_registry", None)
+    if model_registry:
+        runtime['model_registry'] = model_registry.get_stats()
+    return runtime
+
+
+def _cache_stats(app) -> Dict[str, Any]:
+    """Collect feature and prediction cache statistics."""
+    caches = {}
+    prediction_cache = getattr(app.state, "prediction_cache", None)
+    if prediction_cache is not None:
+        caches['predictions'] = prediction_cache.get_stats()
+    if feature_engineer.feature_cache is not None:
+        caches['features'] = feature_engineer.feature_cache.get_stats()
+    return caches
 
 
 @router.get("/", response_model=MetricsResponse)
@@ -36,7 +101,7 @@ async def get_metrics(http_request: Request):
             # Random Forest metrics
             rf_metrics = ModelMetrics(
                 model_name="Random Forest",
-                version=settings.model_version,
+                version=model_manager.model_version,
                 accuracy=metrics_data.get('rf_accuracy', 0),
                 precision=metrics_data.get('rf_precision', 0),
                 recall=metrics_data.get('rf_recall', 0),
@@ -50,7 +115,7 @@ async def get_metrics(http_request: Request):
             # XGBoost metrics
             xgb_metrics = ModelMetrics(
                 model_name="XGBoost",
-                version=settings.model_version,
+                version=model_manager.model_version,
                 accuracy=metrics_data.get('xgb_accuracy', 0),
                 precision=metrics_data.get('xgb_precision', 0),
                 recall=metrics_data.get('xgb_recall', 0),
@@ -66,13 +131,22 @@ async def get_metrics(http_request: Request):
         # TODO: Get isolation forest metrics
         # TODO: Get prediction/feedback counts from database
 
+        batcher = getattr(http_request.app.state, "prediction_batcher", None)
+        tier_selector = getattr(http_request.app.state, "tier_selector", None)
+
         return MetricsResponse(
             random_forest=rf_metrics,
             xgboost=xgb_metrics,
             isolation_forest=None,  # TODO
             ensemble_accuracy=ensemble_accuracy,
-            total_predictions=0,  # TODO: Track this
-            total_feedback=0,  # TODO: Track this
+            total_predictions=int(PREDICTIONS.total()),
+            total_feedback=int(FEEDBACK.total()),
+            batching=batcher.get_stats() if batcher else None,
+            runtime=_runtime_stats(http_request.app),
+            cascade=fraud_detector.get_cascade_stats(),
+            cache=_cache_stats(http_request.app),
+            tiers=tier_selector.get_stats() if tier_selector else None,
+            shadow=model_manager.shadow.get_stats() if model_manager.shadow is not None else None,
             timestamp=datetime.now()
         )
 
@@ -83,13 +157,73 @@ async def get_metrics(http_request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _refresh_gauges(app) -> None:
+    """Copy numeric component statistics into the gauge families."""
+    runtime = _runtime_stats(app)
+    for component in ('inference_executor', 'admission', 'event_loop_lag_ms', 'access_log', 'model_registry'):
+        for stat, value in runtime.get(component, {}).items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                _RUNTIME.labels(component, stat).set(value)
+
+    batcher = getattr(app.state, "prediction_batcher", None)
+    if batcher:
+        for stat, value in batcher.get_stats().items():
+            if isinstance(value, (int, float)):
+                _RUNTIME.labels('batcher', stat).set(value)
+
+    model_manager = getattr(app.state, "model_manager", None)
+    if model_manager is not None and model_manager.shadow is not None:
+        for stat, value in model_manager.shadow.get_stats().items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                _RUNTIME.labels('shadow', stat).set(value)
+
+    for cache, stats in _cache_stats(app).items():
+        for stat, value in stats.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                _CACHE.labels(cache, stat).set(value)
+
+    memory = process_memory(os.getpid())
+    if memory is not None:
+        for kind in ('rss_mb', 'pss_mb', 'shared_mb', 'unique_mb'):
+            _MEMORY.labels(kind[:-3]).set(memory[kind])
+
+
+async def prometheus_metrics(http_request: Request):
+    """
+    Export request, stage and component metrics for Prometheus.
+
+    Returns:
+        Metrics in Prometheus text exposition format
+    """
+    _refresh_gauges(http_request.app)
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@router.get("/memory")
+async def memory_usage(http_request: Request):
+    """
+    Report unique versus shared memory of every worker.
+
+    Under the pre-fork server the parent and all workers are listed; model
+    pages loaded before forking show up as shared rather than unique.
+
+    Returns:
+        Per-process rss, pss, shared and unique MiB, and group totals
+    """
+    try:
+        return memory_report(getattr(http_request.app.state, "prefork_parent", None))
+    except Exception as e:
+        logger.error(f"Memory report error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/health")
 async def health_check(http_request: Request):
     """
     Detailed health check with model status.
 
     Returns:
-        Health status with model info
+        Health status with model info and startup timings
     """
     try:
         model_manager = http_request.app.state.model_manager
@@ -97,8 +231,10 @@ async def health_check(http_request: Request):
 
         return {
             **status,
+            "runtime": _runtime_stats(http_request.app),
+            "startup": startup_report.get_report(),
             "service": "ml-service",
-            "version": settings.model_version,
+            "version": model_manager.model_version,
             "env": settings.env
         }
 
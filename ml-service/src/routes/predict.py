@@ -1,29 +1,575 @@
 """Prediction API routes."""
+import asyncio
+import functools
+import hashlib
+import json
 import logging
+import re
 import time
-import pandas as pd
-from fastapi import APIRouter, HTTPException, Request
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, Response
 from datetime import datetime
 
+import numpy as np
+from pydantic import ValidationError
+from starlette.requests import ClientDisconnect
+
 from src.schemas import (
     PredictRequest, PredictionResponse,
+    BatchPredictRequest, BatchPredictionResponse, BatchPredictionItem,
+    FullPredictRequest, FullPredictionResponse,
+    StreamPredictionItem, StreamSummary,
     ExplainRequest, ExplainResponse,
     AnomalyDetectionRequest, AnomalyDetectionResponse,
     TransactionPredictionRequest, TransactionPredictionResponse,
     FeatureImportance
 )
 from src.services.feature_engineering import FeatureEngineer
-from src.config import settings
+from src.services.inference_executor import InferenceQueueFull
+from src.services.model_registry import ModelNotFound
+from src.services import columnar
+from src.services.ndjson_stream import NDJSONStreamingResponse, iter_ndjson_lines
+from src.utils.metrics_registry import PREDICTIONS, time_stage
+from src.utils.route_timing import InstrumentedRoute
+from src.config import MODEL_VERSION_PATTERN, settings
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
+
+# How long a stream waits before retrying when the inference queue is full
+_STREAM_RETRY_S = 0.05
 
 # Initialize feature engineer
 feature_engineer = FeatureEngineer()
 
 
+def _validate_features(
+    features: Optional[Dict[str, Any]],
+    feature_names: List[str]
+) -> Optional[str]:
+    """
+    Check that a feature dict can be fed to the models.
+
+    Args:
+        features: Features supplied with the request
+        feature_names: Features the models were trained on
+
+    Returns:
+        Error message, or None if the features are usable
+    """
+    if not features:
+        return "Features must be provided. Wallet data fetching not yet implemented."
+
+    missing = [name for name in feature_names if name not in features]
+    if missing:
+        shown = ", ".join(missing[:5])
+        more = f" (and {len(missing) - 5} more)" if len(missing) > 5 else ""
+        return f"Missing features: {shown}{more}"
+
+    for name in feature_names:
+        if not isinstance(features[name], (int, float)):
+            return f"Feature '{name}' must be numeric"
+
+    return None
+
+
+async def _model_manager(http_request: Request, *chain_ids: int):
+    """
+    Models serving a request.
+
+    The serving models are pinned when the request starts (see the
+    pin_models middleware). A chain with models of its own, or another
+    version asked for through X-Model-Version, is routed by the model
+    registry; the request then holds a lease on those models until its
+    response is ready.
+
+    Args:
+        http_request: Incoming request
+        *chain_ids: Chains of the request's wallets, else the X-Chain-Id header
+
+    Returns:
+        ModelManager for the request
+    """
+    model_manager = getattr(http_request.state, "model_manager", None) or http_request.app.state.model_manager
+    registry = getattr(http_request.app.state, "model_registry", None)
+    if registry is None:
+        return model_manager
+
+    version = http_request.headers.get("x-model-version")
+    if version and not re.fullmatch(MODEL_VERSION_PATTERN, version):
+        raise HTTPException(status_code=400, detail="X-Model-Version is not a valid model version")
+    if not chain_ids:
+        header = http_request.headers.get("x-chain-id")
+        if header is None and not version:
+            return model_manager
+        try:
+            chain_ids = (int(header),) if header is not None else (None,)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="X-Chain-Id must be an integer")
+
+    try:
+        keys = {registry.resolve(chain_id, version) for chain_id in chain_ids}
+    except ModelNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if len(keys) > 1:
+        raise HTTPException(
+            status_code=400,
+            detail="Wallets in one request are scored by different models, split the request by chain_id"
+        )
+    try:
+        routed = await registry.get(keys.pop(), serving=model_manager)
+    except ModelNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    leases = getattr(http_request.state, "model_leases", None)
+    if routed is not model_manager and leases is not None:
+        leases.enter_context(routed.lease())
+    return routed
+
+
+def _shadow(background_tasks: BackgroundTasks, model_manager, kind: str, records: List[Dict[str, Any]], served: List[Tuple]) -> None:
+    """
+    Re-score sampled predictions with the shadow models once the response is sent.
+
+    Args:
+        background_tasks: Tasks FastAPI runs after sending the response
+        model_manager: ModelManager that served the predictions
+        kind: 'fraud' or 'anomaly'
+        records: Feature dicts of the served predictions
+        served: Per record, (fraud_probability,) or (anomaly_score, is_anomaly)
+    """
+    shadow = model_manager.shadow
+    if shadow is not None and records and shadow.sample():
+        background_tasks.add_task(shadow.enqueue, kind, records, served)
+
+
+def _cache_key(
+    kind: str,
+    request,
+    model_version: str,
+    feature_names: List[str]
+) -> Tuple:
+    """
+    Build the prediction cache key for a wallet.
+
+    Args:
+        kind: Result type ('fraud' or 'anomaly')
+        request: Request with wallet_address, chain_id and validated features
+        model_version: Cache version of the models producing the result
+        feature_names: Features the models read, in order
+
+    Returns:
+        Key of (kind, wallet, chain_id, model version, feature hash)
+    """
+    values = np.array([request.features[name] for name in feature_names], dtype=np.float64)
+    feature_hash = hashlib.blake2b(values.tobytes(), digest_size=16).hexdigest()
+    return (kind, request.wallet_address.lower(), request.chain_id, model_version, feature_hash)
+
+
+async def _run_inference(http_request: Request, fn, *args) -> Any:
+    """
+    Run CPU-bound model work on the inference executor.
+
+    Args:
+        http_request: Incoming request (for app state)
+        fn: Callable doing the model work
+        *args: Arguments for fn
+
+    Returns:
+        Return value of fn
+    """
+    executor = getattr(http_request.app.state, "inference_executor", None)
+    if executor is None:
+        return fn(*args)
+
+    try:
+        return await executor.run(fn, *args)
+    except InferenceQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+def _queue_pressure(app) -> float:
+    """Fill level (0-1) of the fullest wait queue in front of inference."""
+    pressure = 0.0
+    executor = getattr(app.state, "inference_executor", None)
+    if executor is not None and executor.max_queue_depth:
+        pressure = max(pressure, executor.queued / executor.max_queue_depth)
+    admission_controller = getattr(app.state, "admission_controller", None)
+    if admission_controller is not None and admission_controller.max_queue:
+        pressure = max(pressure, admission_controller.queued / admission_controller.max_queue)
+    return min(pressure, 1.0)
+
+
+def _choose_tier(http_request: Request, fraud_detector) -> str:
+    """
+    Pick the fraud inference tier from the request deadline and queue pressure.
+
+    Args:
+        http_request: Incoming request; its deadline is set by admission control
+        fraud_detector: FraudDetector, for the tiers it can serve
+
+    Returns:
+        'full', 'xgboost' or 'fallback'
+    """
+    selector = getattr(http_request.app.state, "tier_selector", None)
+    if selector is None:
+        return 'full'
+
+    deadline = getattr(http_request.state, "deadline", None)
+    remaining_s = deadline - time.monotonic() if deadline is not None else None
+    return selector.choose(
+        http_request.url.path,
+        remaining_s,
+        _queue_pressure(http_request.app),
+        fraud_detector.available_tiers
+    )
+
+
+def _observe_tier(http_request: Request, tier: str, started: float, count: int = 1) -> None:
+    """Record the cost of an inference call made at a tier."""
+    selector = getattr(http_request.app.state, "tier_selector", None)
+    if selector is not None:
+        selector.observe(http_request.url.path, tier, time.perf_counter() - started, count)
+
+
+async def _cached_results(cache, keys: List[Tuple], score, tier: str) -> List[Any]:
+    """
+    Get results through the prediction cache.
+
+    Degraded results are never stored, so they cannot be served later in
+    place of full ones; degraded requests still use full results already
+    held in this process.
+
+    Args:
+        cache: PredictionCache
+        keys: Cache keys
+        score: Coroutine computing results for positions in keys
+        tier: Inference tier score computes fraud results at
+
+    Returns:
+        Results in the order of keys
+    """
+    if tier == 'full':
+        return await cache.get_or_compute(keys, score)
+
+    results = cache.peek(keys)
+    missing = [i for i, value in enumerate(results) if value is None]
+    if missing:
+        for i, value in zip(missing, await score(missing)):
+            results[i] = value
+    return results
+
+
+def _anomaly_result(anomaly_detector, X: np.ndarray) -> Dict[str, Any]:
+    """Run anomaly detection and explanation on one laid-out row."""
+    predictions, scores, X_scaled = anomaly_detector.score(X)
+    explanations = anomaly_detector.explain_anomaly(X, X_scaled=X_scaled)
+
+    return {
+        'is_anomaly': bool(predictions[0] == -1),
+        'anomaly_score': float(scores[0]),
+        'anomaly_reasons': explanations[0]['anomaly_reasons'] if explanations else []
+    }
+
+
+def _detect_anomaly(anomaly_detector, features: Dict[str, Any]) -> Dict[str, Any]:
+    """Run anomaly detection and explanation for one wallet."""
+    X = anomaly_detector.vectorize([features])
+    return _anomaly_result(anomaly_detector, X)
+
+
+def _layout(fraud_detector, anomaly_detector, records: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Lay out features once for both the anomaly and the fraud models.
+
+    Args:
+        fraud_detector: FraudDetector
+        anomaly_detector: AnomalyDetector
+        records: Validated feature dicts
+
+    Returns:
+        Tuple of (float64 anomaly matrix, float32 fraud matrix)
+    """
+    X = anomaly_detector.vectorize(records)
+    if fraud_detector.feature_names == anomaly_detector.feature_names:
+        return X, X.astype(np.float32)
+    return X, fraud_detector.vectorize(records).copy()
+
+
+def _score_full(
+    fraud_detector,
+    anomaly_detector,
+    explainer,
+    features: Dict[str, Any],
+    kinds: List[str],
+    top_k: int,
+    tier: str = 'full'
+) -> Dict[str, Any]:
+    """
+    Score one wallet with several models from a single feature layout.
+
+    Features are laid out once and scaled once; the fraud models and the
+    explainer read a float32 copy of the same row. Models run concurrently
+    when an ensemble member pool is configured.
+
+    Args:
+        fraud_detector: FraudDetector
+        anomaly_detector: AnomalyDetector
+        explainer: ModelExplainer, only used when top_k > 0
+        features: Validated feature dictionary
+        kinds: Results to compute ('fraud' and/or 'anomaly')
+        top_k: Number of SHAP contributions to explain, 0 for none
+        tier: Fraud inference tier
+
+    Returns:
+        Dictionary with the requested 'fraud' (probability, model path),
+        'anomaly' result and 'explanation'
+    """
+    X, X_fraud = _layout(fraud_detector, anomaly_detector, [features])
+
+    tasks = {}
+    if 'fraud' in kinds:
+        tasks['fraud'] = functools.partial(fraud_detector.predict_proba, X_fraud, return_path=True, tier=tier)
+    if 'anomaly' in kinds:
+        tasks['anomaly'] = lambda: _anomaly_result(anomaly_detector, X)
+    if top_k:
+        tasks['explanation'] = lambda: explainer.explain(X_fraud, top_n=top_k)[0]
+
+    member_pool = fraud_detector.member_pool
+    if member_pool is not None:
+        results = member_pool.run(tasks)
+    else:
+        results = {name: task() for name, task in tasks.items()}
+
+    if 'fraud' in results:
+        fraud_probas, paths = results['fraud']
+        results['fraud'] = (float(fraud_probas[0]), str(paths[0]))
+    return results
+
+
+def _score_stream_chunk(fraud_detector, anomaly_detector, records: List[Dict[str, Any]]) -> Tuple:
+    """
+    Score one chunk of a bulk stream with the fraud and anomaly models.
+
+    Args:
+        fraud_detector: FraudDetector
+        anomaly_detector: AnomalyDetector
+        records: Validated feature dicts
+
+    Returns:
+        Tuple of (fraud probabilities, model paths, anomaly labels, anomaly scores)
+    """
+    X, X_fraud = _layout(fraud_detector, anomaly_detector, records)
+    fraud_probas, paths = fraud_detector.predict_proba(X_fraud, return_path=True)
+    predictions, scores, _ = anomaly_detector.score(X)
+    return fraud_probas, paths, predictions, scores
+
+
+def _score_columnar(fraud_detector, anomaly_detector, X_fraud: np.ndarray, X_anomaly: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Score a columnar feature matrix with the fraud and anomaly models.
+
+    Args:
+        fraud_detector: FraudDetector
+        anomaly_detector: AnomalyDetector
+        X_fraud: Matrix in fraud_detector.feature_names order
+        X_anomaly: Matrix in anomaly_detector.feature_names order
+
+    Returns:
+        Result columns keyed by name
+    """
+    fraud_probas = fraud_detector.predict_proba(np.asarray(X_fraud, dtype=np.float32))
+    predictions, scores, _ = anomaly_detector.score(X_anomaly)
+    return {
+        'fraud_probability': np.asarray(fraud_probas, dtype=np.float64),
+        'anomaly_score': scores,
+        'is_anomaly': predictions == -1
+    }
+
+
+def _read_and_score_columnar(read, body: bytes, fraud_detector, anomaly_detector) -> Dict[str, np.ndarray]:
+    """
+    Map a columnar body onto the models' features and score it.
+
+    Args:
+        read: Callable mapping (body, feature_names) to a feature matrix
+        body: Request body
+        fraud_detector: FraudDetector
+        anomaly_detector: AnomalyDetector
+
+    Returns:
+        Result columns keyed by name
+    """
+    with time_stage('feature_layout'):
+        X_fraud = read(body, fraud_detector.feature_names)
+        if anomaly_detector.feature_names == fraud_detector.feature_names:
+            X_anomaly = X_fraud
+        else:
+            X_anomaly = read(body, anomaly_detector.feature_names)
+    return _score_columnar(fraud_detector, anomaly_detector, X_fraud, X_anomaly)
+
+
+def _parse_stream_record(
+    index: int,
+    line: Optional[bytes],
+    feature_names: List[List[str]]
+) -> Tuple[StreamPredictionItem, Optional[Dict[str, Any]]]:
+    """
+    Parse and validate one NDJSON record.
+
+    Args:
+        index: Position of the record in the stream
+        line: Raw JSON line, None if it was too long
+        feature_names: Feature lists of every model the record is scored by
+
+    Returns:
+        Tuple of (result item, features), features being None when the
+        item already carries an error
+    """
+    if line is None:
+        return StreamPredictionItem(
+            index=index,
+            error=f"Record exceeds {settings.stream_max_line_bytes} bytes"
+        ), None
+
+    try:
+        record = PredictRequest.model_validate_json(line)
+    except ValidationError as e:
+        return StreamPredictionItem(index=index, error=f"Invalid record: {e.errors()[0]['msg']}"), None
+
+    item = StreamPredictionItem(index=index, wallet_address=record.wallet_address.lower())
+    for names in feature_names:
+        error = _validate_features(record.features, names)
+        if error:
+            item.error = error
+            return item, None
+
+    return item, record.features
+
+
+async def _stream_predictions(
+    http_request: Request,
+    fraud_detector,
+    anomaly_detector,
+    lines: AsyncIterator[Optional[bytes]],
+    model_version: str
+) -> AsyncIterator[bytes]:
+    """
+    Score NDJSON records chunk by chunk and yield NDJSON results.
+
+    The next chunk is only read once the previous results were handed to
+    the server, so memory stays at one chunk whatever the stream length.
+
+    Args:
+        http_request: Incoming request (for app state)
+        fraud_detector: FraudDetector
+        anomaly_detector: AnomalyDetector
+        lines: Record lines from iter_ndjson_lines
+        model_version: Version of the models, for the summary line
+
+    Yields:
+        NDJSON result lines, one chunk at a time, then a StreamSummary line
+    """
+    start_time = time.time()
+    feature_names = [fraud_detector.feature_names]
+    if anomaly_detector.feature_names != fraud_detector.feature_names:
+        feature_names.append(anomaly_detector.feature_names)
+
+    total = succeeded = 0
+    error = None
+    items: List[StreamPredictionItem] = []
+    rows: List[Dict[str, Any]] = []
+    positions: List[int] = []
+
+    async def flush() -> bytes:
+        if rows:
+            while True:
+                try:
+                    fraud_probas, paths, predictions, scores = await _run_inference(
+                        http_request, _score_stream_chunk, fraud_detector, anomaly_detector, rows
+                    )
+                    break
+                except HTTPException as e:
+                    # A bulk job should yield to interactive traffic, not fail
+                    if e.status_code != 503:
+                        raise
+                    await asyncio.sleep(_STREAM_RETRY_S)
+
+            for j, position in enumerate(positions):
+                item = items[position]
+                for name, value in _fraud_scores(float(fraud_probas[j]), str(paths[j])).items():
+                    setattr(item, name, value)
+                item.is_anomaly = bool(predictions[j] == -1)
+                item.anomaly_score = float(scores[j])
+
+        with time_stage('serialization'):
+            chunk = "".join(item.model_dump_json() + "\n" for item in items)
+        PREDICTIONS.labels('fraud').inc(len(rows))
+        PREDICTIONS.labels('anomaly').inc(len(rows))
+        items.clear()
+        rows.clear()
+        positions.clear()
+        return chunk.encode()
+
+    try:
+        async for line in lines:
+            item, features = _parse_stream_record(total, line, feature_names)
+            total += 1
+            if features is not None:
+                positions.append(len(items))
+                rows.append(features)
+                succeeded += 1
+            items.append(item)
+
+            if len(items) >= settings.stream_chunk_size:
+                yield await flush()
+
+        if items:
+            yield await flush()
+
+    except ClientDisconnect:
+        logger.info(f"Prediction stream client disconnected after {total} records")
+        return
+    except Exception as e:
+        logger.error(f"Prediction stream error: {e}", exc_info=True)
+        error = e.detail if isinstance(e, HTTPException) else str(e)
+        succeeded -= len(rows)
+
+    summary = StreamSummary(
+        total=total,
+        succeeded=succeeded,
+        failed=total - succeeded,
+        error=error,
+        model_version=model_version,
+        processing_time_ms=(time.time() - start_time) * 1000
+    )
+    yield (summary.model_dump_json() + "\n").encode()
+
+
+def _fraud_scores(fraud_proba: float, model_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Derive risk score, label and confidence from a fraud probability.
+
+    Args:
+        fraud_proba: Ensemble fraud probability (0-1)
+        model_path: Models that produced the probability
+
+    Returns:
+        Dictionary with fraud_probability, risk_score, is_fraud, confidence,
+        model_path
+    """
+    # High confidence when probability is close to 0 or 1
+    return {
+        'fraud_probability': float(fraud_proba),
+        'risk_score': int(fraud_proba * 100),
+        'is_fraud': bool(fraud_proba >= 0.5),
+        'confidence': float(abs(fraud_proba - 0.5) * 2),
+        'model_path': model_path
+    }
+
+
 @router.post("/", response_model=PredictionResponse)
-async def predict_fraud(request: PredictRequest, http_request: Request):
+async def predict_fraud(request: PredictRequest, http_request: Request, background_tasks: BackgroundTasks):
     """
     Predict fraud probability for a wallet.
 
@@ -37,7 +583,7 @@ async def predict_fraud(request: PredictRequest, http_request: Request):
 
     try:
         # Get model manager from app state
-        model_manager = http_request.app.state.model_manager
+        model_manager = await _model_manager(http_request, request.chain_id)
 
         if not model_manager.is_ready():
             raise HTTPException(
@@ -45,41 +591,288 @@ async def predict_fraud(request: PredictRequest, http_request: Request):
                 detail="Models not loaded. Please train models first."
             )
 
+        # Get fraud detector
+        fraud_detector = model_manager.get_fraud_detector()
+
         # Get features
-        if request.features:
-            features = request.features
+        # TODO: Fetch wallet data from blockchain and extract features
+        error = _validate_features(request.features, fraud_detector.feature_names)
+        if error:
+            raise HTTPException(status_code=400, detail=error)
+
+        tier = _choose_tier(http_request, fraud_detector)
+        served_tier = 'full'
+
+        async def score(_) -> List[Tuple[float, str]]:
+            nonlocal served_tier
+            started = time.perf_counter()
+
+            # Predict, coalescing with concurrent requests when batching is enabled
+            batcher = getattr(http_request.app.state, "prediction_batcher", None)
+            if batcher and tier == 'full':
+                try:
+                    # Scored by this request's pinned models, even across a reload
+                    result = await batcher.submit(request.features, fraud_detector)
+                except InferenceQueueFull as e:
+                    raise HTTPException(status_code=503, detail=str(e))
+            else:
+                fraud_probas, paths = await _run_inference(
+                    http_request, fraud_detector.predict_proba_records, [request.features], True, tier
+                )
+                result = (float(fraud_probas[0]), str(paths[0]))
+
+            _observe_tier(http_request, tier, started)
+            served_tier = tier
+            return [result]
+
+        # Checkout retries score the same wallet repeatedly
+        cache = getattr(http_request.app.state, "prediction_cache", None)
+        if cache is not None:
+            cache_key = _cache_key(
+                'fraud', request, model_manager.cache_version, fraud_detector.feature_names
+            )
+            [(fraud_proba, model_path)] = await _cached_results(cache, [cache_key], score, tier)
         else:
-            # TODO: Fetch wallet data from blockchain and extract features
-            # For now, return error
+            [(fraud_proba, model_path)] = await score([0])
+        PREDICTIONS.labels('fraud').inc()
+        if served_tier == 'full':
+            _shadow(background_tasks, model_manager, 'fraud', [request.features], [(fraud_proba,)])
+
+        processing_time = (time.time() - start_time) * 1000
+
+        return PredictionResponse(
+            wallet_address=request.wallet_address.lower(),
+            **_fraud_scores(fraud_proba, model_path),
+            inference_tier=served_tier,
+            model_version=model_manager.model_version,
+            timestamp=datetime.now(),
+            processing_time_ms=processing_time
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Prediction error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/batch", response_model=BatchPredictionResponse)
+async def predict_fraud_batch(request: BatchPredictRequest, http_request: Request, background_tasks: BackgroundTasks):
+    """
+    Predict fraud probability for many wallets in one vectorized pass.
+
+    Wallets with invalid features are reported individually and do not
+    fail the rest of the batch.
+
+    Args:
+        request: Batch prediction request
+
+    Returns:
+        Per-wallet predictions in request order
+    """
+    start_time = time.time()
+
+    try:
+        model_manager = await _model_manager(http_request, *{item.chain_id for item in request.wallets})
+
+        if not model_manager.is_ready():
+            raise HTTPException(status_code=503, detail="Models not loaded")
+
+        if len(request.wallets) > settings.max_batch_size:
             raise HTTPException(
-                status_code=400,
-                detail="Features must be provided. Wallet data fetching not yet implemented."
+                status_code=413,
+                detail=f"Batch too large: {len(request.wallets)} wallets, max is {settings.max_batch_size}"
             )
 
-        # Convert features to DataFrame
-        features_df = pd.DataFrame([features])
+        fraud_detector = model_manager.get_fraud_detector()
+
+        results: List[Optional[BatchPredictionItem]] = [None] * len(request.wallets)
+        valid_indices: List[int] = []
+        valid_rows: List[Dict[str, Any]] = []
+
+        for i, item in enumerate(request.wallets):
+            error = _validate_features(item.features, fraud_detector.feature_names)
+            if error:
+                results[i] = BatchPredictionItem(
+                    index=i,
+                    wallet_address=item.wallet_address.lower(),
+                    error=error
+                )
+            else:
+                valid_indices.append(i)
+                valid_rows.append(item.features)
+
+        tier = _choose_tier(http_request, fraud_detector)
+        scored_at_tier = set()
+
+        async def score(positions: List[int]) -> List[Tuple[float, str]]:
+            # Score all requested wallets with a single predict_proba call
+            started = time.perf_counter()
+            fraud_probas, paths = await _run_inference(
+                http_request,
+                fraud_detector.predict_proba_records,
+                [valid_rows[j] for j in positions],
+                True,
+                tier
+            )
+            _observe_tier(http_request, tier, started, len(positions))
+            scored_at_tier.update(positions)
+            return [(float(proba), str(path)) for proba, path in zip(fraud_probas, paths)]
+
+        if valid_rows:
+            # Only wallets missing from the cache are scored
+            cache = getattr(http_request.app.state, "prediction_cache", None)
+            if cache is not None:
+                cache_keys = [
+                    _cache_key('fraud', request.wallets[i], model_manager.cache_version,
+                               fraud_detector.feature_names)
+                    for i in valid_indices
+                ]
+                scores = await _cached_results(cache, cache_keys, score, tier)
+            else:
+                scores = await score(list(range(len(valid_rows))))
+            PREDICTIONS.labels('fraud').inc(len(valid_rows))
+
+            for j, (i, (fraud_proba, model_path)) in enumerate(zip(valid_indices, scores)):
+                results[i] = BatchPredictionItem(
+                    index=i,
+                    wallet_address=request.wallets[i].wallet_address.lower(),
+                    **_fraud_scores(fraud_proba, model_path),
+                    inference_tier=tier if j in scored_at_tier else 'full'
+                )
+
+            # Degraded results would compare the shadow against a cheaper model
+            full = [j for j in range(len(valid_rows)) if tier == 'full' or j not in scored_at_tier]
+            _shadow(
+                background_tasks, model_manager, 'fraud',
+                [valid_rows[j] for j in full], [(scores[j][0],) for j in full]
+            )
+
+        processing_time = (time.time() - start_time) * 1000
+
+        return BatchPredictionResponse(
+            results=results,
+            total=len(results),
+            succeeded=len(valid_rows),
+            failed=len(results) - len(valid_rows),
+            model_version=model_manager.model_version,
+            timestamp=datetime.now(),
+            processing_time_ms=processing_time
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Batch prediction error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/full", response_model=FullPredictionResponse)
+async def predict_full(request: FullPredictRequest, http_request: Request, background_tasks: BackgroundTasks):
+    """
+    Predict fraud and anomaly, and optionally explain, in one call.
+
+    Features are validated, laid out and scaled once and shared by every
+    model, instead of once per endpoint.
+
+    Args:
+        request: Full prediction request
+
+    Returns:
+        Fraud prediction, anomaly detection and optional top-k explanation
+    """
+    start_time = time.time()
+
+    try:
+        model_manager = await _model_manager(http_request, request.chain_id)
+
+        if not model_manager.is_ready():
+            raise HTTPException(status_code=503, detail="Models not loaded")
 
-        # Get fraud detector
         fraud_detector = model_manager.get_fraud_detector()
+        anomaly_detector = model_manager.get_anomaly_detector()
+
+        for feature_names in (fraud_detector.feature_names, anomaly_detector.feature_names):
+            error = _validate_features(request.features, feature_names)
+            if error:
+                raise HTTPException(status_code=400, detail=error)
+
+        explainer = None
+        if request.explain_top_k:
+            if model_manager.explainer is None:
+                raise HTTPException(status_code=503, detail="Explainer not available")
+            explainer = model_manager.get_explainer()
+
+        kinds = ['fraud', 'anomaly']
+        explanation = None
+        tier = _choose_tier(http_request, fraud_detector)
+        served_tier = 'full'
+
+        async def score(positions: List[int]) -> List[Any]:
+            nonlocal explanation, served_tier
+            wanted = [kinds[i] for i in positions]
+            started = time.perf_counter()
+            results = await _run_inference(
+                http_request, _score_full, fraud_detector, anomaly_detector, explainer,
+                request.features, wanted, request.explain_top_k, tier
+            )
+            if 'fraud' in wanted:
+                _observe_tier(http_request, tier, started)
+                served_tier = tier
+            explanation = results.get('explanation')
+            return [results[kind] for kind in wanted]
+
+        # Cached fraud and anomaly results are shared with the single endpoints
+        cache = getattr(http_request.app.state, "prediction_cache", None)
+        if cache is not None:
+            cache_keys = [
+                _cache_key('fraud', request, model_manager.cache_version, fraud_detector.feature_names),
+                _cache_key('anomaly', request, model_manager.cache_version, anomaly_detector.feature_names)
+            ]
+            fraud_result, anomaly_result = await _cached_results(cache, cache_keys, score, tier)
+        else:
+            fraud_result, anomaly_result = await score([0, 1])
+        PREDICTIONS.labels('fraud').inc()
+        PREDICTIONS.labels('anomaly').inc()
+        if served_tier == 'full':
+            _shadow(background_tasks, model_manager, 'fraud', [request.features], [fraud_result[:1]])
+        _shadow(
+            background_tasks, model_manager, 'anomaly', [request.features],
+            [(anomaly_result['anomaly_score'], anomaly_result['is_anomaly'])]
+        )
 
-        # Predict
-        fraud_proba = fraud_detector.predict_proba(features_df)[0]
-        risk_score = int(fraud_proba * 100)
-        is_fraud = fraud_proba >= 0.5
+        # Both results came from the cache, explanations are not cached
+        if request.explain_top_k and explanation is None:
+            results = await _run_inference(
+                http_request, _score_full, fraud_detector, anomaly_detector, explainer,
+                request.features, [], request.explain_top_k
+            )
+            explanation = results['explanation']
 
-        # Calculate confidence (based on prediction probability)
-        # High confidence when probability is close to 0 or 1
-        confidence = abs(fraud_proba - 0.5) * 2
+        feature_contributions = None
+        top_risk_factors = None
+        if explanation is not None:
+            feature_contributions = [
+                FeatureImportance(
+                    feature_name=feature['feature'],
+                    importance=feature['abs_contribution'],
+                    shap_value=feature['shap_value']
+                )
+                for feature in explanation['top_features']
+            ]
+            top_risk_factors = explanation['risk_factors']
 
         processing_time = (time.time() - start_time) * 1000
 
-        return PredictionResponse(
+        return FullPredictionResponse(
             wallet_address=request.wallet_address.lower(),
-            fraud_probability=float(fraud_proba),
-            risk_score=risk_score,
-            is_fraud=bool(is_fraud),
-            confidence=float(confidence),
-            model_version=settings.model_version,
+            **_fraud_scores(*fraud_result),
+            inference_tier=served_tier,
+            **anomaly_result,
+            anomaly_threshold=float(anomaly_detector.threshold),
+            feature_contributions=feature_contributions,
+            top_risk_factors=top_risk_factors,
+            model_version=model_manager.model_version,
             timestamp=datetime.now(),
             processing_time_ms=processing_time
         )
@@ -87,7 +880,171 @@ async def predict_fraud(request: PredictRequest, http_request: Request):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Prediction error: {e}", exc_info=True)
+        logger.error(f"Full prediction error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/stream", response_class=NDJSONStreamingResponse)
+async def predict_stream(http_request: Request):
+    """
+    Score a newline-delimited JSON stream of wallets.
+
+    Each body line is a prediction request ({"wallet_address", "chain_id",
+    "features"}). Records are scored by the fraud and anomaly models in
+    chunks as they arrive and each result is streamed back as one NDJSON
+    line in input order, followed by a summary line. Results bypass the
+    prediction cache so bulk re-scoring does not evict interactive entries.
+
+    Returns:
+        NDJSON stream of StreamPredictionItem lines and a StreamSummary line
+    """
+    model_manager = await _model_manager(http_request)
+
+    if not model_manager.is_ready():
+        raise HTTPException(status_code=503, detail="Models not loaded")
+
+    fraud_detector = model_manager.get_fraud_detector()
+    anomaly_detector = model_manager.get_anomaly_detector()
+
+    body_read = asyncio.Event()
+    lines = iter_ndjson_lines(http_request, settings.stream_max_line_bytes, body_read)
+    return NDJSONStreamingResponse(
+        _stream_predictions(http_request, fraud_detector, anomaly_detector, lines, model_manager.model_version),
+        body_read=body_read
+    )
+
+
+def _body_too_large(n_bytes: int) -> str:
+    """413 detail for a columnar body over COLUMNAR_MAX_BODY_MB."""
+    return f"Body of {n_bytes} bytes is over {settings.columnar_max_body_mb:g} MB"
+
+
+async def _read_body(http_request: Request, max_bytes: int) -> bytes:
+    """
+    Read a request body, stopping as soon as it grows past max_bytes.
+
+    Args:
+        http_request: Incoming request
+        max_bytes: Largest accepted body
+
+    Returns:
+        Body bytes
+
+    Raises:
+        HTTPException: 413 once the body is over max_bytes
+    """
+    chunks = []
+    received = 0
+    async for chunk in http_request.stream():
+        received += len(chunk)
+        if received > max_bytes:
+            raise HTTPException(status_code=413, detail=_body_too_large(received))
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _check_columnar_rows(n_rows: int) -> None:
+    """Reject a columnar request of more than COLUMNAR_MAX_ROWS rows."""
+    if n_rows > settings.columnar_max_rows:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many rows: {n_rows}, max is {settings.columnar_max_rows}"
+        )
+
+
+@router.post("/columnar", response_class=Response)
+async def predict_columnar(http_request: Request):
+    """
+    Score a whole feature matrix sent as columnar binary data.
+
+    The body is either an Arrow IPC stream (Content-Type
+    application/vnd.apache.arrow.stream) with one numeric column per
+    feature, or a raw little-endian float32 row-major matrix
+    (application/octet-stream) whose column names are given as a JSON
+    array in the X-Feature-Columns header. Columns are mapped onto the
+    models' feature order without building per-value Python objects.
+
+    The response uses the request format: an Arrow IPC stream, or
+    consecutive little-endian float64 column blocks named in the
+    X-Result-Columns header. Columns are fraud_probability, anomaly_score
+    and is_anomaly; risk score, label and confidence follow from the
+    probability as in /api/predict.
+
+    Returns:
+        Columnar scores, one row per input row
+    """
+    start_time = time.time()
+
+    try:
+        model_manager = await _model_manager(http_request)
+
+        if not model_manager.is_ready():
+            raise HTTPException(status_code=503, detail="Models not loaded")
+
+        fraud_detector = model_manager.get_fraud_detector()
+        anomaly_detector = model_manager.get_anomaly_detector()
+
+        media_type = http_request.headers.get("content-type", "").split(";")[0].strip()
+        if media_type == columnar.ARROW_STREAM_MEDIA_TYPE:
+            def read(body, feature_names):
+                return columnar.read_arrow_matrix(body, feature_names)
+        elif media_type == columnar.RAW_MEDIA_TYPE:
+            columns = columnar.parse_column_header(http_request.headers.get("x-feature-columns"))
+
+            def read(body, feature_names):
+                return columnar.read_raw_matrix(body, columns, feature_names)
+        else:
+            raise HTTPException(
+                status_code=415,
+                detail=f"Content-Type must be {columnar.ARROW_STREAM_MEDIA_TYPE} or {columnar.RAW_MEDIA_TYPE}"
+            )
+
+        # Reject oversized bodies before reading them
+        max_bytes = int(settings.columnar_max_body_mb * 2**20)
+        content_length = http_request.headers.get("content-length")
+        if content_length is not None:
+            try:
+                content_length = int(content_length)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid Content-Length")
+            if content_length > max_bytes:
+                raise HTTPException(status_code=413, detail=_body_too_large(content_length))
+            if media_type == columnar.RAW_MEDIA_TYPE:
+                _check_columnar_rows(columnar.raw_row_count(content_length, columns))
+
+        # Chunked bodies carry no Content-Length, so the cap is enforced while reading
+        body = await _read_body(http_request, max_bytes)
+        # Row count from the body size or Arrow batch metadata, nothing is decoded yet
+        if media_type == columnar.RAW_MEDIA_TYPE:
+            n_rows = columnar.raw_row_count(len(body), columns)
+        else:
+            n_rows = columnar.arrow_row_count(body)
+        _check_columnar_rows(n_rows)
+
+        results = await _run_inference(
+            http_request, _read_and_score_columnar, read, body, fraud_detector, anomaly_detector
+        )
+
+        PREDICTIONS.labels('fraud').inc(n_rows)
+        PREDICTIONS.labels('anomaly').inc(n_rows)
+
+        headers = {'X-Model-Version': model_manager.model_version}
+        with time_stage('serialization'):
+            if media_type == columnar.ARROW_STREAM_MEDIA_TYPE:
+                content = columnar.write_arrow(results)
+            else:
+                content = columnar.write_raw(results)
+                headers['X-Result-Columns'] = json.dumps(list(results))
+        headers['X-Processing-Time-Ms'] = f"{(time.time() - start_time) * 1000:.3f}"
+
+        return Response(content, media_type=media_type, headers=headers)
+
+    except columnar.ColumnarFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Columnar prediction error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -103,7 +1060,7 @@ async def explain_prediction(request: ExplainRequest, http_request: Request):
         Prediction with feature contributions
     """
     try:
-        model_manager = http_request.app.state.model_manager
+        model_manager = await _model_manager(http_request, request.chain_id)
 
         if not model_manager.is_ready():
             raise HTTPException(status_code=503, detail="Models not loaded")
@@ -122,7 +1079,7 @@ async def explain_prediction(request: ExplainRequest, http_request: Request):
 
 
 @router.post("/anomaly", response_model=AnomalyDetectionResponse)
-async def detect_anomaly(request: AnomalyDetectionRequest, http_request: Request):
+async def detect_anomaly(request: AnomalyDetectionRequest, http_request: Request, background_tasks: BackgroundTasks):
     """
     Detect if wallet behavior is anomalous.
 
@@ -133,7 +1090,7 @@ async def detect_anomaly(request: AnomalyDetectionRequest, http_request: Request
         Anomaly detection result
     """
     try:
-        model_manager = http_request.app.state.model_manager
+        model_manager = await _model_manager(http_request, request.chain_id)
 
         if not model_manager.is_ready():
             raise HTTPException(status_code=503, detail="Models not loaded")
@@ -147,27 +1104,32 @@ async def detect_anomaly(request: AnomalyDetectionRequest, http_request: Request
                 detail="Features must be provided"
             )
 
-        # Convert to DataFrame
-        features_df = pd.DataFrame([features])
-
         # Get anomaly detector
         anomaly_detector = model_manager.get_anomaly_detector()
 
-        # Predict
-        predictions, scores = anomaly_detector.predict(features_df)
-        is_anomaly = predictions[0] == -1
-        anomaly_score = float(scores[0])
+        error = _validate_features(features, anomaly_detector.feature_names)
+        if error:
+            raise HTTPException(status_code=400, detail=error)
+
+        async def detect(_) -> List[Dict[str, Any]]:
+            # Predict and explain
+            return [await _run_inference(http_request, _detect_anomaly, anomaly_detector, features)]
 
-        # Get explanation
-        explanations = anomaly_detector.explain_anomaly(features_df)
-        reasons = explanations[0]['anomaly_reasons'] if explanations else []
+        cache = getattr(http_request.app.state, "prediction_cache", None)
+        if cache is not None:
+            cache_key = _cache_key(
+                'anomaly', request, model_manager.cache_version, anomaly_detector.feature_names
+            )
+            [result] = await cache.get_or_compute([cache_key], detect)
+        else:
+            [result] = await detect([0])
+        PREDICTIONS.labels('anomaly').inc()
+        _shadow(background_tasks, model_manager, 'anomaly', [features], [(result['anomaly_score'], result['is_anomaly'])])
 
         return AnomalyDetectionResponse(
             wallet_address=request.wallet_address.lower(),
-            is_anomaly=bool(is_anomaly),
-            anomaly_score=anomaly_score,
+            **result,
             anomaly_threshold=float(anomaly_detector.threshold),
-            anomaly_reasons=reasons,
             timestamp=datetime.now()
         )
 
@@ -193,7 +1155,7 @@ async def predict_transaction_behavior(
         Transaction behavior prediction
     """
     try:
-        model_manager = http_request.app.state.model_manager
+        model_manager = await _model_manager(http_request, request.chain_id)
 
         if not model_manager.is_ready():
             raise HTTPException(status_code=503, detail="Models not loaded")
@@ -8,10 +8,12 @@ from src.schemas import (
     RetrainRequest, RetrainResponse
 )
 from src.services.trainer import TrainingService
+from src.utils.metrics_registry import FEEDBACK
+from src.utils.route_timing import InstrumentedRoute
 from src.config import settings
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
 # Initialize training service
 training_service = TrainingService()
@@ -38,6 +40,7 @@ async def submit_feedback(request: FeedbackRequest):
             notes=request.notes,
             merchant_id=request.merchant_id
         )
+        FEEDBACK.labels().inc()
 
         # Check if we should retrain
         feedback_count = await training_service.get_feedback_count()
@@ -12,6 +12,19 @@ class PredictRequest(BaseModel):
     features: Optional[Dict[str, Any]] = Field(None, description="Pre-computed features (optional)")
 
 
+class BatchPredictRequest(BaseModel):
+    """Request model for batch fraud prediction."""
+    wallets: List[PredictRequest] = Field(..., min_length=1, description="Wallets to score, in order")
+
+
+class FullPredictRequest(BaseModel):
+    """Request for fraud, anomaly and explanation in one call."""
+    wallet_address: str = Field(..., description="Ethereum wallet address to analyze")
+    chain_id: int = Field(default=84532, description="Blockchain chain ID")
+    features: Optional[Dict[str, Any]] = Field(None, description="Pre-computed features")
+    explain_top_k: int = Field(default=0, ge=0, le=50, description="Top SHAP contributions to return (0 = no explanation)")
+
+
 class ExplainRequest(BaseModel):
     """Request for explainable prediction."""
     wallet_address: str
@@ -63,6 +76,77 @@ class PredictionResponse(BaseModel):
     risk_score: int = Field(..., ge=0, le=100, description="Risk score (0-100)")
     is_fraud: bool = Field(..., description="Binary classification")
     confidence: float = Field(..., ge=0, le=1, description="Prediction confidence")
+    model_path: Optional[str] = Field(None, description="Models that produced the probability: ensemble, xgboost, random_forest or fallback")
+    inference_tier: Optional[str] = Field(None, description="Tier chosen under load: full, xgboost or fallback")
+    model_version: str
+    timestamp: datetime
+    processing_time_ms: float
+
+
+class BatchPredictionItem(BaseModel):
+    """Per-wallet result within a batch prediction."""
+    index: int = Field(..., description="Position of the wallet in the request")
+    wallet_address: str
+    fraud_probability: Optional[float] = Field(None, ge=0, le=1)
+    risk_score: Optional[int] = Field(None, ge=0, le=100)
+    is_fraud: Optional[bool] = None
+    confidence: Optional[float] = Field(None, ge=0, le=1)
+    model_path: Optional[str] = None
+    inference_tier: Optional[str] = None
+    error: Optional[str] = Field(None, description="Why this wallet could not be scored")
+
+
+class BatchPredictionResponse(BaseModel):
+    """Response model for batch fraud prediction."""
+    results: List[BatchPredictionItem] = Field(..., description="Results in request order")
+    total: int
+    succeeded: int
+    failed: int
+    model_version: str
+    timestamp: datetime
+    processing_time_ms: float
+
+
+class StreamPredictionItem(BaseModel):
+    """One NDJSON result line of a streamed bulk prediction."""
+    index: int = Field(..., description="Line number of the record in the request body (0-based, blank lines skipped)")
+    wallet_address: Optional[str] = None
+    fraud_probability: Optional[float] = Field(None, ge=0, le=1)
+    risk_score: Optional[int] = Field(None, ge=0, le=100)
+    is_fraud: Optional[bool] = None
+    confidence: Optional[float] = Field(None, ge=0, le=1)
+    model_path: Optional[str] = None
+    is_anomaly: Optional[bool] = None
+    anomaly_score: Optional[float] = None
+    error: Optional[str] = Field(None, description="Why this record could not be scored")
+
+
+class StreamSummary(BaseModel):
+    """Last NDJSON line of a streamed bulk prediction."""
+    done: bool = Field(True, description="Marks the summary line; missing if the stream was cut short")
+    total: int
+    succeeded: int
+    failed: int
+    error: Optional[str] = Field(None, description="Why the stream stopped early")
+    model_version: str
+    processing_time_ms: float
+
+
+class FullPredictionResponse(BaseModel):
+    """Response with fraud, anomaly and optional explanation for one wallet."""
+    wallet_address: str
+    fraud_probability: float = Field(..., ge=0, le=1, description="Probability of fraud (0-1)")
+    risk_score: int = Field(..., ge=0, le=100, description="Risk score (0-100)")
+    is_fraud: bool = Field(..., description="Binary classification")
+    confidence: float = Field(..., ge=0, le=1, description="Prediction confidence")
+    model_path: Optional[str] = Field(None, description="Models that produced the probability: ensemble, xgboost, random_forest or fallback")
+    inference_tier: Optional[str] = Field(None, description="Tier chosen under load: full, xgboost or fallback")
+    is_anomaly: bool
+    anomaly_score: float = Field(..., description="Higher = more anomalous")
+    anomaly_threshold: float
+    anomaly_reasons: List[str] = Field(..., description="Why flagged as anomaly")
+    feature_contributions: Optional[List[FeatureImportance]] = Field(None, description="Top SHAP contributions, if requested")
+    top_risk_factors: Optional[List[str]] = Field(None, description="Human-readable risk factors, if requested")
     model_version: str
     timestamp: datetime
     processing_time_ms: float
@@ -130,6 +214,12 @@ class MetricsResponse(BaseModel):
     ensemble_accuracy: Optional[float] = None
     total_predictions: int
     total_feedback: int
+    batching: Optional[Dict[str, Any]] = Field(None, description="Request coalescing statistics")
+    runtime: Optional[Dict[str, Any]] = Field(None, description="Inference executor, ensemble member and event loop statistics")
+    cascade: Optional[Dict[str, Any]] = Field(None, description="Cascade inference settings and path counts")
+    cache: Optional[Dict[str, Any]] = Field(None, description="Feature and prediction cache statistics")
+    tiers: Optional[Dict[str, Any]] = Field(None, description="Inference tier totals, costs and per-minute mix")
+    shadow: Optional[Dict[str, Any]] = Field(None, description="Shadow version score deltas and disagreement rates")
     timestamp: datetime
 
 
@@ -0,0 +1,175 @@
+"""Admission control for prediction requests.
+
+A concurrency limit with a bounded FIFO wait queue sits in front of the
+interactive prediction routes. Requests that would wait too long, or that
+cannot finish before the caller's deadline given recent service times, are
+rejected up front instead of computing results nobody is waiting for.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from src.utils.metrics_registry import REQUESTS_SHED, record_stage
+
+# Weight of the newest observation in the service time averages
+_EWMA_ALPHA = 0.2
+
+
+def _smooth(previous: Optional[float], value: float) -> float:
+    """Exponentially weighted moving average step."""
+    return value if previous is None else previous + _EWMA_ALPHA * (value - previous)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of admitted."""
+
+    def __init__(self, reason: str, retry_after_s: int, message: str):
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after_s = retry_after_s
+
+
+class AdmissionController:
+    """Concurrency limiter with a bounded wait queue and deadline shedding.
+
+    Only used from the event loop thread, so no locking is needed.
+    """
+
+    def __init__(self, max_concurrent: int = 32, max_queue: int = 64):
+        """
+        Initialize controller.
+
+        Args:
+            max_concurrent: Requests processed at the same time
+            max_queue: Requests allowed to wait for a slot before new ones
+                are rejected
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+        # Smoothed service time in seconds, overall and per route
+        self._service_s: Optional[float] = None
+        self._route_service_s: Dict[str, float] = {}
+
+        # Statistics
+        self.admitted = 0
+        self.shed: Dict[str, int] = {'queue_full': 0, 'deadline': 0}
+        for reason in self.shed:
+            REQUESTS_SHED.labels(reason)
+
+    @property
+    def queued(self) -> int:
+        """Number of requests waiting for a slot."""
+        return len(self._waiters)
+
+    def _expected_service_s(self, route: str) -> float:
+        """Smoothed service time of a route, falling back to all routes."""
+        return self._route_service_s.get(route, self._service_s or 0.0)
+
+    def _expected_wait_s(self, position: int) -> float:
+        """Rough wait for the request at a queue position to get a slot."""
+        return position * (self._service_s or 0.0) / self.max_concurrent
+
+    def retry_after_s(self) -> int:
+        """Seconds a rejected caller should wait, for the Retry-After header."""
+        return max(1, math.ceil(self._expected_wait_s(self.queued + 1)))
+
+    def _reject(self, reason: str, message: str) -> AdmissionRejected:
+        self.shed[reason] += 1
+        REQUESTS_SHED.labels(reason).inc()
+        return AdmissionRejected(reason, self.retry_after_s(), message)
+
+    def _release(self) -> None:
+        """Hand the slot to the next waiter, or free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+    @asynccontextmanager
+    async def admit(
+        self,
+        route: str,
+        deadline: Optional[float] = None,
+        min_service_s: Optional[float] = None
+    ) -> AsyncIterator[None]:
+        """
+        Hold a processing slot for the duration of the block.
+
+        Args:
+            route: Request path, for per-route service times
+            deadline: time.monotonic() by which the caller needs the
+                response, None to wait as long as the queue allows
+            min_service_s: Cheapest way the route can serve the request,
+                if it can degrade; caps the expected service time
+
+        Raises:
+            AdmissionRejected: If the queue is full or the request cannot
+                finish before its deadline
+        """
+        arrived = time.monotonic()
+        service_s = self._expected_service_s(route)
+        if min_service_s is not None:
+            service_s = min(service_s, min_service_s)
+        if deadline is not None and arrived + service_s > deadline:
+            raise self._reject('deadline', "Request deadline is too short to finish")
+
+        if self._in_flight < self.max_concurrent and not self._waiters:
+            self._in_flight += 1
+        else:
+            if len(self._waiters) >= self.max_queue:
+                raise self._reject(
+                    'queue_full', f"Service overloaded ({self.max_queue} requests waiting), try again later"
+                )
+            finish = arrived + self._expected_wait_s(len(self._waiters) + 1) + service_s
+            if deadline is not None and finish > deadline:
+                raise self._reject('deadline', "Request would not finish before its deadline")
+
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            timeout = deadline - service_s - arrived if deadline is not None else None
+            try:
+                await asyncio.wait_for(waiter, timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                if waiter.done() and not waiter.cancelled():
+                    # The slot was handed over just as we gave up
+                    self._release()
+                else:
+                    try:
+                        self._waiters.remove(waiter)
+                    except ValueError:
+                        pass
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+                raise self._reject('deadline', "Request deadline passed while queued")
+            record_stage('admission_wait', time.monotonic() - arrived)
+
+        self.admitted += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            self._route_service_s[route] = _smooth(self._route_service_s.get(route), elapsed)
+            self._service_s = _smooth(self._service_s, elapsed)
+            self._release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get admission statistics."""
+        return {
+            'max_concurrent': self.max_concurrent,
+            'max_queue': self.max_queue,
+            'in_flight': self._in_flight,
+            'queued': self.queued,
+            'admitted': self.admitted,
+            'shed_queue_full': self.shed['queue_full'],
+            'shed_deadline': self.shed['deadline'],
+            'service_time_ms': (self._service_s or 0.0) * 1000
+        }
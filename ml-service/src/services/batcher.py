@@ -0,0 +1,251 @@
+"""Micro-batching request coalescer for fraud predictions.
+
+Concurrent single-wallet requests are held for a short window and scored
+together, so the fixed per-call cost of the RF + XGBoost ensemble is paid
+once per batch instead of once per wallet. Every request is scored by the
+fraud detector it was submitted with, so requests pinned to a model version
+that a reload has since replaced still finish on that version.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.services.inference_executor import InferenceQueueFull
+
+logger = logging.getLogger(__name__)
+
+# (features, fraud detector to score them with, future of the result, enqueue time)
+QueuedItem = Tuple[Dict[str, Any], Any, asyncio.Future, float]
+
+
+class PredictionBatcher:
+    """Coalesce concurrent fraud predictions into one ensemble call."""
+
+    def __init__(
+        self,
+        model_manager,
+        executor,
+        window_ms: float = 5.0,
+        max_batch_size: int = 64,
+        stats_window: int = 1000
+    ):
+        """
+        Initialize batcher.
+
+        Args:
+            model_manager: ModelManager providing the fraud detector for
+                requests submitted without one
+            executor: InferenceExecutor that runs the ensemble
+            window_ms: Maximum time to hold a batch open for more requests
+            max_batch_size: Flush as soon as this many requests are queued
+            stats_window: Number of recent batches kept for statistics
+        """
+        self.model_manager = model_manager
+        self.executor = executor
+        self.window_s = window_ms / 1000
+        self.max_batch_size = max_batch_size
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._scoring: Set[asyncio.Task] = set()
+        # Requests taken off the queue for the batch being collected
+        self._collecting: List[QueuedItem] = []
+
+        # Moving average of achieved batch sizes, drives the adaptive window
+        self._avg_batch_size = 1.0
+
+        # Statistics
+        self.total_batches = 0
+        self.total_items = 0
+        self._batch_sizes: deque = deque(maxlen=stats_window)
+        self._queue_delays_ms: deque = deque(maxlen=stats_window)
+
+    def start(self) -> None:
+        """Start the background batching loop."""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Prediction batching enabled (window={self.window_s * 1000:.1f}ms, "
+            f"max_batch={self.max_batch_size})"
+        )
+
+    async def stop(self) -> None:
+        """Stop the batching loop and fail every request not answered yet."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        # Batches being scored fail their own requests once cancelled
+        scoring = list(self._scoring)
+        for task in scoring:
+            task.cancel()
+        await asyncio.gather(*scoring, return_exceptions=True)
+
+        pending = self._collecting
+        self._collecting = []
+        while self._queue and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        self._fail_pending(pending)
+
+    @staticmethod
+    def _fail_pending(batch: List[QueuedItem]) -> None:
+        """Fail the requests of a batch that have no result yet."""
+        for _, _, future, _ in batch:
+            if not future.done():
+                future.set_exception(RuntimeError("Prediction batcher stopped"))
+
+    async def submit(self, features: Dict[str, Any], fraud_detector=None) -> Tuple[float, str]:
+        """
+        Queue one wallet for scoring and wait for its result.
+
+        Args:
+            features: Validated feature dictionary
+            fraud_detector: FraudDetector of the models the request is pinned
+                to, the batcher's current models if None
+
+        Returns:
+            Tuple of (fraud probability (0-1), model path)
+        """
+        if self._queue is None:
+            raise RuntimeError("Prediction batcher not started")
+
+        if fraud_detector is None:
+            fraud_detector = self.model_manager.get_fraud_detector()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((features, fraud_detector, future, time.perf_counter()))
+        return await future
+
+    def current_window(self) -> float:
+        """
+        Get the collection window in seconds.
+
+        Batches of one gain nothing from waiting, so the window stays closed
+        while requests arrive alone and opens up to the configured maximum
+        as concurrent requests start to coalesce.
+
+        Returns:
+            Window in seconds
+        """
+        fill = min(1.0, max(0.0, self._avg_batch_size - 1.0))
+        return self.window_s * fill
+
+    async def _collect(self) -> List[QueuedItem]:
+        """Wait for the next batch of queued requests."""
+        # Kept on the instance so stop() can fail it if cancelled mid-collection
+        batch = self._collecting = []
+        batch.append(await self._queue.get())
+
+        # Take everything already waiting
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+        # Hold the batch open for stragglers
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.current_window()
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        self._collecting = []
+        return batch
+
+    async def _run(self) -> None:
+        """Batching loop."""
+        while True:
+            batch = await self._collect()
+            # Score in the background so the next batch can start collecting
+            task = asyncio.create_task(self._score(batch))
+            self._scoring.add(task)
+            task.add_done_callback(self._scoring.discard)
+
+    async def _score(self, batch: List[QueuedItem]) -> None:
+        """Score a batch and fan the results out to the waiting requests."""
+        try:
+            await self._score_batch(batch)
+        finally:
+            # Cancelled by stop(): nothing else would answer these requests
+            self._fail_pending(batch)
+
+    async def _score_batch(self, batch: List[QueuedItem]) -> None:
+        """Run the ensemble on a batch and resolve its futures."""
+        flush_time = time.perf_counter()
+        for _, _, _, enqueued in batch:
+            self._queue_delays_ms.append((flush_time - enqueued) * 1000)
+
+        self.total_batches += 1
+        self.total_items += len(batch)
+        self._batch_sizes.append(len(batch))
+        self._avg_batch_size = 0.8 * self._avg_batch_size + 0.2 * len(batch)
+
+        # Requests straddling a reload are pinned to different models
+        groups: Dict[int, List[QueuedItem]] = {}
+        for item in batch:
+            groups.setdefault(id(item[1]), []).append(item)
+        await asyncio.gather(*[self._score_group(group) for group in groups.values()])
+
+    async def _score_group(self, batch: List[QueuedItem]) -> None:
+        """Score requests sharing one fraud detector and resolve their futures."""
+        try:
+            fraud_detector = batch[0][1]
+            fraud_probas, paths = await self.executor.run(
+                fraud_detector.predict_proba_records,
+                [features for features, _, _, _ in batch],
+                return_path=True
+            )
+        except Exception as e:
+            if isinstance(e, InferenceQueueFull):
+                logger.warning(f"Rejected batch of {len(batch)} requests: {e}")
+            else:
+                logger.error(f"Batched prediction failed for {len(batch)} requests: {e}", exc_info=True)
+            for _, _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, _, future, _), fraud_proba, path in zip(batch, fraud_probas, paths):
+            # Skip requests whose client already went away
+            if not future.done():
+                future.set_result((float(fraud_proba), str(path)))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batching statistics."""
+        stats = {
+            'window_ms': self.window_s * 1000,
+            'current_window_ms': self.current_window() * 1000,
+            'max_batch_size': self.max_batch_size,
+            'total_batches': self.total_batches,
+            'total_requests': self.total_items,
+            'avg_batch_size': self.total_items / self.total_batches if self.total_batches else 0.0,
+            'queued': self._queue.qsize() if self._queue else 0
+        }
+
+        if self._batch_sizes:
+            sizes = np.fromiter(self._batch_sizes, dtype=float)
+            stats['recent_batch_size'] = {
+                'p50': float(np.percentile(sizes, 50)),
+                'p99': float(np.percentile(sizes, 99)),
+                'max': float(sizes.max())
+            }
+
+        if self._queue_delays_ms:
+            delays = np.fromiter(self._queue_delays_ms, dtype=float)
+            stats['recent_queue_delay_ms'] = {
+                'p50': float(np.percentile(delays, 50)),
+                'p99': float(np.percentile(delays, 99)),
+                'max': float(delays.max())
+            }
+
+        return stats
@@ -0,0 +1,187 @@
+"""Columnar request and response encoding for bulk scoring.
+
+Offline callers send whole feature matrices as an Arrow IPC stream or as a
+raw little-endian float32 buffer, which are mapped onto the model's feature
+order with NumPy column copies instead of one Python object per value.
+"""
+import json
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow is optional, raw buffers work without it
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+RAW_MEDIA_TYPE = "application/octet-stream"
+
+
+class ColumnarFormatError(ValueError):
+    """Raised when a columnar payload cannot be mapped onto the model features."""
+
+
+def _feature_positions(columns: List[str], feature_names: List[str]) -> List[int]:
+    """Position of every model feature among the payload columns."""
+    positions = {name: i for i, name in enumerate(columns)}
+    missing = [name for name in feature_names if name not in positions]
+    if missing:
+        shown = ", ".join(missing[:5])
+        more = f" (and {len(missing) - 5} more)" if len(missing) > 5 else ""
+        raise ColumnarFormatError(f"Missing features: {shown}{more}")
+    return [positions[name] for name in feature_names]
+
+
+def parse_column_header(header: Optional[str]) -> List[str]:
+    """
+    Parse the column names sent with a raw matrix.
+
+    Names are a JSON array because several feature names have leading or
+    trailing spaces, which plain HTTP header values would lose.
+
+    Args:
+        header: JSON array of column names, in matrix column order
+
+    Returns:
+        Column names
+    """
+    if not header:
+        raise ColumnarFormatError("X-Feature-Columns header is required for raw matrices")
+    try:
+        columns = json.loads(header)
+    except ValueError as e:
+        raise ColumnarFormatError(f"X-Feature-Columns is not valid JSON: {e}")
+    if not isinstance(columns, list) or not all(isinstance(name, str) for name in columns):
+        raise ColumnarFormatError("X-Feature-Columns must be a JSON array of strings")
+    return columns
+
+
+def raw_row_count(body_bytes: int, columns: List[str]) -> int:
+    """
+    Number of rows of a raw matrix, from its size alone.
+
+    Args:
+        body_bytes: Body length, e.g. from Content-Length
+        columns: Column names in matrix order
+
+    Returns:
+        Whole float32 rows the body holds
+    """
+    if not columns:
+        raise ColumnarFormatError("X-Feature-Columns must name at least one column")
+    return body_bytes // (4 * len(columns))
+
+
+def arrow_row_count(body: bytes) -> int:
+    """
+    Number of rows of an Arrow IPC stream, from its record batch metadata.
+
+    Batches are zero-copy views of body, so no column is decoded.
+
+    Args:
+        body: Arrow IPC stream
+
+    Returns:
+        Rows over all record batches
+    """
+    if pa is None:
+        raise ColumnarFormatError("Arrow payloads require pyarrow, send a raw float32 matrix instead")
+    try:
+        return sum(batch.num_rows for batch in pa.ipc.open_stream(pa.py_buffer(body)))
+    except pa.ArrowInvalid as e:
+        raise ColumnarFormatError(f"Invalid Arrow IPC stream: {e}")
+
+
+def read_raw_matrix(body: bytes, columns: List[str], feature_names: List[str]) -> np.ndarray:
+    """
+    Map a raw little-endian float32 row-major matrix onto the model features.
+
+    Args:
+        body: n_rows * len(columns) float32 values
+        columns: Column names in matrix order
+        feature_names: Features the model reads, in order
+
+    Returns:
+        float32 matrix of shape (n_rows, len(feature_names)); a read-only
+        view of body when the columns already are feature_names
+    """
+    row_bytes = 4 * len(columns)
+    if not columns or len(body) % row_bytes:
+        raise ColumnarFormatError(
+            f"Body of {len(body)} bytes is not a whole number of {len(columns)}-column float32 rows"
+        )
+
+    matrix = np.frombuffer(body, dtype='<f4').reshape(-1, len(columns))
+    if columns == feature_names:
+        return matrix
+    return matrix[:, _feature_positions(columns, feature_names)]
+
+
+def read_arrow_matrix(body: bytes, feature_names: List[str]) -> np.ndarray:
+    """
+    Map the numeric columns of an Arrow IPC stream onto the model features.
+
+    Args:
+        body: Arrow IPC stream with one column per feature (extra columns
+            are ignored)
+        feature_names: Features the model reads, in order
+
+    Returns:
+        float64 matrix of shape (n_rows, len(feature_names))
+    """
+    if pa is None:
+        raise ColumnarFormatError("Arrow payloads require pyarrow, send a raw float32 matrix instead")
+
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except pa.ArrowInvalid as e:
+        raise ColumnarFormatError(f"Invalid Arrow IPC stream: {e}")
+
+    positions = _feature_positions(table.column_names, feature_names)
+    matrix = np.empty((table.num_rows, len(feature_names)), dtype=np.float64)
+    for j, position in enumerate(positions):
+        column = table.column(position)
+        if column.null_count:
+            raise ColumnarFormatError(f"Feature '{feature_names[j]}' has {column.null_count} nulls")
+        if not (pa.types.is_floating(column.type) or pa.types.is_integer(column.type)):
+            raise ColumnarFormatError(f"Feature '{feature_names[j]}' must be numeric, got {column.type}")
+        # Chunks are copied straight into the matrix column
+        row = 0
+        for chunk in column.chunks:
+            matrix[row:row + len(chunk), j] = chunk.to_numpy(zero_copy_only=False)
+            row += len(chunk)
+    return matrix
+
+
+def write_raw(columns: Dict[str, np.ndarray]) -> bytes:
+    """
+    Encode result columns as consecutive little-endian float64 blocks.
+
+    Args:
+        columns: Equal-length result arrays keyed by name
+
+    Returns:
+        len(columns) blocks of n_rows float64 values, in columns order
+    """
+    return b"".join(np.asarray(values, dtype='<f8').tobytes() for values in columns.values())
+
+
+def write_arrow(columns: Dict[str, np.ndarray]) -> bytes:
+    """
+    Encode result columns as an Arrow IPC stream with a single record batch.
+
+    Args:
+        columns: Equal-length result arrays keyed by name
+
+    Returns:
+        Arrow IPC stream bytes
+    """
+    batch = pa.record_batch([pa.array(values) for values in columns.values()], names=list(columns))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
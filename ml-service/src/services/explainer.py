@@ -1,9 +1,15 @@
-"""SHAP-based explainability for fraud detection models."""
+"""SHAP-based explainability for fraud detection models.
+
+shap takes seconds to import and is only needed once an explanation is
+requested, so it is imported on first use rather than at startup.
+"""
 import logging
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Any, Optional
-import shap
+from typing import Dict, List, Any, Optional, Union
+
+from src.utils.metrics_registry import time_stage
+from src.utils.startup import startup_report
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +27,7 @@ class ModelExplainer:
         """
         self.model = model
         self.feature_names = feature_names
-        self.explainer: Optional[shap.Explainer] = None
+        self.explainer: Optional[Any] = None  # shap.Explainer
 
     def initialize(self, X_background: Optional[pd.DataFrame] = None) -> None:
         """
@@ -31,6 +37,7 @@ class ModelExplainer:
             X_background: Background dataset for SHAP (optional, uses sample if None)
         """
         logger.info("Initializing SHAP explainer...")
+        shap = startup_report.import_module('shap')
 
         try:
             # Try TreeExplainer for tree-based models (faster)
@@ -45,39 +52,52 @@ class ModelExplainer:
             background_sample = shap.sample(X_background, min(100, len(X_background)))
 
             def model_predict(X):
-                return self.model.predict_proba(pd.DataFrame(X, columns=self.feature_names))[:, 1]
+                # Loaded models were stripped of their column names, see strip_feature_names
+                if hasattr(self.model, 'feature_names_in_'):
+                    X = pd.DataFrame(X, columns=self.feature_names)
+                return self.model.predict_proba(X)[:, 1]
 
             self.explainer = shap.KernelExplainer(model_predict, background_sample)
             logger.info("Using KernelExplainer")
 
     def explain(
         self,
-        X: pd.DataFrame,
+        X: Union[pd.DataFrame, np.ndarray],
         top_n: int = 10
     ) -> List[Dict[str, Any]]:
         """
         Explain predictions using SHAP values.
 
         Args:
-            X: Features to explain
+            X: Features to explain, as a DataFrame or an array in
+                feature_names order
             top_n: Number of top features to return
 
         Returns:
             List of explanations for each sample
         """
         if self.explainer is None:
-            raise ValueError("Explainer not initialized. Call initialize() first.")
+            # Tree models need no background data
+            self.initialize()
 
         # Ensure features match
-        X = X[self.feature_names]
+        if isinstance(X, pd.DataFrame):
+            X = X[self.feature_names].to_numpy()
 
         # Calculate SHAP values
-        logger.info(f"Calculating SHAP values for {len(X)} samples...")
-        shap_values = self.explainer.shap_values(X)
+        logger.debug(f"Calculating SHAP values for {len(X)} samples...")
+        with time_stage('shap'):
+            shap_values = self.explainer.shap_values(X)
 
         # If shap_values is a list (multi-class), take fraud class
         if isinstance(shap_values, list):
             shap_values = shap_values[1]  # Fraud class
+        elif shap_values.ndim == 3:
+            shap_values = shap_values[:, :, 1]  # (samples, features, classes)
+
+        base_value = getattr(self.explainer, 'expected_value', 0.5)
+        if np.ndim(base_value) > 0:
+            base_value = base_value[1]
 
         # Create explanations
         explanations = []
@@ -91,7 +111,7 @@ class ModelExplainer:
                 contribution = {
                     'feature': feature_name,
                     'shap_value': float(sample_shap_values[j]),
-                    'feature_value': float(X.iloc[i][feature_name]),
+                    'feature_value': float(X[i, j]),
                     'abs_contribution': abs(float(sample_shap_values[j]))
                 }
                 feature_contributions.append(contribution)
@@ -115,7 +135,7 @@ class ModelExplainer:
                 'index': i,
                 'top_features': top_features,
                 'risk_factors': reasons,
-                'base_value': float(self.explainer.expected_value) if hasattr(self.explainer, 'expected_value') else 0.5
+                'base_value': float(base_value)
             })
 
         return explanations
@@ -9,6 +9,9 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 
+from src.services.cache import TTLCache
+from src.config import settings
+
 logger = logging.getLogger(__name__)
 
 
@@ -74,18 +77,39 @@ class FeatureEngineer:
 
     def __init__(self):
         """Initialize feature engineer."""
-        self.feature_cache: Dict[str, Dict[str, Any]] = {}
-
-    def extract_features(self, wallet_data: Dict[str, Any]) -> Dict[str, float]:
+        self.feature_cache: Optional[TTLCache] = None
+        if settings.enable_feature_caching:
+            self.feature_cache = TTLCache(
+                max_entries=settings.cache_max_entries,
+                ttl_seconds=settings.cache_ttl_seconds
+            )
+
+    def extract_features(
+        self,
+        wallet_data: Dict[str, Any],
+        chain_id: Optional[int] = None
+    ) -> Dict[str, float]:
         """
         Extract features from wallet data.
 
         Args:
             wallet_data: Wallet data from blockchain API
+            chain_id: Chain the wallet data was fetched from
 
         Returns:
             Dictionary of features matching Kaggle schema
         """
+        # Key on the transaction count so new wallet activity is re-extracted
+        cache_key = (
+            wallet_data.get('address', '').lower(),
+            chain_id,
+            len(wallet_data.get('transactions', []))
+        )
+        if self.feature_cache is not None:
+            cached = self.feature_cache.get(cache_key)
+            if cached is not None:
+                return dict(cached)
+
         try:
             transactions = wallet_data.get('transactions', [])
             address = wallet_data.get('address', '').lower()
@@ -205,7 +229,11 @@ class FeatureEngineer:
                 if feature_name not in features:
                     features[feature_name] = 0
 
-            logger.info(f"Extracted {len(features)} features for {address}")
+            logger.debug(f"Extracted {len(features)} features for {address}")
+
+            # Failed extractions below return zeros and are not cached
+            if self.feature_cache is not None:
+                self.feature_cache.set(cache_key, dict(features))
             return features
 
         except Exception as e:
@@ -0,0 +1,100 @@
+"""Dedicated executor for CPU-bound model inference.
+
+Model calls run on a bounded worker pool so the asyncio event loop stays free
+for I/O, serialization and health checks while trees and SHAP are busy.
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceQueueFull(Exception):
+    """Raised when the inference executor cannot accept more work."""
+
+
+class InferenceExecutor:
+    """Bounded thread pool for model inference.
+
+    sklearn and XGBoost release the GIL inside their native tree traversal,
+    so threads give real parallelism without copying models into worker
+    processes.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue_depth: int = 64):
+        """
+        Initialize executor.
+
+        Args:
+            max_workers: Number of inference threads
+            max_queue_depth: Calls allowed to wait for a free thread before
+                new calls are rejected
+        """
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="inference"
+        )
+
+        # Only touched from the event loop thread, so no lock needed
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def queued(self) -> int:
+        """Number of calls waiting for a free worker."""
+        return max(0, self._pending - self.max_workers)
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a function on the inference pool.
+
+        Args:
+            fn: CPU-bound callable
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Return value of fn
+
+        Raises:
+            InferenceQueueFull: If the wait queue is at capacity
+        """
+        if self._pending >= self.max_workers + self.max_queue_depth:
+            self.rejected += 1
+            raise InferenceQueueFull(
+                f"Inference queue full ({self.max_queue_depth} waiting), try again later"
+            )
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            # Carry the request context (e.g. stage timings) onto the worker thread
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(
+                self._pool, functools.partial(context.run, fn, *args, **kwargs)
+            )
+        finally:
+            self._pending -= 1
+            self.completed += 1
+
+    def shutdown(self) -> None:
+        """Stop accepting work and release the worker threads."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get executor statistics."""
+        return {
+            'workers': self.max_workers,
+            'max_queue_depth': self.max_queue_depth,
+            'in_flight': min(self._pending, self.max_workers),
+            'queued': self.queued,
+            'completed': self.completed,
+            'rejected': self.rejected
+        }
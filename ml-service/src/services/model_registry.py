@@ -0,0 +1,299 @@
+"""Per-chain and per-version models, loaded on first use.
+
+Every request is answered by the serving models (MODEL_VERSION in
+MODEL_PATH) unless its chain has models of its own in MODEL_PATH/<chain_id>/,
+CHAIN_MODEL_VERSIONS maps its chain to another version, or it asks for a
+version through X-Model-Version (e.g. an A/B arm). Only the serving version,
+the CHAIN_MODEL_VERSIONS ones and ALLOWED_MODEL_VERSIONS may be asked for,
+so callers cannot make the service load arbitrary versions. Those models are loaded
+when first needed and kept in least-recently-used order within a memory
+budget. An evicted entry is released once its last request has finished,
+like a version replaced by a reload.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# (chain id with its own model directory, or None for MODEL_PATH; version)
+ModelKey = Tuple[Optional[int], str]
+
+
+class ModelNotFound(Exception):
+    """Raised when there are no models for a chain and version."""
+
+
+def _artifact_mb(model_dir: Path, version: str) -> float:
+    """Size of a version's model artifacts, close to their size once loaded."""
+    return sum(
+        path.stat().st_size
+        for path in model_dir.glob(f"*_v{version}.joblib")
+        if not path.name.startswith("compiled_")
+    ) / 2**20
+
+
+def _footprint_mb(model_manager) -> float:
+    """Estimated memory held by loaded models: artifacts plus in-memory compiled or ONNX engines."""
+    footprint = _artifact_mb(model_manager.model_dir, model_manager.model_version)
+    fraud_detector = model_manager.fraud_detector
+    if fraud_detector is not None and fraud_detector.compiled_engine is not None:
+        info = fraud_detector.compiled_engine.get_info()
+        if not info['memory_mapped']:
+            footprint += info['nbytes'] / 2**20
+    if fraud_detector is not None and fraud_detector.onnx_engine is not None:
+        footprint += fraud_detector.onnx_engine.get_info()['nbytes'] / 2**20
+    anomaly_detector = model_manager.anomaly_detector
+    if anomaly_detector is not None and anomaly_detector.onnx_pipeline is not None:
+        footprint += anomaly_detector.onnx_pipeline.get_info()['nbytes'] / 2**20
+    return footprint
+
+
+class ModelRegistry:
+    """Route requests to models by chain and version, within a memory budget."""
+
+    def __init__(
+        self,
+        app_state,
+        memory_budget_mb: float = 2048.0,
+        chain_versions: Optional[Dict[int, str]] = None,
+        allowed_versions: Optional[Iterable[str]] = None,
+        drain_timeout_s: float = 60.0
+    ):
+        """
+        Initialize registry.
+
+        Args:
+            app_state: FastAPI app.state holding the serving model_manager
+                and the member_pool
+            memory_budget_mb: Estimated memory all loaded models may use,
+                the serving models included; least recently used entries
+                are evicted to stay below it
+            chain_versions: Version served per chain id when the request
+                does not ask for one
+            allowed_versions: Further versions a request may ask for, on
+                top of the serving and the chain versions
+            drain_timeout_s: Longest wait for in-flight requests on an
+                evicted entry before its models are released anyway
+        """
+        self.app_state = app_state
+        self.memory_budget_mb = memory_budget_mb
+        self.chain_versions = chain_versions or {}
+        self.allowed_versions = set(allowed_versions or ()) | set(self.chain_versions.values())
+        self.drain_timeout_s = drain_timeout_s
+
+        self._entries: "OrderedDict[ModelKey, Any]" = OrderedDict()
+        self._footprints: Dict[ModelKey, float] = {}
+        self._loading: Dict[ModelKey, asyncio.Task] = {}
+        self._drain_tasks: set = set()
+        # Whether a chain has a model directory of its own, per (chain, version)
+        self._chain_dirs: "OrderedDict[ModelKey, bool]" = OrderedDict()
+        self._chain_dirs_max = 4096
+
+        # Statistics
+        self.hits = 0
+        self.loads = 0
+        self.load_failures = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+
+    def resolve(self, chain_id: Optional[int], version: Optional[str] = None) -> ModelKey:
+        """
+        Pick the models for a chain and an optionally requested version.
+
+        Args:
+            chain_id: Chain of the request, None if it has none
+            version: Requested version, else the chain's configured version
+                or the serving one
+
+        Returns:
+            Registry key of the models
+
+        Raises:
+            ModelNotFound: If the requested version may not be asked for
+        """
+        serving = getattr(self.app_state, "model_manager", None)
+        serving_version = serving.model_version if serving is not None else settings.model_version
+        if version and version != serving_version and version not in self.allowed_versions:
+            raise ModelNotFound(f"Models version {version} is not available")
+        if not version:
+            version = self.chain_versions.get(chain_id) or serving_version
+        if chain_id is not None and self._has_chain_dir(chain_id, version):
+            return (chain_id, version)
+        return (None, version)
+
+    def _has_chain_dir(self, chain_id: int, version: str) -> bool:
+        """Whether a chain has models of its own for a version, checked on disk once."""
+        key = (chain_id, version)
+        found = self._chain_dirs.get(key)
+        if found is None:
+            found = (settings.model_dir / str(chain_id) / f"random_forest_v{version}.joblib").exists()
+            self._chain_dirs[key] = found
+            if len(self._chain_dirs) > self._chain_dirs_max:
+                self._chain_dirs.popitem(last=False)
+        return found
+
+    async def get(self, key: ModelKey, serving=None):
+        """
+        Get the models for a key, loading them on first use.
+
+        Returns without yielding to the event loop once the models are
+        loaded, so the caller can take a lease on them before any eviction
+        runs.
+
+        Args:
+            key: Key from resolve()
+            serving: Serving ModelManager pinned to the request, returned
+                for the serving version without going through the registry
+
+        Returns:
+            ModelManager for the key
+
+        Raises:
+            ModelNotFound: If the version's models do not exist
+        """
+        if serving is None:
+            serving = getattr(self.app_state, "model_manager", None)
+        if serving is not None and key == (None, serving.model_version):
+            return serving
+
+        while True:
+            model_manager = self._entries.get(key)
+            if model_manager is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return model_manager
+
+            # Concurrent first requests share one load
+            task = self._loading.get(key)
+            if task is None:
+                task = asyncio.create_task(self._load(key))
+                self._loading[key] = task
+                task.add_done_callback(lambda _: self._loading.pop(key, None))
+            await asyncio.shield(task)
+
+    def _model_dir(self, key: ModelKey) -> Path:
+        """Directory holding a key's artifacts."""
+        chain_id, _ = key
+        return settings.model_dir / str(chain_id) if chain_id is not None else settings.model_dir
+
+    def _used_mb(self) -> float:
+        """Estimated memory of the serving models and all loaded entries."""
+        serving = getattr(self.app_state, "model_manager", None)
+        used = sum(self._footprints.values())
+        if serving is not None and serving.is_ready():
+            used += _footprint_mb(serving)
+        return used
+
+    async def _load(self, key: ModelKey) -> None:
+        """Load a key's models, then evict least recently used entries to make room."""
+        from src.utils.model_manager import ModelManager
+
+        chain_id, version = key
+        model_dir = self._model_dir(key)
+        needed_mb = await asyncio.to_thread(_artifact_mb, model_dir, version)
+        if not needed_mb:
+            self.load_failures += 1
+            raise ModelNotFound(f"Models version {version} not found in {model_dir}")
+
+        started = time.perf_counter()
+        model_manager = ModelManager(
+            model_version=version,
+            model_dir=model_dir,
+            member_pool=getattr(self.app_state, "member_pool", None)
+        )
+        try:
+            await model_manager.load_models(shadow=False)
+        except Exception:
+            self.load_failures += 1
+            raise
+        if not model_manager.is_ready():
+            self.load_failures += 1
+            raise ModelNotFound(f"Models version {version} not found in {model_dir}")
+
+        self.loads += 1
+        self.load_seconds += time.perf_counter() - started
+        # Only evict once the load succeeded, a failed one must not cost other chains their models
+        footprint = _footprint_mb(model_manager)
+        self._evict(footprint)
+        self._entries[key] = model_manager
+        self._footprints[key] = footprint
+        logger.info(
+            f"📦 Loaded models version {version} for chain {chain_id if chain_id is not None else 'default'} "
+            f"({self._footprints[key]:.0f} MB, {self._used_mb():.0f}/{self.memory_budget_mb:.0f} MB in use)"
+        )
+
+    def discard(self, key: ModelKey) -> None:
+        """
+        Release an entry, e.g. once its version became the serving one.
+
+        Args:
+            key: Key from resolve()
+        """
+        model_manager = self._entries.pop(key, None)
+        if model_manager is None:
+            return
+        footprint = self._footprints.pop(key)
+        logger.info(f"Releasing models version {key[1]} for chain {key[0] if key[0] is not None else 'default'} ({footprint:.0f} MB)")
+        task = asyncio.create_task(self._drain(model_manager))
+        self._drain_tasks.add(task)
+        task.add_done_callback(self._drain_tasks.discard)
+
+    def _evict(self, needed_mb: float) -> None:
+        """Evict least recently used entries until needed_mb more fits in the budget."""
+        while self._entries and self._used_mb() + needed_mb > self.memory_budget_mb:
+            self.evictions += 1
+            self.discard(next(iter(self._entries)))
+        if self._used_mb() + needed_mb > self.memory_budget_mb:
+            logger.warning(
+                f"⚠️ Loading {needed_mb:.0f} MB of models exceeds the {self.memory_budget_mb:.0f} MB budget "
+                f"even with every other entry evicted"
+            )
+
+    async def _drain(self, model_manager) -> None:
+        """Release evicted models once their in-flight requests finished."""
+        deadline = time.monotonic() + self.drain_timeout_s
+        while model_manager.in_flight > 0 and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        model_manager.unload()
+
+    async def stop(self) -> None:
+        """Stop pending loads and release every entry."""
+        tasks = list(self._loading.values()) + list(self._drain_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for model_manager in self._entries.values():
+            model_manager.unload()
+        self._entries.clear()
+        self._footprints.clear()
+        self._chain_dirs.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get loaded entries, memory use and load statistics."""
+        return {
+            'memory_budget_mb': self.memory_budget_mb,
+            'memory_used_mb': round(self._used_mb(), 1),
+            'loaded': len(self._entries),
+            'loading': len(self._loading),
+            'draining': len(self._drain_tasks),
+            'hits': self.hits,
+            'loads': self.loads,
+            'load_failures': self.load_failures,
+            'evictions': self.evictions,
+            'load_seconds': round(self.load_seconds, 3),
+            'entries': [
+                {
+                    'chain_id': chain_id,
+                    'version': version,
+                    'memory_mb': round(self._footprints[(chain_id, version)], 1),
+                    'in_flight': model_manager.in_flight
+                }
+                for (chain_id, version), model_manager in reversed(self._entries.items())
+            ]
+        }
@@ -0,0 +1,286 @@
+"""Zero-downtime model reloads.
+
+A new ModelManager is loaded and warmed up in the background while the
+current one keeps serving. Both steps run on threads, off the event loop.
+The swap is one assignment of app.state.model_manager on the event loop
+thread. Requests pin the manager they started with (see
+ModelManager.lease), so in-flight requests finish on the old version. The
+old models are released once their last request has finished.
+"""
+import asyncio
+import logging
+import re
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import MODEL_VERSION_PATTERN, settings
+
+logger = logging.getLogger(__name__)
+
+
+class ReloadInProgress(Exception):
+    """Raised when a reload is requested while another one is running."""
+
+
+class ModelReloader:
+    """Load, warm up and swap in new model versions while serving."""
+
+    def __init__(self, app_state, drain_timeout_s: float = 60.0):
+        """
+        Initialize reloader.
+
+        Args:
+            app_state: FastAPI app.state holding model_manager, member_pool,
+                prediction_cache and prediction_batcher
+            drain_timeout_s: Longest wait for in-flight requests on an old
+                version before its models are released anyway
+        """
+        self.app_state = app_state
+        self.drain_timeout_s = drain_timeout_s
+        self._lock = asyncio.Lock()
+        self._reload_task: Optional[asyncio.Task] = None
+        self._watch_task: Optional[asyncio.Task] = None
+        self._drain_tasks: set = set()
+
+        # Statistics
+        self.reloads = 0
+        self.failures = 0
+        self.last_reload: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+        self.retiring: List[Dict[str, Any]] = []
+
+    @property
+    def reloading(self) -> bool:
+        """Whether a reload is running."""
+        return self._lock.locked() or (self._reload_task is not None and not self._reload_task.done())
+
+    def start(self, version: Optional[str] = None) -> None:
+        """
+        Run reload() in the background.
+
+        Failures are logged and reported by get_stats().
+
+        Args:
+            version: Version to load, the serving version if None
+
+        Raises:
+            ReloadInProgress: If another reload is running
+            ValueError: If version is not a valid model version
+        """
+        if version and not re.fullmatch(MODEL_VERSION_PATTERN, version):
+            raise ValueError(f"Invalid model version {version!r}")
+        if self.reloading:
+            raise ReloadInProgress("A model reload is already in progress")
+        self._reload_task = asyncio.create_task(self.reload(version))
+        self._reload_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    async def reload(self, version: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Load a model version next to the serving one and swap it in.
+
+        Args:
+            version: Version to load, the serving version if None (e.g.
+                after retraining in place)
+
+        Returns:
+            Versions swapped and load and warm-up durations
+
+        Raises:
+            ReloadInProgress: If another reload is running
+            ValueError: If version is not a valid model version
+            Exception: If the new models fail to load or warm up; the
+                serving models are left in place
+        """
+        if version and not re.fullmatch(MODEL_VERSION_PATTERN, version):
+            raise ValueError(f"Invalid model version {version!r}")
+        if self._lock.locked():
+            raise ReloadInProgress("A model reload is already in progress")
+
+        async with self._lock:
+            from src.utils.model_manager import ModelManager
+
+            old = getattr(self.app_state, "model_manager", None)
+            version = version or (old.model_version if old is not None else settings.model_version)
+            shadow_version = old.shadow.version if old is not None and old.shadow is not None else None
+            started = time.perf_counter()
+            logger.info(f"🔄 Reloading models version {version}")
+
+            new = None
+            try:
+                # Without the prediction cache, so loading does not clear it
+                # while the old models still serve
+                new = ModelManager(
+                    model_version=version,
+                    member_pool=getattr(self.app_state, "member_pool", None)
+                )
+                await new.load_models()
+                if not new.is_ready():
+                    raise FileNotFoundError(f"Models version {version} not found in {new.model_dir}")
+                await asyncio.to_thread(
+                    new.warm_up,
+                    batches=settings.warmup_batches,
+                    batch_size=settings.warmup_batch_size,
+                    explainer=settings.warmup_explainer
+                )
+            except Exception as e:
+                if new is not None:
+                    new.stop_shadow()
+                self.failures += 1
+                self.last_error = str(e)
+                logger.error(f"❌ Reload of version {version} failed, keeping the serving models: {e}", exc_info=True)
+                raise
+
+            # Keep shadowing a candidate chosen at runtime, unless it was just promoted
+            if shadow_version and new.shadow is None and shadow_version != new.model_version:
+                try:
+                    await new.load_shadow(shadow_version)
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not keep shadow models version {shadow_version}: {e}")
+
+            self._swap(old, new)
+            self.reloads += 1
+            self.last_error = None
+            self.last_reload = {
+                'from_version': old.model_version if old is not None else None,
+                'to_version': new.model_version,
+                'completed_at': datetime.now().isoformat(),
+                'duration_s': round(time.perf_counter() - started, 3),
+                'load_duration_s': round(new.load_duration_s, 3),
+                'warmup_duration_s': round(new.warmup_duration_s, 3)
+            }
+            logger.info(
+                f"✅ Now serving models version {new.model_version} "
+                f"(reload took {self.last_reload['duration_s']:.2f}s)"
+            )
+            return self.last_reload
+
+    def _swap(self, old, new) -> None:
+        """Route new requests to the new models and retire the old ones."""
+        prediction_cache = getattr(self.app_state, "prediction_cache", None)
+        new.prediction_cache = prediction_cache
+
+        # No await between these, so no request sees a half-done swap
+        self.app_state.model_manager = new
+        batcher = getattr(self.app_state, "prediction_batcher", None)
+        if batcher is not None:
+            batcher.model_manager = new
+
+        if prediction_cache is not None:
+            prediction_cache.clear()
+
+        # The registry would otherwise keep a second copy of the promoted version
+        registry = getattr(self.app_state, "model_registry", None)
+        if registry is not None:
+            registry.discard((None, new.model_version))
+
+        if old is not None:
+            task = asyncio.create_task(self._drain(old))
+            self._drain_tasks.add(task)
+            task.add_done_callback(self._drain_tasks.discard)
+
+    async def _drain(self, old) -> None:
+        """Release the old models once their in-flight requests finished."""
+        entry = {
+            'version': old.model_version,
+            'retired_at': datetime.now().isoformat(),
+            'in_flight': old.in_flight
+        }
+        self.retiring.append(entry)
+        deadline = time.monotonic() + self.drain_timeout_s
+        try:
+            while old.in_flight > 0 and time.monotonic() < deadline:
+                entry['in_flight'] = old.in_flight
+                await asyncio.sleep(0.05)
+            if old.in_flight > 0:
+                logger.warning(
+                    f"⚠️ {old.in_flight} requests still on models version {old.model_version} "
+                    f"after {self.drain_timeout_s:.0f}s, releasing them anyway"
+                )
+            old.unload()
+            logger.info(f"♻️ Released models version {old.model_version}")
+        finally:
+            self.retiring.remove(entry)
+
+    def _fingerprint(self, version: str) -> Tuple:
+        """Names, sizes and modification times of a version's artifacts."""
+        model_dir = settings.model_dir
+        if not model_dir.exists():
+            return ()
+        return tuple(sorted(
+            (path.name, path.stat().st_size, path.stat().st_mtime_ns)
+            for path in model_dir.glob(f"*_v{version}.joblib")
+            if not path.name.startswith("compiled_")
+        ))
+
+    def start_watching(self, interval_s: float) -> None:
+        """
+        Reload when the serving version's artifacts change on disk.
+
+        A change is acted on once the files have stayed the same for one
+        more interval, so a reload never starts on a half-written model.
+
+        Args:
+            interval_s: Seconds between checks of the model directory
+        """
+        self._watch_task = asyncio.create_task(self._watch(interval_s))
+
+    async def _watch(self, interval_s: float) -> None:
+        """Poll the model directory for changed artifacts."""
+        model_manager = getattr(self.app_state, "model_manager", None)
+        version = model_manager.model_version if model_manager is not None else settings.model_version
+        loaded = await asyncio.to_thread(self._fingerprint, version)
+        pending = None
+        while True:
+            await asyncio.sleep(interval_s)
+            model_manager = getattr(self.app_state, "model_manager", None)
+            if model_manager is not None and model_manager.model_version != version:
+                # Another version was swapped in through the admin endpoint
+                version = model_manager.model_version
+                loaded = await asyncio.to_thread(self._fingerprint, version)
+                pending = None
+                continue
+            try:
+                current = await asyncio.to_thread(self._fingerprint, version)
+            except OSError:
+                # A file vanished while being replaced, look again next time
+                continue
+            if current == loaded or not current:
+                pending = None
+                continue
+            if current != pending:
+                pending = current
+                continue
+            try:
+                await self.reload(version)
+            except ReloadInProgress:
+                continue
+            except Exception:
+                # Logged by reload(); retried only once the files change again
+                pass
+            loaded, pending = current, None
+
+    async def stop(self) -> None:
+        """Stop watching and stop waiting for old versions to drain."""
+        tasks = list(self._drain_tasks)
+        for task in (self._watch_task, self._reload_task):
+            if task is not None:
+                tasks.append(task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get reload state and statistics."""
+        model_manager = getattr(self.app_state, "model_manager", None)
+        return {
+            'serving_version': model_manager.model_version if model_manager is not None else None,
+            'serving_in_flight': model_manager.in_flight if model_manager is not None else 0,
+            'reloading': self.reloading,
+            'watching': self._watch_task is not None and not self._watch_task.done(),
+            'reloads': self.reloads,
+            'failures': self.failures,
+            'last_reload': self.last_reload,
+            'last_error': self.last_error,
+            'retiring': list(self.retiring)
+        }
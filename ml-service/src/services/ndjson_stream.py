@@ -0,0 +1,102 @@
+"""Full-duplex newline-delimited JSON streaming.
+
+Records are read from the request body while results are written to the
+response, one chunk at a time. Neither side is buffered beyond a chunk:
+the response iterator only resumes once the server has flushed its last
+write, and the server stops reading the socket while body data is unread,
+so a slow reader or writer on either end throttles the whole pipeline.
+"""
+import asyncio
+import logging
+from typing import AsyncIterator, Optional
+
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+from starlette.types import Receive
+
+logger = logging.getLogger(__name__)
+
+
+async def iter_ndjson_lines(
+    request: Request,
+    max_line_bytes: int,
+    body_read: Optional[asyncio.Event] = None
+) -> AsyncIterator[Optional[bytes]]:
+    """
+    Split the request body into lines as it arrives.
+
+    Args:
+        request: Request whose body holds one JSON document per line
+        max_line_bytes: Longer lines are skipped instead of buffered
+        body_read: Set once the whole body has been received
+
+    Yields:
+        Each non-blank line without its terminator, or None for a line
+        that exceeded max_line_bytes
+    """
+    pending = bytearray()
+    oversized = False
+
+    try:
+        async for chunk in request.stream():
+            start = 0
+            while True:
+                end = chunk.find(b"\n", start)
+                if end < 0:
+                    break
+
+                if oversized or len(pending) + end - start > max_line_bytes:
+                    yield None
+                else:
+                    pending += chunk[start:end]
+                    line = bytes(pending).strip()
+                    if line:
+                        yield line
+                pending.clear()
+                oversized = False
+                start = end + 1
+
+            # Keep the partial last line, unless it is already too long
+            if not oversized:
+                if len(pending) + len(chunk) - start > max_line_bytes:
+                    oversized = True
+                    pending.clear()
+                else:
+                    pending += chunk[start:]
+    finally:
+        if body_read is not None:
+            body_read.set()
+
+    if oversized:
+        yield None
+    elif pending.strip():
+        yield bytes(pending).strip()
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    Streaming response whose content is produced while the body is read.
+
+    Older ASGI servers make Starlette listen for client disconnects on the
+    same receive channel the request body arrives on, which would swallow
+    body chunks. Listening is deferred until the body has been read; a
+    disconnect before that surfaces as ClientDisconnect from the reader.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def __init__(self, content, body_read: asyncio.Event, **kwargs):
+        """
+        Initialize response.
+
+        Args:
+            content: Async iterator producing NDJSON lines
+            body_read: Event set by iter_ndjson_lines once the body is consumed
+            **kwargs: Passed to StreamingResponse
+        """
+        super().__init__(content, **kwargs)
+        self.body_read = body_read
+
+    async def listen_for_disconnect(self, receive: Receive) -> None:
+        await self.body_read.wait()
+        await super().listen_for_disconnect(receive)
@@ -0,0 +1,357 @@
+"""Two-tier prediction result cache shared across service replicas.
+
+Results are looked up in the in-process LRU first, then in Redis with one
+multi-get per request. A missing key is computed once: concurrent requests
+in this process wait for the same computation, and other replicas wait
+on a short Redis lock instead of scoring the same wallet again.
+"""
+import asyncio
+import logging
+import struct
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from src.services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+_FRAUD = struct.Struct('<d')
+_ANOMALY = struct.Struct('<?d')
+_REASON_SEPARATOR = '\x1f'
+
+
+def encode_result(kind: str, value: Any) -> bytes:
+    """
+    Pack a prediction result into compact bytes.
+
+    Args:
+        kind: 'fraud' for (probability, model_path) or 'anomaly' for the
+            anomaly result dict
+        value: Result to pack
+
+    Returns:
+        Encoded bytes
+    """
+    if kind == 'fraud':
+        fraud_proba, model_path = value
+        return _FRAUD.pack(fraud_proba) + model_path.encode()
+    if kind == 'anomaly':
+        reasons = _REASON_SEPARATOR.join(value['anomaly_reasons'])
+        return _ANOMALY.pack(value['is_anomaly'], value['anomaly_score']) + reasons.encode()
+    raise ValueError(f"Unknown result kind: {kind}")
+
+
+def decode_result(kind: str, data: bytes) -> Any:
+    """
+    Unpack bytes produced by encode_result.
+
+    Args:
+        kind: Result kind used when encoding
+        data: Encoded bytes
+
+    Returns:
+        Decoded result
+    """
+    if kind == 'fraud':
+        (fraud_proba,) = _FRAUD.unpack_from(data)
+        return fraud_proba, data[_FRAUD.size:].decode()
+    if kind == 'anomaly':
+        is_anomaly, anomaly_score = _ANOMALY.unpack_from(data)
+        reasons = data[_ANOMALY.size:].decode()
+        return {
+            'is_anomaly': is_anomaly,
+            'anomaly_score': anomaly_score,
+            'anomaly_reasons': reasons.split(_REASON_SEPARATOR) if reasons else []
+        }
+    raise ValueError(f"Unknown result kind: {kind}")
+
+
+class PredictionCache:
+    """Local LRU in front of an optional shared Redis tier."""
+
+    def __init__(
+        self,
+        local: TTLCache,
+        redis=None,
+        ttl_seconds: float = 300.0,
+        lock_ttl_ms: int = 2000,
+        poll_interval_ms: float = 10.0,
+        retry_after_s: float = 5.0,
+        namespace: str = "zappay:ml"
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            local: In-process tier
+            redis: redis.asyncio client (or compatible), None for local only
+            ttl_seconds: Lifetime of shared entries
+            lock_ttl_ms: How long another replica may hold a key before this
+                one computes it anyway
+            poll_interval_ms: How often to check whether a locked key is ready
+            retry_after_s: How long to skip Redis after it failed
+            namespace: Prefix of every Redis key
+        """
+        self.local = local
+        self.redis = redis
+        self.ttl_ms = int(ttl_seconds * 1000)
+        self.lock_ttl_ms = lock_ttl_ms
+        self.poll_interval_s = poll_interval_ms / 1000
+        self.retry_after_s = retry_after_s
+        self.namespace = namespace
+
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._redis_available = True
+        self._retry_at = 0.0
+
+        # Statistics
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.redis_errors = 0
+        self.coalesced = 0
+        self.lock_waits = 0
+        self.computed = 0
+
+    def _redis_key(self, key: Tuple) -> str:
+        """Flatten a cache key tuple into a Redis key."""
+        return ":".join([self.namespace, *map(str, key)])
+
+    async def _redis_call(self, fn: Callable[[], Awaitable[Any]], default: Any) -> Any:
+        """Run a Redis operation, degrading to local-only caching on failure."""
+        # Don't pay a connection timeout on every request during an outage
+        if not self._redis_available and time.monotonic() < self._retry_at:
+            return default
+
+        try:
+            result = await fn()
+        except Exception as e:
+            self.redis_errors += 1
+            self._retry_at = time.monotonic() + self.retry_after_s
+            # Warn once per outage rather than on every request
+            if self._redis_available:
+                logger.warning(f"Redis cache unavailable, caching in process only: {e}")
+                self._redis_available = False
+            return default
+
+        if not self._redis_available:
+            logger.info("Redis cache available again")
+            self._redis_available = True
+        return result
+
+    async def _fetch_shared(self, keys: Sequence[Tuple], count_misses: bool = True) -> List[Optional[Any]]:
+        """Multi-get keys from Redis and promote hits to the local tier."""
+        redis_keys = [self._redis_key(key) for key in keys]
+        raw = await self._redis_call(lambda: self.redis.mget(redis_keys), [None] * len(keys))
+
+        values = []
+        for key, data in zip(keys, raw):
+            if data is None:
+                if count_misses:
+                    self.redis_misses += 1
+                values.append(None)
+                continue
+            self.redis_hits += 1
+            value = decode_result(key[0], data)
+            self.local.set(key, value)
+            values.append(value)
+        return values
+
+    async def _lock(self, keys: Sequence[Tuple], token: str) -> List[bool]:
+        """Try to become the replica that computes each key."""
+        async def acquire():
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.set(self._redis_key(key) + ":lock", token, nx=True, px=self.lock_ttl_ms)
+                return [bool(ok) for ok in await pipe.execute()]
+
+        # Without Redis every key is computed locally
+        return await self._redis_call(acquire, [True] * len(keys))
+
+    async def _store(self, keys: Sequence[Tuple], values: Sequence[Any], locked: Sequence[Tuple]) -> None:
+        """Write computed values to both tiers and release locks."""
+        for key, value in zip(keys, values):
+            self.local.set(key, value)
+
+        if self.redis is None:
+            return
+
+        async def store():
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, value in zip(keys, values):
+                    pipe.set(self._redis_key(key), encode_result(key[0], value), px=self.ttl_ms)
+                if locked:
+                    pipe.delete(*[self._redis_key(key) + ":lock" for key in locked])
+                await pipe.execute()
+
+        await self._redis_call(store, None)
+
+    async def _wait_for_others(self, keys: Sequence[Tuple]) -> List[Optional[Any]]:
+        """Poll Redis for keys another replica is computing."""
+        self.lock_waits += len(keys)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.lock_ttl_ms / 1000
+
+        values: List[Optional[Any]] = [None] * len(keys)
+        pending = list(range(len(keys)))
+        while pending and loop.time() < deadline:
+            await asyncio.sleep(self.poll_interval_s)
+            fetched = await self._fetch_shared([keys[i] for i in pending], count_misses=False)
+            for i, value in zip(list(pending), fetched):
+                if value is not None:
+                    values[i] = value
+                    pending.remove(i)
+        return values
+
+    def peek(self, keys: Sequence[Tuple]) -> List[Optional[Any]]:
+        """
+        Get results held in this process without computing or waiting.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Cached results in the order of keys, None where missing
+        """
+        return [self.local.get(key) for key in keys]
+
+    async def get_or_compute(
+        self,
+        keys: Sequence[Tuple],
+        compute: Callable[[List[int]], Awaitable[List[Any]]]
+    ) -> List[Any]:
+        """
+        Get cached results, computing the missing ones exactly once.
+
+        Args:
+            keys: Cache keys whose first element is the result kind
+            compute: Coroutine taking positions in keys and returning their
+                results in the same order
+
+        Returns:
+            Results in the order of keys
+        """
+        results: List[Any] = [self.local.get(key) for key in keys]
+        missing = [i for i, value in enumerate(results) if value is None]
+        if not missing:
+            return results
+
+        # Join computations already running in this process, including
+        # repeats of a key within this call
+        loop = asyncio.get_running_loop()
+        joined: List[Tuple[int, asyncio.Future]] = []
+        owned: List[int] = []
+        futures: Dict[int, asyncio.Future] = {}
+        for i in missing:
+            future = self._inflight.get(keys[i])
+            if future is not None:
+                joined.append((i, future))
+            else:
+                owned.append(i)
+                futures[i] = self._inflight[keys[i]] = loop.create_future()
+        self.coalesced += len(joined)
+
+        if owned:
+            try:
+                await self._resolve(keys, owned, results, compute)
+            except BaseException as e:
+                for i in owned:
+                    if isinstance(e, Exception):
+                        futures[i].set_exception(e)
+                        # Mark retrieved so failures nobody joined are not logged
+                        futures[i].exception()
+                    else:
+                        futures[i].cancel()
+                raise
+            else:
+                for i in owned:
+                    futures[i].set_result(results[i])
+            finally:
+                for i in owned:
+                    self._inflight.pop(keys[i], None)
+
+        for i, future in joined:
+            results[i] = await asyncio.shield(future)
+
+        return results
+
+    async def _resolve(
+        self,
+        keys: Sequence[Tuple],
+        owned: List[int],
+        results: List[Any],
+        compute: Callable[[List[int]], Awaitable[List[Any]]]
+    ) -> None:
+        """Fill results for owned positions from Redis or by computing them."""
+        todo = owned
+        if self.redis is not None:
+            fetched = await self._fetch_shared([keys[i] for i in todo])
+            for i, value in zip(todo, fetched):
+                results[i] = value
+            todo = [i for i in todo if results[i] is None]
+
+        if not todo:
+            return
+
+        token = uuid.uuid4().hex
+        if self.redis is not None:
+            acquired = await self._lock([keys[i] for i in todo], token)
+        else:
+            acquired = [True] * len(todo)
+        mine = [i for i, ok in zip(todo, acquired) if ok]
+        theirs = [i for i, ok in zip(todo, acquired) if not ok]
+
+        if theirs:
+            waited = await self._wait_for_others([keys[i] for i in theirs])
+            for i, value in zip(theirs, waited):
+                results[i] = value
+            # Lock holder died or was too slow, compute without the lock
+            mine += [i for i in theirs if results[i] is None]
+
+        if not mine:
+            return
+
+        locked = [keys[i] for i, ok in zip(todo, acquired) if ok]
+        try:
+            values = await compute(mine)
+        except BaseException:
+            if self.redis is not None and locked:
+                await self._redis_call(lambda: self.redis.delete(*[
+                    self._redis_key(key) + ":lock" for key in locked
+                ]), None)
+            raise
+
+        self.computed += len(mine)
+        for i, value in zip(mine, values):
+            results[i] = value
+        await self._store([keys[i] for i in mine], values, locked)
+
+    def clear(self) -> None:
+        """
+        Drop local entries after a model reload.
+
+        Shared entries are namespaced by model version and expire on their own.
+        """
+        self.local.clear()
+
+    async def close(self) -> None:
+        """Close the Redis connection."""
+        if self.redis is not None:
+            await self._redis_call(self.redis.aclose, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get statistics for both tiers."""
+        stats = self.local.get_stats()
+        stats['coalesced'] = self.coalesced
+        stats['computed'] = self.computed
+        if self.redis is not None:
+            lookups = self.redis_hits + self.redis_misses
+            stats['redis'] = {
+                'available': self._redis_available,
+                'hits': self.redis_hits,
+                'misses': self.redis_misses,
+                'hit_rate': self.redis_hits / lookups if lookups else 0.0,
+                'lock_waits': self.lock_waits,
+                'errors': self.redis_errors
+            }
+        return stats
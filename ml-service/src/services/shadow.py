@@ -0,0 +1,257 @@
+"""Shadow scoring of a candidate model version on live traffic.
+
+A sampled fraction of live predictions is queued after the response has
+been sent and re-scored by the candidate models on one low-priority thread.
+The differences to the served results are kept in bounded memory and
+exported, so a retrained version can be judged on real traffic before it
+is promoted. A full queue drops work instead of slowing requests down.
+"""
+import logging
+import os
+import queue
+import random
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.metrics_registry import (
+    SHADOW_DELTA, SHADOW_DISAGREEMENTS, SHADOW_PREDICTIONS, set_stage_prefix
+)
+
+logger = logging.getLogger(__name__)
+
+KINDS = ('fraud', 'anomaly')
+
+# Niceness of the scoring thread, so it only gets CPU that requests leave over
+_NICENESS = 19
+
+# Items scored per model call at most
+_MAX_BATCH = 256
+
+# How often a busy service is checked for a gap to score in
+_IDLE_POLL_S = 0.005
+
+
+class _Comparison:
+    """Running totals and a bounded window of shadow vs served score deltas."""
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.disagreements = 0
+        self.sum_delta = 0.0
+        self.sum_abs_delta = 0.0
+        self.deltas: Deque[float] = deque(maxlen=window)
+        self.recent_disagreements: Deque[bool] = deque(maxlen=window)
+
+    def record(self, served: np.ndarray, shadow: np.ndarray, served_labels: np.ndarray, shadow_labels: np.ndarray) -> int:
+        """Record one batch, returning its number of disagreements."""
+        deltas = shadow - served
+        disagree = served_labels != shadow_labels
+        self.count += len(deltas)
+        self.disagreements += int(disagree.sum())
+        self.sum_delta += float(deltas.sum())
+        self.sum_abs_delta += float(np.abs(deltas).sum())
+        self.deltas.extend(deltas.tolist())
+        self.recent_disagreements.extend(disagree.tolist())
+        return int(disagree.sum())
+
+    def get_stats(self) -> Dict[str, Any]:
+        if not self.count:
+            return {'scored': 0}
+        recent = np.abs(np.fromiter(self.deltas, dtype=np.float64, count=len(self.deltas)))
+        p50, p95, p99 = np.percentile(recent, [50, 95, 99])
+        return {
+            'scored': self.count,
+            'disagreement_rate': self.disagreements / self.count,
+            'mean_delta': self.sum_delta / self.count,
+            'mean_abs_delta': self.sum_abs_delta / self.count,
+            'window': {
+                'size': len(recent),
+                'disagreement_rate': sum(self.recent_disagreements) / len(self.recent_disagreements),
+                'abs_delta_p50': float(p50),
+                'abs_delta_p95': float(p95),
+                'abs_delta_p99': float(p99),
+                'abs_delta_max': float(recent.max())
+            }
+        }
+
+
+class ShadowScorer:
+    """Re-score sampled live predictions with a candidate model version."""
+
+    def __init__(
+        self,
+        fraud_detector,
+        anomaly_detector,
+        version: str,
+        sample_rate: float = 0.1,
+        max_queue: int = 1000,
+        window: int = 10000,
+        busy: Optional[Callable[[], bool]] = None
+    ):
+        """
+        Initialize scorer.
+
+        Args:
+            fraud_detector: Candidate FraudDetector
+            anomaly_detector: Candidate AnomalyDetector
+            version: Candidate model version
+            sample_rate: Fraction of live requests re-scored
+            max_queue: Requests waiting for the scoring thread before new
+                ones are dropped
+            window: Recent deltas kept per kind for quantiles
+            busy: Returns True while requests are being served; scoring
+                waits for a gap, since thread priority does not apply to
+                the GIL the scoring thread shares with request handling
+        """
+        self.fraud_detector = fraud_detector
+        self.anomaly_detector = anomaly_detector
+        self.version = version
+        self.sample_rate = sample_rate
+        self.max_queue = max_queue
+        self.busy = busy
+        self._stopping = threading.Event()
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._comparisons = {kind: _Comparison(window) for kind in KINDS}
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.submitted = 0
+        self.dropped = 0
+        self.errors = 0
+        for kind in KINDS:
+            SHADOW_PREDICTIONS.labels(kind)
+            SHADOW_DISAGREEMENTS.labels(kind)
+
+    def start(self) -> None:
+        """
+        Start the scoring thread.
+
+        Also called in pre-forked workers, which inherit the scorer but not
+        its thread; the queue and lock are recreated for the new process.
+        """
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"shadow-{self.version}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the scoring thread, discarding queued work."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def sample(self) -> bool:
+        """Decide whether to shadow the current request."""
+        return self._thread is not None and random.random() < self.sample_rate
+
+    async def enqueue(self, kind: str, records: Sequence[Dict[str, Any]], served: Sequence[Tuple]) -> None:
+        """
+        Queue served predictions for re-scoring.
+
+        A coroutine only so FastAPI background tasks run it on the event
+        loop rather than handing it to a thread; it never waits.
+
+        Args:
+            kind: 'fraud' or 'anomaly'
+            records: Feature dicts the served predictions were made from
+            served: Per record, (fraud_probability,) or (anomaly_score, is_anomaly)
+        """
+        try:
+            self._queue.put_nowait((kind, list(records), list(served)))
+            self.submitted += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        """Score queued work in batches until stopped."""
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), _NICENESS)
+        except (AttributeError, OSError):
+            logger.debug("Could not lower the shadow scoring thread's priority")
+        set_stage_prefix('shadow_')
+
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            items = [item]
+            while len(items) < _MAX_BATCH:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                items.append(item)
+
+            while self.busy is not None and self.busy() and not self._stopping.is_set():
+                self._stopping.wait(_IDLE_POLL_S)
+            if self._stopping.is_set():
+                return
+
+            for kind in KINDS:
+                records: List[Dict[str, Any]] = []
+                served: List[Tuple] = []
+                for item_kind, item_records, item_served in items:
+                    if item_kind == kind:
+                        records.extend(item_records)
+                        served.extend(item_served)
+                if records:
+                    try:
+                        self._score(kind, records, served)
+                    except Exception as e:
+                        self.errors += 1
+                        logger.warning(f"Shadow scoring with version {self.version} failed: {e}")
+
+    def _score(self, kind: str, records: List[Dict[str, Any]], served: List[Tuple]) -> None:
+        """Score one batch with the candidate models and compare."""
+        if kind == 'fraud':
+            shadow = self.fraud_detector.predict_proba_records(records)
+            served_scores = np.array([s[0] for s in served], dtype=np.float64)
+            served_labels = served_scores >= 0.5
+            shadow_labels = shadow >= 0.5
+        else:
+            X = self.anomaly_detector.vectorize(records)
+            predictions, shadow, _ = self.anomaly_detector.score(X)
+            served_scores = np.array([s[0] for s in served], dtype=np.float64)
+            served_labels = np.array([bool(s[1]) for s in served])
+            shadow_labels = predictions == -1
+
+        shadow = np.asarray(shadow, dtype=np.float64)
+        with self._lock:
+            disagreements = self._comparisons[kind].record(served_scores, shadow, served_labels, shadow_labels)
+        SHADOW_PREDICTIONS.labels(kind).inc(len(records))
+        if disagreements:
+            SHADOW_DISAGREEMENTS.labels(kind).inc(disagreements)
+        histogram = SHADOW_DELTA.labels(kind)
+        for delta in np.abs(shadow - served_scores):
+            histogram.observe(float(delta))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get sampling counters and per-kind score comparisons."""
+        with self._lock:
+            comparisons = {kind: comparison.get_stats() for kind, comparison in self._comparisons.items()}
+        return {
+            'version': self.version,
+            'running': self._thread is not None,
+            'sample_rate': self.sample_rate,
+            'submitted': self.submitted,
+            'dropped': self.dropped,
+            'queued': self._queue.qsize(),
+            'errors': self.errors,
+            **comparisons
+        }
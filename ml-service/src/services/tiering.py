@@ -0,0 +1,155 @@
+"""Per-request choice of fraud inference tier under load.
+
+When the service is saturated a slightly less accurate score delivered in
+time beats the full ensemble delivered late. Each request gets the most
+accurate tier that fits its remaining latency budget and the current queue
+pressure: the full ensemble, XGBoost alone, or the distilled fallback tree.
+"""
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Optional, Sequence, Tuple
+
+from src.models.fraud_detector import TIERS
+from src.utils.metrics_registry import INFERENCE_TIERS
+
+# Weight of the newest observation in the tier cost averages
+_EWMA_ALPHA = 0.2
+
+# Costs not refreshed for this long are forgotten, so a tier skipped
+# during a burst gets tried again once the burst is over
+_COST_TTL_S = 60.0
+
+
+class TierSelector:
+    """Pick inference tiers from latency budgets and queue pressure."""
+
+    def __init__(
+        self,
+        xgboost_pressure: float = 0.5,
+        fallback_pressure: float = 0.9,
+        headroom: float = 1.5,
+        history_s: float = 3600.0,
+        bucket_s: float = 60.0
+    ):
+        """
+        Initialize selector.
+
+        Args:
+            xgboost_pressure: Queue pressure (0-1) from which the ensemble is
+                replaced by XGBoost alone
+            fallback_pressure: Queue pressure from which the fallback tree is used
+            headroom: A tier fits the budget if its smoothed cost times this does
+            history_s: How long the tier mix history is kept
+            bucket_s: Granularity of the tier mix history
+        """
+        self.xgboost_pressure = xgboost_pressure
+        self.fallback_pressure = fallback_pressure
+        self.headroom = headroom
+        self.bucket_s = bucket_s
+
+        # Smoothed seconds per call of each (route, tier), including
+        # executor queueing, and when each was last observed
+        self._cost_s: Dict[Tuple[str, str], float] = {}
+        self._cost_updated: Dict[Tuple[str, str], float] = {}
+        self._available: Sequence[str] = TIERS
+        self._totals: Counter = Counter()
+        self._history: Deque[Tuple[float, Counter]] = deque(maxlen=max(1, int(history_s / bucket_s)))
+        for tier in TIERS:
+            INFERENCE_TIERS.labels(tier)
+
+    def choose(
+        self,
+        route: str,
+        remaining_s: Optional[float],
+        pressure: float,
+        available: Sequence[str] = TIERS
+    ) -> str:
+        """
+        Choose the tier for one request.
+
+        Args:
+            route: Request path; costs are tracked per route and tier
+            remaining_s: Seconds left until the caller's deadline, None if
+                the caller sent none
+            pressure: Fullest wait queue in front of inference, 0 (idle) to 1
+            available: Tiers the loaded models support, most accurate first
+
+        Returns:
+            Tier name
+        """
+        self._available = available
+        if pressure >= self.fallback_pressure:
+            level = 2
+        elif pressure >= self.xgboost_pressure:
+            level = 1
+        else:
+            level = 0
+        level = min(level, len(available) - 1)
+
+        # Step down while the tier is not expected to make the deadline
+        if remaining_s is not None:
+            now = time.monotonic()
+            while level < len(available) - 1:
+                key = (route, available[level])
+                if now - self._cost_updated.get(key, float('-inf')) > _COST_TTL_S:
+                    break
+                if self._cost_s[key] * self.headroom <= remaining_s:
+                    break
+                level += 1
+        return available[level]
+
+    def min_cost_s(self, route: str) -> float:
+        """
+        Expected cost of the cheapest tier on a route.
+
+        Args:
+            route: Request path
+
+        Returns:
+            Smoothed seconds of the cheapest tier, 0 while any tier is unmeasured
+        """
+        return min(self._cost_s.get((route, tier), 0.0) for tier in self._available)
+
+    def observe(self, route: str, tier: str, seconds: float, count: int = 1) -> None:
+        """
+        Record predictions served by a tier.
+
+        Args:
+            route: Request path
+            tier: Tier that produced the predictions
+            seconds: Time the inference call took
+            count: Number of predictions in the call
+        """
+        key = (route, tier)
+        previous = self._cost_s.get(key)
+        self._cost_s[key] = seconds if previous is None else previous + _EWMA_ALPHA * (seconds - previous)
+        self._cost_updated[key] = time.monotonic()
+
+        now = time.time()
+        if not self._history or now - self._history[-1][0] >= self.bucket_s:
+            self._history.append((now, Counter()))
+        self._history[-1][1][tier] += count
+        self._totals[tier] += count
+        INFERENCE_TIERS.labels(tier).inc(count)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get tier totals, smoothed costs and the recent tier mix."""
+        total = sum(self._totals.values())
+        cost_ms: Dict[str, Dict[str, float]] = {}
+        for (route, tier), cost in self._cost_s.items():
+            cost_ms.setdefault(route, {})[tier] = cost * 1000
+        return {
+            'xgboost_pressure': self.xgboost_pressure,
+            'fallback_pressure': self.fallback_pressure,
+            'totals': {tier: self._totals[tier] for tier in TIERS},
+            'degraded_rate': 1 - self._totals['full'] / total if total else 0.0,
+            'cost_ms': cost_ms,
+            'history': [
+                {
+                    'start': datetime.fromtimestamp(started).isoformat(timespec='seconds'),
+                    **{tier: counts[tier] for tier in TIERS}
+                }
+                for started, counts in self._history
+            ]
+        }
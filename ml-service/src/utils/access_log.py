@@ -0,0 +1,174 @@
+"""Queue-backed logging and sampled structured access logs.
+
+Request handlers only put log records on an in-memory queue; a listener
+thread formats them and writes them out. When the queue is full records
+are dropped and counted rather than blocking the request.
+"""
+import json
+import logging
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, Optional
+
+ACCESS_LOGGER = "zappay.access"
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Listeners started by configure_logging
+_listeners: List[QueueListener] = []
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        payload.update(getattr(record, 'fields', {}))
+        return json.dumps(payload, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging(level: str, queue_size: int = 10000) -> List[QueueListener]:
+    """
+    Route all logging through background writer threads.
+
+    Application logs keep the plain text format; access logs are JSON.
+    Calling it again replaces the previous listeners, e.g. in a forked
+    worker, which does not inherit the parent's listener threads.
+
+    Args:
+        level: Root log level name
+        queue_size: Records buffered per queue before new ones are dropped
+
+    Returns:
+        Started listeners; shutdown_logging() stops them and flushes queued records
+    """
+    shutdown_logging()
+    listeners = _listeners
+    for logger, formatter in (
+        (logging.getLogger(), logging.Formatter(TEXT_FORMAT)),
+        (logging.getLogger(ACCESS_LOGGER), JsonFormatter())
+    ):
+        stream = logging.StreamHandler()
+        stream.setFormatter(formatter)
+
+        log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        logger.handlers = [DroppingQueueHandler(log_queue)]
+        listener = QueueListener(log_queue, stream, respect_handler_level=True)
+        listener.start()
+        listeners.append(listener)
+
+    logging.getLogger().setLevel(getattr(logging, level))
+    access_logger = logging.getLogger(ACCESS_LOGGER)
+    access_logger.setLevel(logging.INFO)
+    access_logger.propagate = False
+    return list(listeners)
+
+
+def shutdown_logging() -> None:
+    """Stop the listeners started by configure_logging, writing out queued records."""
+    while _listeners:
+        _listeners.pop().stop()
+
+
+class AccessLogger:
+    """Decide which requests to log and emit them as structured records."""
+
+    def __init__(self, sample_rate: float = 0.1, slow_ms: float = 250.0):
+        """
+        Initialize access logger.
+
+        Args:
+            sample_rate: Fraction of fast, successful requests that are logged
+            slow_ms: Requests at least this slow are always logged, as are
+                responses with status 400 or above
+        """
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self._logger = logging.getLogger(ACCESS_LOGGER)
+
+        # Statistics
+        self.logged = 0
+        self.sampled_out = 0
+
+    def log(
+        self,
+        method: str,
+        path: str,
+        status: int,
+        duration_ms: float,
+        stages: Optional[Dict[str, float]] = None,
+        **fields: Any
+    ) -> bool:
+        """
+        Log one request unless it is sampled out.
+
+        Args:
+            method: HTTP method
+            path: Request path
+            status: Response status code
+            duration_ms: Time until the response was ready
+            stages: Seconds spent per stage while handling the request
+            **fields: Extra fields for the log line
+
+        Returns:
+            Whether the request was logged
+        """
+        slow = duration_ms >= self.slow_ms
+        if status < 400 and not slow and random.random() >= self.sample_rate:
+            self.sampled_out += 1
+            return False
+
+        record = {
+            'method': method,
+            'path': path,
+            'status': status,
+            'duration_ms': round(duration_ms, 3),
+            'slow': slow,
+            **fields
+        }
+        if stages:
+            record['stages_ms'] = {stage: round(seconds * 1000, 3) for stage, seconds in stages.items()}
+        if status < 400 and not slow:
+            # Lets log pipelines scale sampled counts back up
+            record['sample_rate'] = self.sample_rate
+
+        level = logging.WARNING if status >= 500 or slow else logging.INFO
+        self._logger.log(level, "request", extra={'fields': record})
+        self.logged += 1
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get access log statistics."""
+        dropped = sum(
+            handler.dropped for name in ("", ACCESS_LOGGER)
+            for handler in logging.getLogger(name).handlers
+            if isinstance(handler, DroppingQueueHandler)
+        )
+        return {
+            'sample_rate': self.sample_rate,
+            'slow_ms': self.slow_ms,
+            'logged': self.logged,
+            'sampled_out': self.sampled_out,
+            'dropped': dropped
+        }
@@ -0,0 +1,68 @@
+"""Event loop lag monitoring."""
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopLagMonitor:
+    """Measure how late the event loop wakes up from a fixed-interval sleep.
+
+    Any lag means a coroutine held the loop without yielding, which delays
+    every other request including health checks.
+    """
+
+    def __init__(self, interval_ms: float = 100.0, window: int = 600):
+        """
+        Initialize monitor.
+
+        Args:
+            interval_ms: Sampling interval
+            window: Number of recent samples kept for statistics
+        """
+        self.interval_s = interval_ms / 1000
+        self._samples_ms: deque = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+        self.max_lag_ms = 0.0
+
+    def start(self) -> None:
+        """Start sampling in the background."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop sampling."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        """Sampling loop."""
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval_s)
+            lag_ms = max(0.0, (loop.time() - started - self.interval_s) * 1000)
+            self._samples_ms.append(lag_ms)
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get lag statistics in milliseconds."""
+        if not self._samples_ms:
+            return {'current': 0.0, 'p50': 0.0, 'p99': 0.0, 'max_recent': 0.0, 'max': 0.0}
+
+        samples = np.fromiter(self._samples_ms, dtype=float)
+        return {
+            'current': float(samples[-1]),
+            'p50': float(np.percentile(samples, 50)),
+            'p99': float(np.percentile(samples, 99)),
+            'max_recent': float(samples.max()),
+            'max': self.max_lag_ms
+        }
@@ -0,0 +1,116 @@
+"""Per-process memory accounting from /proc (Linux).
+
+Pages a worker shares with its pre-fork parent and sibling workers (model
+arrays loaded before forking, memory-mapped artifacts) count towards every
+process's RSS. Unique memory (private pages) and PSS (shared pages divided
+among the processes mapping them) show what each worker really costs.
+"""
+import os
+from typing import Any, Dict, List, Optional
+
+_SMAPS_FIELDS = {
+    'Rss': 'rss_mb',
+    'Pss': 'pss_mb',
+    'Shared_Clean': 'shared_clean_mb',
+    'Shared_Dirty': 'shared_dirty_mb',
+    'Private_Clean': 'private_clean_mb',
+    'Private_Dirty': 'private_dirty_mb'
+}
+
+
+def process_memory(pid: int) -> Optional[Dict[str, float]]:
+    """
+    Read the memory breakdown of one process.
+
+    Args:
+        pid: Process id
+
+    Returns:
+        Sizes in MiB (rss, pss, shared, unique and their clean/dirty
+        parts), or None if /proc/<pid>/smaps_rollup cannot be read
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    memory = {name: 0.0 for name in _SMAPS_FIELDS.values()}
+    for line in lines:
+        key, _, rest = line.partition(':')
+        name = _SMAPS_FIELDS.get(key)
+        if name is not None:
+            memory[name] = int(rest.split()[0]) / 1024
+
+    memory['shared_mb'] = memory['shared_clean_mb'] + memory['shared_dirty_mb']
+    memory['unique_mb'] = memory['private_clean_mb'] + memory['private_dirty_mb']
+    return memory
+
+
+def child_pids(parent: int) -> List[int]:
+    """
+    List the live child processes of a process.
+
+    Args:
+        parent: Parent process id
+
+    Returns:
+        Child pids in ascending order
+    """
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # Fields after the parenthesized command name: state, ppid, ...
+        fields = stat[stat.rfind(')') + 2:].split()
+        if len(fields) > 1 and int(fields[1]) == parent:
+            children.append(int(entry))
+    return sorted(children)
+
+
+def memory_report(prefork_parent: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Report unique versus shared memory of this process or its worker group.
+
+    Args:
+        prefork_parent: Pid of the pre-fork parent; the parent and all its
+            workers are reported. None reports only this process.
+
+    Returns:
+        Per-process breakdown and totals; total PSS is the real footprint
+        of the group, total RSS what it would cost without sharing
+    """
+    own = os.getpid()
+    if prefork_parent is not None:
+        roles = {prefork_parent: 'parent'}
+        roles.update({pid: 'worker' for pid in child_pids(prefork_parent)})
+    else:
+        roles = {own: 'single'}
+
+    processes = []
+    for pid, role in roles.items():
+        memory = process_memory(pid)
+        if memory is None:
+            continue
+        processes.append({
+            'pid': pid,
+            'role': role,
+            'self': pid == own,
+            **{name: round(value, 1) for name, value in memory.items()}
+        })
+
+    totals = {
+        name: round(sum(process[name] for process in processes), 1)
+        for name in ('rss_mb', 'pss_mb', 'unique_mb')
+    }
+    return {
+        'mode': 'prefork' if prefork_parent is not None else 'single',
+        'available': bool(processes),
+        'processes': processes,
+        'totals': totals
+    }
@@ -0,0 +1,358 @@
+"""In-process metrics registry exported in Prometheus text format.
+
+Counters and histograms keep one shard per thread, so recording from the
+event loop and from inference threads never takes a lock; shards are only
+summed when metrics are scraped.
+"""
+import bisect
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Seconds; requests span sub-millisecond cache hits to multi-second SHAP
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGE_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0
+)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """Render a Prometheus label set."""
+    pairs = [
+        '{}="{}"'.format(name, value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value, integers without a decimal point."""
+    if not math.isfinite(value):
+        return "NaN" if math.isnan(value) else ("+Inf" if value > 0 else "-Inf")
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Sharded:
+    """Per-thread list of numbers, summed on read."""
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._shards: List[List[float]] = []
+        self._lock = threading.Lock()
+
+    def shard(self) -> List[float]:
+        """This thread's shard, created on first use."""
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = [0] * self._size
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def totals(self) -> List[float]:
+        """Element-wise sum over all shards."""
+        with self._lock:
+            shards = list(self._shards)
+        totals = [0] * self._size
+        for shard in shards:
+            for i, value in enumerate(shard):
+                totals[i] += value
+        return totals
+
+
+class Counter:
+    """Monotonically increasing count."""
+
+    def __init__(self):
+        self._values = _Sharded(1)
+
+    def inc(self, amount: float = 1) -> None:
+        """Add to the count."""
+        self._values.shard()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._values.totals()[0]
+
+
+class Gauge:
+    """Value that is set, typically refreshed at scrape time."""
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        """Replace the value."""
+        self.value = value
+
+
+class Histogram:
+    """Observation counts in fixed cumulative buckets, plus their sum."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(sorted(buckets))
+        # One slot per bucket, one for +Inf, then the sum
+        self._values = _Sharded(len(self.buckets) + 2)
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        shard = self._values.shard()
+        shard[bisect.bisect_left(self.buckets, value)] += 1
+        shard[-1] += value
+
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        """
+        Read the histogram.
+
+        Returns:
+            Tuple of (cumulative count per bucket including +Inf, count, sum)
+        """
+        totals = self._values.totals()
+        cumulative = []
+        running = 0
+        for count in totals[:-1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, running, totals[-1]
+
+
+class MetricFamily:
+    """Metrics of one name and type, one child per label combination."""
+
+    def __init__(self, name: str, help_text: str, kind: str, labelnames: Sequence[str] = (), **child_kwargs):
+        self.name = name
+        self.help_text = help_text
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self._child_kwargs = child_kwargs
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        if self.kind == 'counter':
+            return Counter()
+        if self.kind == 'gauge':
+            return Gauge()
+        return Histogram(**self._child_kwargs)
+
+    def labels(self, *values: str):
+        """
+        Get the metric for one label combination, creating it on first use.
+
+        Args:
+            *values: Label values in labelnames order
+
+        Returns:
+            Counter, Gauge or Histogram
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def total(self) -> float:
+        """Sum of a counter family over all label combinations."""
+        return sum(child.value for child in list(self._children.values()))
+
+    def render(self) -> Iterator[str]:
+        """Yield the family in Prometheus text exposition format."""
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for values, child in sorted(list(self._children.items())):
+            if self.kind != 'histogram':
+                yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+                continue
+
+            cumulative, count, total = child.snapshot()
+            bounds = [_format_value(bound) for bound in child.buckets] + ["+Inf"]
+            for bound, bucket_count in zip(bounds, cumulative):
+                labels = _format_labels(self.labelnames, values, f'le="{bound}"')
+                yield f"{self.name}_bucket{labels} {_format_value(bucket_count)}"
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {_format_value(count)}"
+
+
+class MetricsRegistry:
+    """Named metric families of one process."""
+
+    def __init__(self):
+        self._families: Dict[str, MetricFamily] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, family: MetricFamily) -> MetricFamily:
+        with self._lock:
+            existing = self._families.get(family.name)
+            if existing is not None:
+                return existing
+            self._families[family.name] = family
+            return family
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        """Register (or get) a counter family."""
+        return self._register(MetricFamily(name, help_text, 'counter', labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        """Register (or get) a gauge family."""
+        return self._register(MetricFamily(name, help_text, 'gauge', labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = REQUEST_BUCKETS
+    ) -> MetricFamily:
+        """Register (or get) a histogram family with fixed buckets."""
+        return self._register(MetricFamily(name, help_text, 'histogram', labelnames, buckets=buckets))
+
+    def render(self) -> str:
+        """Render every family in Prometheus text exposition format."""
+        with self._lock:
+            families = list(self._families.values())
+        lines = [line for family in families for line in family.render()]
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.histogram(
+    "zappay_ml_request_duration_seconds",
+    "Time from routing a request to its response being ready.",
+    ("method", "route", "status")
+)
+REQUESTS = registry.counter(
+    "zappay_ml_requests_total",
+    "Requests handled.",
+    ("method", "route", "status")
+)
+STAGE_LATENCY = registry.histogram(
+    "zappay_ml_stage_duration_seconds",
+    "Time spent in one stage of request processing.",
+    ("stage",),
+    buckets=STAGE_BUCKETS
+)
+PREDICTIONS = registry.counter(
+    "zappay_ml_predictions_total",
+    "Wallets scored, including results served from cache.",
+    ("kind",)
+)
+INFERENCE_TIERS = registry.counter(
+    "zappay_ml_inference_tier_total",
+    "Fraud predictions computed per inference tier (full, xgboost, fallback).",
+    ("tier",)
+)
+REQUESTS_SHED = registry.counter(
+    "zappay_ml_requests_shed_total",
+    "Prediction requests rejected by admission control.",
+    ("reason",)
+)
+FEEDBACK = registry.counter(
+    "zappay_ml_feedback_total",
+    "Feedback labels received."
+)
+FEEDBACK.labels()  # Export 0 before the first feedback
+SHADOW_PREDICTIONS = registry.counter(
+    "zappay_ml_shadow_predictions_total",
+    "Live predictions re-scored by the shadow model version.",
+    ("kind",)
+)
+SHADOW_DISAGREEMENTS = registry.counter(
+    "zappay_ml_shadow_disagreements_total",
+    "Shadow predictions whose label (is_fraud, is_anomaly) differs from the served one.",
+    ("kind",)
+)
+SHADOW_DELTA = registry.histogram(
+    "zappay_ml_shadow_abs_delta",
+    "Absolute difference between shadow and served scores.",
+    ("kind",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+
+
+# Stage seconds of the request being handled, for its access log line
+_request_stages: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    "request_stages", default=None
+)
+
+# Prepended to stage names, keeps background work out of the request stages
+_stage_prefix: contextvars.ContextVar[str] = contextvars.ContextVar("stage_prefix", default="")
+
+
+def track_request_stages() -> Dict[str, float]:
+    """
+    Start collecting stage times for the current request.
+
+    Work run through the inference executor or member pool inherits the
+    request context, so model stages on other threads are included.
+
+    Returns:
+        Dict filled with total seconds per stage as stages finish
+    """
+    stages: Dict[str, float] = {}
+    _request_stages.set(stages)
+    return stages
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """
+    Record the duration of one stage.
+
+    Args:
+        stage: Stage name
+        seconds: How long the stage took
+    """
+    stage = _stage_prefix.get() + stage
+    STAGE_LATENCY.labels(stage).observe(seconds)
+    stages = _request_stages.get()
+    if stages is not None:
+        stages[stage] = stages.get(stage, 0.0) + seconds
+
+
+def observe_stage(stage: str, started: float) -> None:
+    """
+    Record a stage that began at a time.perf_counter() timestamp.
+
+    Args:
+        stage: Stage name
+        started: perf_counter() value when the stage began
+    """
+    record_stage(stage, time.perf_counter() - started)
+
+
+@contextmanager
+def time_stage(stage: str) -> Iterator[None]:
+    """
+    Time a block as one stage.
+
+    Args:
+        stage: Stage name, e.g. 'random_forest' or 'shap'
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+
+def set_stage_prefix(prefix: str) -> None:
+    """
+    Record stages of the current context (e.g. a background thread) under prefixed names.
+
+    Args:
+        prefix: Prepended to every stage name, e.g. 'shadow_'
+    """
+    _stage_prefix.set(prefix)
@@ -1,14 +1,21 @@
 """Model manager for loading and managing ML models."""
+import asyncio
 import logging
+import re
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator, List
 from datetime import datetime
 
+import numpy as np
+
 from src.models.fraud_detector import FraudDetector
 from src.models.anomaly_detector import AnomalyDetector
 from src.models.predictor import TransactionPredictor
 from src.services.explainer import ModelExplainer
-from src.config import settings
+from src.config import MODEL_VERSION_PATTERN, settings
+from src.utils.startup import startup_report
 
 logger = logging.getLogger(__name__)
 
@@ -16,15 +23,27 @@ logger = logging.getLogger(__name__)
 class ModelManager:
     """Manage all ML models for the service."""
 
-    def __init__(self, model_version: str = "1.0.0"):
+    def __init__(
+        self,
+        model_version: str = "1.0.0",
+        member_pool=None,
+        prediction_cache=None,
+        model_dir: Optional[Path] = None
+    ):
         """
         Initialize model manager.
 
         Args:
             model_version: Version of models to load
+            member_pool: Optional EnsembleMemberPool for concurrent ensemble members
+            prediction_cache: Optional PredictionCache, its local tier is
+                cleared whenever models are (re)loaded
+            model_dir: Directory of the artifacts, MODEL_PATH by default
         """
         self.model_version = model_version or settings.model_version
-        self.model_dir = settings.model_dir
+        self.model_dir = Path(model_dir) if model_dir is not None else settings.model_dir
+        self.member_pool = member_pool
+        self.prediction_cache = prediction_cache
 
         # Models
         self.fraud_detector: Optional[FraudDetector] = None
@@ -32,23 +51,42 @@ class ModelManager:
         self.transaction_predictor: Optional[TransactionPredictor] = None
         self.explainer: Optional[ModelExplainer] = None
 
+        # Candidate version scored on sampled live traffic, see load_shadow()
+        self.shadow = None
+
         # State
         self.models_loaded = False
         self.load_time: Optional[datetime] = None
+        self.load_duration_s: Optional[float] = None
+
+        # Warm-up state, see warm_up()
+        self.warmed_up = False
+        self.warmup_duration_s: Optional[float] = None
+        self.warmup_timings: Dict[str, float] = {}
+        self.warmup_error: Optional[str] = None
 
-    async def load_models(self) -> None:
-        """Load all models from disk."""
+        # Requests currently using these models, see lease()
+        self.in_flight = 0
+
+    async def load_models(self, shadow: bool = True) -> None:
+        """
+        Load all models from disk.
+
+        Args:
+            shadow: Also load SHADOW_MODEL_VERSION, if set, to score sampled
+                traffic next to these models
+        """
         logger.info(f"Loading models version {self.model_version}...")
 
+        started = time.perf_counter()
+        self.warmed_up = False
         try:
-            # Load fraud detector
-            self.fraud_detector = FraudDetector(model_dir=str(self.model_dir))
-            self.fraud_detector.load(version=self.model_version)
+            # The detectors are independent, load them side by side off the event loop
+            self.fraud_detector, self.anomaly_detector = await asyncio.gather(
+                asyncio.to_thread(self._load_fraud_detector, self.model_version, self.member_pool),
+                asyncio.to_thread(self._load_anomaly_detector, self.model_version)
+            )
             logger.info("✅ Fraud detector loaded")
-
-            # Load anomaly detector
-            self.anomaly_detector = AnomalyDetector(model_dir=str(self.model_dir))
-            self.anomaly_detector.load(version=self.model_version)
             logger.info("✅ Anomaly detector loaded")
 
             # Initialize transaction predictor (no loading needed)
@@ -66,8 +104,19 @@ class ModelManager:
 
             self.models_loaded = True
             self.load_time = datetime.now()
+            self.load_duration_s = time.perf_counter() - started
 
-            logger.info(f"🎉 All models loaded successfully at {self.load_time}")
+            # Results from the previous models must not be served
+            if self.prediction_cache is not None:
+                self.prediction_cache.clear()
+
+            logger.info(f"🎉 All models loaded successfully in {self.load_duration_s:.2f}s at {self.load_time}")
+
+            if shadow and settings.shadow_model_version and settings.shadow_model_version != self.model_version:
+                try:
+                    await self.load_shadow(settings.shadow_model_version)
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not load shadow models version {settings.shadow_model_version}: {e}")
 
         except FileNotFoundError as e:
             logger.warning(f"⚠️ Models not found: {e}")
@@ -79,6 +128,241 @@ class ModelManager:
             self.models_loaded = False
             raise
 
+    def _load_fraud_detector(self, version: str, member_pool=None) -> FraudDetector:
+        """Load the fraud models of a version and prepare the configured inference paths."""
+        fraud_detector = FraudDetector(model_dir=str(self.model_dir))
+        fraud_detector.load(version=version, max_workers=settings.model_load_workers)
+        fraud_detector.member_pool = member_pool
+
+        if settings.inference_engine == "compiled":
+            cache_path = None
+            if settings.compiled_engine_mmap:
+                cache_path = self.model_dir / f"compiled_v{version}.joblib"
+            with startup_report.time_artifact(f"compiled_v{version}"):
+                fraud_detector.compile_engine(
+                    max_rows=settings.compiled_engine_max_rows,
+                    cache_path=cache_path
+                )
+        elif settings.inference_engine == "onnx":
+            with startup_report.time_artifact(f"onnx_v{version}"):
+                fraud_detector.load_onnx(
+                    version,
+                    intra_op_threads=settings.onnx_intra_op_threads,
+                    inter_op_threads=settings.onnx_inter_op_threads
+                )
+
+        if settings.enable_cascade:
+            fraud_detector.configure_cascade(
+                band=settings.cascade_band,
+                first_model=settings.cascade_first_model
+            )
+        return fraud_detector
+
+    def _load_anomaly_detector(self, version: str) -> AnomalyDetector:
+        """Load the anomaly model of a version and prepare the configured inference path."""
+        anomaly_detector = AnomalyDetector(model_dir=str(self.model_dir))
+        anomaly_detector.load(version=version, max_workers=settings.model_load_workers)
+
+        if settings.inference_engine == "onnx":
+            with startup_report.time_artifact(f"anomaly_onnx_v{version}"):
+                anomaly_detector.load_onnx(
+                    version,
+                    intra_op_threads=settings.onnx_intra_op_threads,
+                    inter_op_threads=settings.onnx_inter_op_threads,
+                    max_rows=settings.onnx_anomaly_max_rows
+                )
+        return anomaly_detector
+
+    async def load_shadow(self, version: str) -> None:
+        """
+        Load a candidate version to score sampled live traffic next to the served one.
+
+        The candidate runs without the ensemble member pool, on its own
+        low-priority thread, and never affects responses.
+
+        Args:
+            version: Candidate model version
+
+        Raises:
+            FileNotFoundError: If the version's models are missing
+            ValueError: If it is the served version or not a valid version
+        """
+        from src.services.shadow import ShadowScorer
+
+        if not re.fullmatch(MODEL_VERSION_PATTERN, version):
+            raise ValueError(f"Invalid model version {version!r}")
+        if version == self.model_version:
+            raise ValueError(f"Version {version} is already served")
+
+        fraud_detector, anomaly_detector = await asyncio.gather(
+            asyncio.to_thread(self._load_fraud_detector, version),
+            asyncio.to_thread(self._load_anomaly_detector, version)
+        )
+        shadow = ShadowScorer(
+            fraud_detector,
+            anomaly_detector,
+            version,
+            sample_rate=settings.shadow_sample_rate,
+            max_queue=settings.shadow_queue_size,
+            window=settings.shadow_window,
+            busy=lambda: self.in_flight > 0
+        )
+        shadow.start()
+        self.stop_shadow()
+        self.shadow = shadow
+        logger.info(f"👥 Shadow scoring {settings.shadow_sample_rate:.0%} of requests with version {version}")
+
+    def stop_shadow(self) -> None:
+        """Stop shadow scoring and drop the candidate models."""
+        if self.shadow is not None:
+            self.shadow.stop()
+            logger.info(f"Stopped shadow scoring with version {self.shadow.version}")
+            self.shadow = None
+
+    def _synthetic_records(self, n_rows: int, rng: np.random.Generator) -> List[Dict[str, float]]:
+        """Random non-negative feature dicts covering every model's features."""
+        names = list(dict.fromkeys(self.fraud_detector.feature_names + self.anomaly_detector.feature_names))
+        values = rng.lognormal(mean=0.0, sigma=2.0, size=(n_rows, len(names)))
+        return [dict(zip(names, row.tolist())) for row in values]
+
+    def warm_up(self, batches: int = 3, batch_size: int = 64, explainer: bool = True) -> Dict[str, float]:
+        """
+        Run synthetic batches through every model before real traffic.
+
+        The first calls of each model pay for lazy initialization (thread
+        pools, compiled layouts, allocator growth, the SHAP explainer and
+        its import). Single rows and full batches are both run, through
+        every available fraud tier, so both inference paths are warm.
+        Blocking; run it off the event loop.
+
+        Args:
+            batches: Number of synthetic batches, 0 to only mark the models warm
+            batch_size: Rows per batch
+            explainer: Also build the explainer and explain one row
+
+        Returns:
+            Seconds spent per model
+        """
+        if not self.is_ready():
+            raise ValueError("Models not loaded")
+
+        started = time.perf_counter()
+        timings = {'fraud_detector': 0.0, 'anomaly_detector': 0.0}
+        rng = np.random.default_rng(0)
+        try:
+            for _ in range(batches):
+                for records in (self._synthetic_records(1, rng), self._synthetic_records(batch_size, rng)):
+                    model_started = time.perf_counter()
+                    for tier in self.fraud_detector.available_tiers:
+                        # Synthetic rows must not show up in the path statistics
+                        self.fraud_detector.predict_proba_records(
+                            records, return_path=True, tier=tier, record_paths=False
+                        )
+                    timings['fraud_detector'] += time.perf_counter() - model_started
+
+                    model_started = time.perf_counter()
+                    X = self.anomaly_detector.vectorize(records)
+                    self.anomaly_detector.score(X)
+                    timings['anomaly_detector'] += time.perf_counter() - model_started
+
+            if batches and explainer and self.explainer is not None:
+                model_started = time.perf_counter()
+                try:
+                    records = self._synthetic_records(1, rng)
+                    self.explainer.explain(self.fraud_detector.vectorize(records), top_n=3)
+                    timings['explainer'] = time.perf_counter() - model_started
+                except Exception as e:
+                    # Explanations are optional, the service is usable without them
+                    logger.warning(f"⚠️ Explainer warm-up failed: {e}")
+        except Exception as e:
+            self.warmup_error = str(e)
+            raise
+
+        self.warmup_timings = timings
+        self.warmup_duration_s = time.perf_counter() - started
+        self.warmup_error = None
+        self.warmed_up = True
+        logger.info(
+            f"🔥 Models warmed up in {self.warmup_duration_s:.2f}s ("
+            + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items()) + ")"
+        )
+        return timings
+
+    def get_readiness(self) -> Dict[str, Any]:
+        """
+        Get readiness for traffic: models loaded and warmed up.
+
+        Returns:
+            Readiness flag, load and warm-up durations and any warm-up error
+        """
+        return {
+            'ready': self.is_ready() and self.warmed_up,
+            'models_loaded': self.is_ready(),
+            'warmed_up': self.warmed_up,
+            'model_version': self.model_version,
+            'load_duration_s': round(self.load_duration_s, 3) if self.load_duration_s is not None else None,
+            'warmup_duration_s': round(self.warmup_duration_s, 3) if self.warmup_duration_s is not None else None,
+            'warmup_s': {name: round(seconds, 3) for name, seconds in self.warmup_timings.items()},
+            'warmup_error': self.warmup_error
+        }
+
+    @property
+    def cache_version(self) -> str:
+        """
+        Version tag for prediction cache keys.
+
+        Includes the training dates, so models retrained under the same
+        version number do not serve the previous models' cached results.
+        """
+        trained = [
+            detector.training_date.isoformat()
+            for detector in (self.fraud_detector, self.anomaly_detector)
+            if detector is not None and detector.training_date is not None
+        ]
+        return "+".join([self.model_version, *trained])
+
+    @contextmanager
+    def lease(self) -> Iterator["ModelManager"]:
+        """
+        Count a request as using these models for the duration of the block.
+
+        A reload swaps in new models for new requests and waits until the
+        old models have no leases left before releasing them. Only used
+        from the event loop thread, so no locking is needed.
+        """
+        self.in_flight += 1
+        try:
+            yield self
+        finally:
+            self.in_flight -= 1
+
+    def unload(self) -> None:
+        """Drop the references to the models so their memory can be freed."""
+        self.stop_shadow()
+        self.models_loaded = False
+        self.fraud_detector = None
+        self.anomaly_detector = None
+        self.transaction_predictor = None
+        self.explainer = None
+
+    def attach(self, member_pool=None, prediction_cache=None) -> None:
+        """
+        Connect per-process resources to models loaded in another process.
+
+        Pre-forked workers inherit the parent's loaded models but create
+        their own thread pools and caches after forking.
+
+        Args:
+            member_pool: Optional EnsembleMemberPool for concurrent ensemble members
+            prediction_cache: Optional PredictionCache
+        """
+        self.member_pool = member_pool
+        self.prediction_cache = prediction_cache
+        if self.fraud_detector is not None:
+            self.fraud_detector.member_pool = member_pool
+        if self.shadow is not None:
+            self.shadow.start()
+
     def is_ready(self) -> bool:
         """Check if models are loaded and ready."""
         return (
@@ -93,14 +377,23 @@ class ModelManager:
             'models_loaded': self.models_loaded,
             'model_version': self.model_version,
             'load_time': self.load_time.isoformat() if self.load_time else None,
+            'warmed_up': self.warmed_up,
             'models': {
                 'fraud_detector': self.fraud_detector is not None,
                 'anomaly_detector': self.anomaly_detector is not None,
                 'transaction_predictor': self.transaction_predictor is not None,
                 'explainer': self.explainer is not None
-            }
+            },
+            'shadow_version': self.shadow.version if self.shadow is not None else None
         }
 
+        if self.fraud_detector and self.fraud_detector.compiled_engine:
+            status['compiled_engine'] = self.fraud_detector.compiled_engine.get_info()
+        if self.fraud_detector and self.fraud_detector.onnx_engine:
+            status['onnx_engine'] = self.fraud_detector.onnx_engine.get_info()
+        if self.anomaly_detector and self.anomaly_detector.onnx_pipeline:
+            status['onnx_anomaly_pipeline'] = self.anomaly_detector.onnx_pipeline.get_info()
+
         # Add metrics if available
         if self.fraud_detector and self.fraud_detector.metrics:
             status['fraud_detector_metrics'] = self.fraud_detector.metrics
@@ -0,0 +1,297 @@
+"""Statistical stack sampling profiler.
+
+A background thread periodically snapshots the Python stack of every
+thread with sys._current_frames() and counts identical stacks. Profiles
+are written in the collapsed ("folded") stack format, one
+"frame;frame;frame count" line per stack, which flamegraph.pl, speedscope
+and most flamegraph viewers read directly.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Leaf frames of threads that are waiting rather than working
+_IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("thread.py", "_worker"),
+    ("queue.py", "get"),
+    ("tasks.py", "sleep"),
+}
+
+_OVERFLOW_STACK = "[other stacks]"
+
+
+class _FrameNames:
+    """Cache of display names per code object."""
+
+    def __init__(self):
+        self._names: Dict[Any, str] = {}
+
+    def __call__(self, code) -> str:
+        name = self._names.get(code)
+        if name is None:
+            path = code.co_filename
+            marker = path.rfind("site-packages" + os.sep)
+            if marker >= 0:
+                path = path[marker + len("site-packages") + 1:]
+            elif (src := path.rfind(os.sep + "src" + os.sep)) >= 0:
+                path = path[src + 1:]
+            else:
+                path = os.path.basename(path)
+            name = f"{code.co_name} ({path}:{code.co_firstlineno})".replace(";", ",")
+            self._names[code] = name
+        return name
+
+
+class StackSampler:
+    """Sample all thread stacks at a fixed interval into folded-stack counts."""
+
+    def __init__(
+        self,
+        interval_ms: float = 20.0,
+        window_s: float = 300.0,
+        bucket_s: float = 10.0,
+        max_stacks: int = 5000,
+        include_idle: bool = False
+    ):
+        """
+        Initialize sampler.
+
+        Args:
+            interval_ms: Time between samples
+            window_s: How much history the rolling profile keeps
+            bucket_s: Granularity at which old samples are dropped
+            max_stacks: Distinct stacks kept per bucket, the rest are lumped together
+            include_idle: Also count threads blocked waiting for work
+        """
+        self.interval_s = interval_ms / 1000
+        self.bucket_s = bucket_s
+        self.max_stacks = max_stacks
+        self.include_idle = include_idle
+        self._buckets: Deque[Tuple[float, Counter]] = deque(maxlen=max(1, int(window_s / bucket_s)))
+        self._lock = threading.Lock()
+        self._names = _FrameNames()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Statistics
+        self.ticks = 0
+        self.samples = 0
+        self.sampling_s = 0.0
+        self.started_at: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the sampling thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start sampling on a daemon thread."""
+        if self.running:
+            return
+        self._stop.clear()
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the thread to exit."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _fold(self, frame, thread_name: str) -> Optional[str]:
+        """Render one thread stack root-first, or None if the thread is idle."""
+        code = frame.f_code
+        if not self.include_idle and (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES:
+            return None
+
+        names = []
+        while frame is not None:
+            names.append(self._names(frame.f_code))
+            frame = frame.f_back
+        names.append(thread_name)
+        names.reverse()
+        return ";".join(names)
+
+    def sample(self) -> None:
+        """Take one sample of every thread except the sampler itself."""
+        started = time.perf_counter()
+        own = threading.get_ident()
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+
+        stacks = []
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = self._fold(frame, thread_names.get(ident, f"thread-{ident}"))
+            if stack is not None:
+                stacks.append(stack)
+
+        now = time.time()
+        with self._lock:
+            if not self._buckets or now - self._buckets[-1][0] >= self.bucket_s:
+                self._buckets.append((now, Counter()))
+            counts = self._buckets[-1][1]
+            for stack in stacks:
+                if stack in counts or len(counts) < self.max_stacks:
+                    counts[stack] += 1
+                else:
+                    counts[_OVERFLOW_STACK] += 1
+
+        self.ticks += 1
+        self.samples += len(stacks)
+        self.sampling_s += time.perf_counter() - started
+
+    def _run(self) -> None:
+        """Sampling loop."""
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning(f"Stack sampling failed: {e}")
+
+    def counts(self, window_s: Optional[float] = None) -> Counter:
+        """
+        Aggregate stack counts.
+
+        Args:
+            window_s: Only include the most recent seconds, None for all kept
+
+        Returns:
+            Counter of folded stack to sample count
+        """
+        cutoff = time.time() - window_s if window_s is not None else float("-inf")
+        with self._lock:
+            buckets = [counts for started, counts in self._buckets if started + self.bucket_s > cutoff]
+            total = Counter()
+            for counts in buckets:
+                total.update(counts)
+        return total
+
+    def folded(self, window_s: Optional[float] = None) -> str:
+        """
+        Render the aggregated profile in collapsed stack format.
+
+        Args:
+            window_s: Only include the most recent seconds, None for all kept
+
+        Returns:
+            One "frame;frame;frame count" line per distinct stack
+        """
+        return to_folded(self.counts(window_s))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get sampler statistics."""
+        elapsed = time.time() - self.started_at if self.started_at else 0.0
+        return {
+            'running': self.running,
+            'interval_ms': self.interval_s * 1000,
+            'window_s': self.bucket_s * self._buckets.maxlen,
+            'ticks': self.ticks,
+            'samples': self.samples,
+            'overhead_pct': 100 * self.sampling_s / elapsed if elapsed else 0.0
+        }
+
+
+def to_folded(counts: Counter) -> str:
+    """Render stack counts in collapsed stack format, hottest first."""
+    return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+
+class ProfileStore:
+    """Recent per-request profiles, kept in memory and optionally on disk."""
+
+    def __init__(self, keep: int = 20, directory: Optional[str] = None):
+        """
+        Initialize store.
+
+        Args:
+            keep: Number of profiles kept in memory
+            directory: Also write each profile here as <id>.folded
+        """
+        self._profiles: "Dict[str, Dict[str, Any]]" = {}
+        self._order: Deque[str] = deque()
+        self.keep = keep
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._armed = 0
+
+    def arm(self, count: int) -> None:
+        """Profile the next count requests regardless of headers."""
+        with self._lock:
+            self._armed = count
+
+    def take_armed(self) -> bool:
+        """Consume one armed request, returning whether there was one."""
+        with self._lock:
+            if self._armed <= 0:
+                return False
+            self._armed -= 1
+            return True
+
+    @property
+    def armed(self) -> int:
+        return self._armed
+
+    def add(self, method: str, path: str, duration_ms: float, counts: Counter) -> str:
+        """
+        Store a request profile.
+
+        Args:
+            method: HTTP method
+            path: Request path
+            duration_ms: Time the request was profiled for
+            counts: Folded stack counts
+
+        Returns:
+            Profile id
+        """
+        started = time.time()
+        profile_id = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime(started))}-{os.urandom(3).hex()}"
+        folded = to_folded(counts)
+        entry = {
+            'id': profile_id,
+            'method': method,
+            'path': path,
+            'duration_ms': duration_ms,
+            'samples': sum(counts.values()),
+            'folded': folded
+        }
+
+        with self._lock:
+            self._profiles[profile_id] = entry
+            self._order.append(profile_id)
+            while len(self._order) > self.keep:
+                self._profiles.pop(self._order.popleft(), None)
+
+        if self.directory:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(os.path.join(self.directory, f"{profile_id}.folded"), "w") as f:
+                    f.write(folded)
+            except OSError as e:
+                logger.warning(f"Could not write profile {profile_id}: {e}")
+
+        return profile_id
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """Get a stored profile by id."""
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> list:
+        """Summaries of stored profiles, newest first."""
+        with self._lock:
+            return [
+                {key: value for key, value in self._profiles[profile_id].items() if key != 'folded'}
+                for profile_id in reversed(self._order)
+            ]
@@ -0,0 +1,96 @@
+"""FastAPI route class recording request metrics.
+
+Besides overall latency per route and status, it splits off the two stages
+FastAPI runs around an endpoint: parsing and validating the request body
+before it, and validating and serializing the response model after it.
+"""
+import contextvars
+import functools
+import time
+from typing import Any, Callable, Coroutine, Optional
+
+from fastapi import HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+
+from src.utils.metrics_registry import REQUEST_LATENCY, REQUESTS, record_stage
+
+# perf_counter() when the endpoint started and finished, within one request
+_endpoint_started: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "endpoint_started", default=None
+)
+_endpoint_finished: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "endpoint_finished", default=None
+)
+
+
+def _timed_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap an async endpoint to note when it starts and finishes."""
+    if getattr(endpoint, "__timed__", False):
+        return endpoint
+
+    @functools.wraps(endpoint)
+    async def timed(*args, **kwargs):
+        _endpoint_started.set(time.perf_counter())
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            _endpoint_finished.set(time.perf_counter())
+
+    timed.__timed__ = True
+    return timed
+
+
+class InstrumentedRoute(APIRoute):
+    """APIRoute that records latency, request counts and framework stages."""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+        parses_body = self.body_field is not None
+        serializes = self.response_field is not None
+        route_label = None
+
+        def label(request: Request) -> str:
+            """Path template including any router prefix, found on first use."""
+            nonlocal route_label
+            if route_label is None:
+                path = request.scope["path"]
+                prefixes = [i for i, char in enumerate(path) if char == "/"]
+                matched = [i for i in prefixes if self.path_regex.match(path[i:])]
+                # Depending on the FastAPI version the prefix is already in path_format
+                route_label = path[:matched[0]] + self.path_format if matched else self.path_format
+            return route_label
+
+        async def instrumented(request: Request) -> Response:
+            _endpoint_started.set(None)
+            _endpoint_finished.set(None)
+            started = time.perf_counter()
+            status = 500
+            try:
+                response = await handler(request)
+                status = response.status_code
+                return response
+            except HTTPException as e:
+                status = e.status_code
+                raise
+            except RequestValidationError:
+                status = 422
+                raise
+            finally:
+                finished = time.perf_counter()
+                route = label(request)
+                REQUEST_LATENCY.labels(request.method, route, str(status)).observe(finished - started)
+                REQUESTS.labels(request.method, route, str(status)).inc()
+
+                # Only endpoints that ran had their request and response validated
+                endpoint_started = _endpoint_started.get()
+                endpoint_finished = _endpoint_finished.get()
+                if parses_body and endpoint_started is not None:
+                    record_stage('validation', endpoint_started - started)
+                if serializes and endpoint_finished is not None and status < 400:
+                    record_stage('serialization', finished - endpoint_finished)
+
+        return instrumented
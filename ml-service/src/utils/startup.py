@@ -0,0 +1,185 @@
+"""Startup timing report.
+
+Records how long the process took to import its heavy modules and to load
+each model artifact, and when it became ready to serve. Modules imported
+lazily on first use (e.g. shap for explanations) are recorded too, marked
+as imported after startup.
+"""
+import importlib
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+import joblib
+
+logger = logging.getLogger(__name__)
+
+
+def _process_age_s() -> Optional[float]:
+    """Seconds since this process was started, from /proc (Linux)."""
+    try:
+        with open("/proc/self/stat") as f:
+            stat = f.read()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+    except OSError:
+        return None
+    # Field 22 (starttime, in clock ticks after boot), counted after the command name
+    start_ticks = int(stat[stat.rfind(')') + 2:].split()[19])
+    return uptime - start_ticks / os.sysconf('SC_CLK_TCK')
+
+
+class StartupReport:
+    """Collect import, artifact load and phase timings of one process."""
+
+    def __init__(self):
+        """Initialize report, anchored at the process start time."""
+        age = _process_age_s()
+        self._started = time.perf_counter() - (age if age is not None else 0.0)
+        self.ready = False
+        self.imports: Dict[str, Dict[str, Any]] = {}
+        self.artifacts: Dict[str, float] = {}
+        self.phases: Dict[str, float] = {}
+
+    def elapsed_s(self) -> float:
+        """Seconds since the process started."""
+        return time.perf_counter() - self._started
+
+    @contextmanager
+    def time_import(self, name: str) -> Iterator[None]:
+        """
+        Time the imports done in the block.
+
+        Args:
+            name: Module name to record them under
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.imports[name] = {
+                'seconds': time.perf_counter() - started,
+                'lazy': self.ready
+            }
+
+    def import_module(self, name: str) -> ModuleType:
+        """
+        Import a module, recording how long it took if it was not loaded yet.
+
+        Args:
+            name: Module name
+
+        Returns:
+            The module
+        """
+        module = sys.modules.get(name)
+        if module is not None:
+            return module
+        with self.time_import(name):
+            module = importlib.import_module(name)
+        logger.info(f"Imported {name} in {self.imports[name]['seconds']:.2f}s")
+        return module
+
+    @contextmanager
+    def time_artifact(self, name: str) -> Iterator[None]:
+        """
+        Time loading one model artifact in the block.
+
+        Args:
+            name: Artifact name, e.g. the file name
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.artifacts[name] = time.perf_counter() - started
+
+    def mark(self, phase: str) -> None:
+        """
+        Record that a startup phase finished now.
+
+        Args:
+            phase: Phase name; 'ready' also ends startup
+        """
+        self.phases[phase] = self.elapsed_s()
+        if phase == 'ready':
+            self.ready = True
+
+    def get_report(self) -> Dict[str, Any]:
+        """Get the timings, slowest imports and artifacts first."""
+        imports = sorted(self.imports.items(), key=lambda item: -item[1]['seconds'])
+        artifacts = sorted(self.artifacts.items(), key=lambda item: -item[1])
+        return {
+            'ready': self.ready,
+            'phases_s': {phase: round(seconds, 3) for phase, seconds in self.phases.items()},
+            'imports_s': {
+                name: {'seconds': round(entry['seconds'], 3), 'lazy': entry['lazy']}
+                for name, entry in imports
+            },
+            'artifacts_s': {name: round(seconds, 3) for name, seconds in artifacts}
+        }
+
+    def log(self) -> None:
+        """Log a one-line summary of the report."""
+        phases = ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in self.phases.items())
+        imports = ", ".join(
+            f"{name} {entry['seconds']:.2f}s"
+            for name, entry in sorted(self.imports.items(), key=lambda item: -item[1]['seconds'])
+        )
+        artifacts = ", ".join(
+            f"{name} {seconds:.2f}s"
+            for name, seconds in sorted(self.artifacts.items(), key=lambda item: -item[1])
+        )
+        logger.info(f"Startup: {phases} | imports: {imports or 'none'} | artifacts: {artifacts or 'none'}")
+
+
+# Global report of this process
+startup_report = StartupReport()
+
+
+def load_artifacts(paths: Mapping[str, Path], max_workers: int = 1) -> Dict[str, Any]:
+    """
+    Deserialize joblib artifacts, recording the load time of each.
+
+    Reading and decompressing files releases the GIL, so loading several
+    artifacts on threads overlaps their I/O.
+
+    Args:
+        paths: Artifact paths by name
+        max_workers: Artifacts loaded at the same time
+
+    Returns:
+        Loaded objects by name
+    """
+    def load(path: Path) -> Any:
+        with startup_report.time_artifact(path.name):
+            return joblib.load(path)
+
+    if max_workers <= 1 or len(paths) <= 1:
+        return {name: load(path) for name, path in paths.items()}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths)), thread_name_prefix="model-load") as pool:
+        futures = {name: pool.submit(load, path) for name, path in paths.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def strip_feature_names(*estimators: Any) -> None:
+    """
+    Forget the DataFrame column names sklearn estimators were fitted with.
+
+    Inference passes arrays laid out in feature_names order. Without the
+    fitted names sklearn skips its column name check, which would otherwise
+    warn that X does not have valid feature names on every call.
+
+    Args:
+        *estimators: Fitted estimators, None entries are skipped
+    """
+    for estimator in estimators:
+        # XGBoost exposes the names as a read-only property of its booster
+        if estimator is not None and 'feature_names_in_' in vars(estimator):
+            del estimator.feature_names_in_
@@ -0,0 +1,95 @@
+"""Parity of the onnxruntime backend with the native models."""
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("skl2onnx")
+pytest.importorskip("onnxmltools")
+
+import xgboost as xgb  # noqa: E402
+from sklearn.ensemble import IsolationForest, RandomForestClassifier  # noqa: E402
+from sklearn.preprocessing import StandardScaler  # noqa: E402
+
+from src.models.onnx_backend import (  # noqa: E402
+    OnnxAnomalyPipeline, OnnxEnsemble, export_anomaly_pipeline, export_fraud_models
+)
+from src.models.tree_engine import RF_WEIGHT, XGB_WEIGHT  # noqa: E402
+
+# Default tolerance of FraudDetector.load_onnx and AnomalyDetector.load_onnx
+TOLERANCE = 1e-5
+N_FEATURES = 10
+
+
+def _features(n_rows, seed):
+    rng = np.random.default_rng(seed)
+    return rng.lognormal(sigma=2.0, size=(n_rows, N_FEATURES)).astype(np.float32)
+
+
+@pytest.fixture(scope="module")
+def fraud_models(tmp_path_factory):
+    X = _features(2000, seed=0)
+    rng = np.random.default_rng(1)
+    y = ((X[:, 0] * X[:, 1] + rng.normal(size=len(X))) > 2.0).astype(int)
+
+    rf_model = RandomForestClassifier(n_estimators=30, max_depth=10, random_state=42, n_jobs=1).fit(X, y)
+    xgb_model = xgb.XGBClassifier(n_estimators=30, max_depth=6, random_state=42, n_jobs=1).fit(X, y)
+
+    model_dir = tmp_path_factory.mktemp("onnx")
+    export_fraud_models(rf_model, xgb_model, N_FEATURES, model_dir, "test")
+    return rf_model, xgb_model, OnnxEnsemble.load(model_dir, "test")
+
+
+@pytest.fixture(scope="module")
+def anomaly_models(tmp_path_factory):
+    X = _features(2000, seed=2).astype(np.float64)
+    scaler = StandardScaler().fit(X)
+    iforest = IsolationForest(n_estimators=50, contamination=0.1, random_state=42).fit(scaler.transform(X))
+
+    model_dir = tmp_path_factory.mktemp("onnx")
+    export_anomaly_pipeline(scaler, iforest, N_FEATURES, model_dir, "test")
+    return scaler, iforest, OnnxAnomalyPipeline.load(model_dir, "test", offset=iforest.offset_)
+
+
+def test_fraud_members_within_tolerance(fraud_models):
+    rf_model, xgb_model, ensemble = fraud_models
+    X = _features(20000, seed=3)
+
+    rf_native = rf_model.predict_proba(X)[:, 1]
+    xgb_native = xgb_model.predict_proba(X)[:, 1]
+    assert np.abs(ensemble.predict_member(X, 'random_forest') - rf_native).max() <= TOLERANCE
+    assert np.abs(ensemble.predict_member(X, 'xgboost') - xgb_native).max() <= TOLERANCE
+
+    native = RF_WEIGHT * rf_native + XGB_WEIGHT * xgb_native
+    proba = ensemble.predict_proba(X)
+    assert np.abs(proba - native).max() <= TOLERANCE
+    # Only rows closer to the threshold than the tolerance may flip
+    decided = np.abs(native - 0.5) > TOLERANCE
+    assert np.array_equal((proba >= 0.5)[decided], (native >= 0.5)[decided])
+
+
+def test_fraud_verify_accepts_threshold_probe(fraud_models):
+    rf_model, xgb_model, ensemble = fraud_models
+    probe = OnnxEnsemble.probe_matrix(rf_model, N_FEATURES, n_rows=2000)
+
+    assert ensemble.verify(rf_model, xgb_model, probe, TOLERANCE)
+
+
+def test_anomaly_pipeline_within_tolerance(anomaly_models):
+    scaler, iforest, pipeline = anomaly_models
+    X = _features(20000, seed=4).astype(np.float64)
+
+    labels, scores, X_scaled = pipeline.run(X)
+    native_scaled = scaler.transform(X)
+    native_scores = iforest.score_samples(native_scaled)
+
+    assert np.abs(scores - native_scores).max() <= TOLERANCE
+    assert np.allclose(X_scaled, native_scaled)
+    decided = np.abs(native_scores - iforest.offset_) > TOLERANCE
+    assert np.array_equal(labels[decided], iforest.predict(native_scaled)[decided])
+
+
+def test_anomaly_verify_accepts_threshold_probe(anomaly_models):
+    scaler, iforest, pipeline = anomaly_models
+    probe = OnnxAnomalyPipeline.probe_matrix(scaler, iforest, N_FEATURES, n_rows=2000)
+
+    assert pipeline.verify(scaler, iforest, probe, TOLERANCE)
@@ -0,0 +1,218 @@
+"""Tests for the two-tier prediction cache, against an in-process Redis stand-in."""
+import asyncio
+import time
+
+import pytest
+
+from src.services.cache import TTLCache
+from src.services.prediction_cache import PredictionCache, decode_result, encode_result
+
+
+class FakeRedis:
+    """The subset of redis.asyncio the prediction cache uses, kept in a dict."""
+
+    def __init__(self):
+        self.data = {}
+        self.down = False
+        self.mget_calls = 0
+        self.pipelines = 0
+
+    def _check(self):
+        if self.down:
+            raise ConnectionError("Redis is down")
+
+    def _get(self, key):
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self.data[key]
+            return None
+        return value
+
+    def _set(self, key, value, nx=False, px=None):
+        if nx and self._get(key) is not None:
+            return None
+        if isinstance(value, str):
+            value = value.encode()
+        self.data[key] = (value, time.monotonic() + px / 1000 if px else None)
+        return True
+
+    def _delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def mget(self, keys):
+        self._check()
+        self.mget_calls += 1
+        return [self._get(key) for key in keys]
+
+    async def delete(self, *keys):
+        self._check()
+        return self._delete(*keys)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def aclose(self):
+        pass
+
+
+class FakePipeline:
+    """Queues commands and runs them on execute()."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, *args, **kwargs):
+        self.commands.append((self.redis._set, args, kwargs))
+
+    def delete(self, *keys):
+        self.commands.append((self.redis._delete, keys, {}))
+
+    async def execute(self):
+        self.redis._check()
+        self.redis.pipelines += 1
+        return [fn(*args, **kwargs) for fn, args, kwargs in self.commands]
+
+
+def _cache(redis, **kwargs):
+    return PredictionCache(TTLCache(max_entries=100, ttl_seconds=60), redis=redis, **kwargs)
+
+
+def _key(wallet):
+    return ('fraud', wallet, 8453, '1.0.0', 'features')
+
+
+def _compute_counting(calls, delay_s=0.0):
+    async def compute(positions):
+        calls.append(list(positions))
+        await asyncio.sleep(delay_s)
+        return [(0.25, 'ensemble') for _ in positions]
+    return compute
+
+
+@pytest.mark.parametrize("kind,value", [
+    ('fraud', (0.123456789, 'xgboost_only')),
+    ('fraud', (1.0, '')),
+    ('anomaly', {'is_anomaly': True, 'anomaly_score': -0.42, 'anomaly_reasons': ['High gas', 'New wallet']}),
+    ('anomaly', {'is_anomaly': False, 'anomaly_score': 0.1, 'anomaly_reasons': []}),
+])
+def test_encode_decode_round_trip(kind, value):
+    assert decode_result(kind, encode_result(kind, value)) == value
+
+
+def test_unknown_kind_is_rejected():
+    with pytest.raises(ValueError):
+        encode_result('explanation', None)
+
+
+def test_redis_hit_is_promoted_to_local_tier():
+    redis = FakeRedis()
+    writer, reader = _cache(redis), _cache(redis)
+    calls = []
+
+    async def run():
+        await writer.get_or_compute([_key('0xa')], _compute_counting(calls))
+        assert reader.peek([_key('0xa')]) == [None]
+        first = await reader.get_or_compute([_key('0xa')], _compute_counting(calls))
+        mgets = redis.mget_calls
+        second = await reader.get_or_compute([_key('0xa')], _compute_counting(calls))
+        return first, second, mgets
+
+    first, second, mgets = asyncio.run(run())
+    assert first == second == [(0.25, 'ensemble')]
+    assert len(calls) == 1
+    assert reader.redis_hits == 1
+    assert reader.peek([_key('0xa')]) == [(0.25, 'ensemble')]
+    # The second lookup was answered in process
+    assert redis.mget_calls == mgets
+
+
+def test_misses_use_one_mget_and_pipelined_writes():
+    redis = FakeRedis()
+    cache = _cache(redis)
+    calls = []
+    keys = [_key(f'0x{i}') for i in range(5)]
+
+    results = asyncio.run(cache.get_or_compute(keys, _compute_counting(calls)))
+
+    assert results == [(0.25, 'ensemble')] * 5
+    assert calls == [[0, 1, 2, 3, 4]]
+    assert redis.mget_calls == 1
+    # One pipeline takes the locks, one stores the results and releases them
+    assert redis.pipelines == 2
+    assert cache.redis_misses == 5
+    assert not [key for key in redis.data if key.endswith(':lock')]
+    assert all(redis._get(cache._redis_key(key)) is not None for key in keys)
+
+
+def test_stampede_computes_once_across_instances():
+    redis = FakeRedis()
+    first, second = _cache(redis, poll_interval_ms=1), _cache(redis, poll_interval_ms=1)
+    calls = []
+    compute = _compute_counting(calls, delay_s=0.05)
+
+    async def run():
+        return await asyncio.gather(
+            first.get_or_compute([_key('0xa')], compute),
+            second.get_or_compute([_key('0xa')], compute)
+        )
+
+    results = asyncio.run(run())
+
+    assert results == [[(0.25, 'ensemble')], [(0.25, 'ensemble')]]
+    assert len(calls) == 1
+    assert first.lock_waits + second.lock_waits == 1
+
+
+def test_concurrent_requests_in_one_process_share_a_computation():
+    cache = _cache(None)
+    calls = []
+    compute = _compute_counting(calls, delay_s=0.01)
+
+    async def run():
+        return await asyncio.gather(*[cache.get_or_compute([_key('0xa')], compute) for _ in range(3)])
+
+    asyncio.run(run())
+    assert len(calls) == 1
+    assert cache.coalesced == 2
+
+
+def test_falls_back_to_local_cache_when_redis_is_down():
+    redis = FakeRedis()
+    redis.down = True
+    cache = _cache(redis)
+    calls = []
+
+    async def run():
+        first = await cache.get_or_compute([_key('0xa')], _compute_counting(calls))
+        second = await cache.get_or_compute([_key('0xa')], _compute_counting(calls))
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first == second == [(0.25, 'ensemble')]
+    assert len(calls) == 1
+    assert cache.redis_errors == 1
+    assert cache.get_stats()['redis']['available'] is False
+
+
+def test_redis_is_retried_after_an_outage():
+    redis = FakeRedis()
+    redis.down = True
+    cache = _cache(redis, retry_after_s=0.0)
+    calls = []
+
+    async def run():
+        await cache.get_or_compute([_key('0xa')], _compute_counting(calls))
+        redis.down = False
+        await cache.get_or_compute([_key('0xb')], _compute_counting(calls))
+
+    asyncio.run(run())
+    assert cache.get_stats()['redis']['available'] is True
+    assert redis._get(cache._redis_key(_key('0xb'))) is not None
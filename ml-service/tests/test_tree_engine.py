@@ -0,0 +1,57 @@
+"""Tests for the compiled tree engine, which must match the native ensemble bit for bit."""
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.fraud_detector import FraudDetector
+from src.models.tree_engine import _expf, _expf_f32
+
+
+@pytest.fixture(scope="module")
+def detectors(tmp_path_factory):
+    """A small trained ensemble, natively and with the compiled engine."""
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.lognormal(sigma=2.0, size=(3000, 12)), columns=[f"feature_{i}" for i in range(12)])
+    y = pd.Series(((X["feature_0"] * X["feature_1"] + rng.normal(size=len(X))) > 2.0).astype(int))
+
+    native = FraudDetector(model_dir=str(tmp_path_factory.mktemp("models")))
+    native.train(
+        X[:2400], y[:2400], X[2400:], y[2400:],
+        rf_params={'n_estimators': 50, 'n_jobs': 1, 'verbose': 0},
+        xgb_params={'n_estimators': 50, 'n_jobs': 1}
+    )
+
+    compiled = copy.copy(native)
+    assert compiled.compile_engine(max_rows=10**9)
+    return native, compiled
+
+
+def test_compiled_matches_native_on_random_rows_with_nans(detectors):
+    native, compiled = detectors
+    rng = np.random.default_rng(1)
+    X = rng.lognormal(sigma=3.0, size=(20000, len(native.feature_names))).astype(np.float32)
+    X[rng.random(X.shape) < 0.05] = np.nan
+
+    assert np.array_equal(compiled.predict_proba(X), native.predict_proba(X))
+
+    rf_proba, xgb_proba = compiled.compiled_engine.predict_members(X)
+    assert np.array_equal(rf_proba, native.rf_model.predict_proba(X)[:, 1])
+    assert np.array_equal(xgb_proba, native.xgb_model.predict_proba(X)[:, 1])
+
+
+def test_compiled_matches_native_on_split_thresholds(detectors):
+    native, compiled = detectors
+    X = compiled.compiled_engine.probe_matrix(len(native.feature_names), n_rows=5000, seed=2)
+
+    assert np.array_equal(compiled.predict_proba(X), native.predict_proba(X))
+
+
+@pytest.mark.skipif(_expf is None, reason="C library expf not available")
+def test_expf_matches_c_library():
+    rng = np.random.default_rng(3)
+    x = np.concatenate([rng.uniform(-104.0, 88.7, 200000), rng.uniform(-5.0, 5.0, 200000)]).astype(np.float32)
+
+    expected = np.array([_expf(v) for v in x.tolist()], dtype=np.float32)
+    assert np.array_equal(_expf_f32(x).view(np.uint32), expected.view(np.uint32))
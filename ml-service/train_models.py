@@ -61,6 +61,10 @@ def train_fraud_detector(X_train, X_test, y_train, y_test, feature_names, versio
     logger.info(f"  Recall:    {metrics['ensemble_recall']:.4f}")
     logger.info(f"  F1 Score:  {metrics['ensemble_f1']:.4f}")
     logger.info(f"  AUC-ROC:   {metrics['ensemble_auc_roc']:.4f}")
+
+    logger.info(f"\nFallback (distilled, vs. ensemble):")
+    logger.info(f"  MAE:       {metrics['fallback_mae']:.4f}")
+    logger.info(f"  Agreement: {metrics['fallback_agreement']:.4f}")
     logger.info("=" * 60)
 
     # Show feature importance
@@ -76,6 +80,17 @@ def train_fraud_detector(X_train, X_test, y_train, y_test, feature_names, versio
     return detector, metrics
 
 
+def export_onnx(fraud_detector, anomaly_detector, version="1.0.0"):
+    """Export the trained models to ONNX graphs for INFERENCE_ENGINE=onnx."""
+    try:
+        paths = list(fraud_detector.export_onnx(version=version).values())
+        paths.append(anomaly_detector.export_onnx(version=version))
+    except ImportError as e:
+        logger.warning(f"⚠️ Skipping ONNX export, install skl2onnx and onnxmltools to enable it: {e}")
+        return
+    logger.info(f"✅ ONNX graphs saved: {', '.join(path.name for path in paths)}")
+
+
 def train_anomaly_detector(X_train, y_train, feature_names, version="1.0.0"):
     """Train anomaly detection model."""
     logger.info("\n" + "=" * 60)
@@ -134,6 +149,11 @@ def main():
         default=0.2,
         help="Test set proportion"
     )
+    parser.add_argument(
+        "--no-onnx",
+        action="store_true",
+        help="Don't export the models to ONNX"
+    )
 
     args = parser.parse_args()
 
@@ -169,6 +189,9 @@ def main():
             X_train, y_train, feature_names, args.version
         )
 
+        if not args.no_onnx:
+            export_onnx(fraud_detector, anomaly_detector, args.version)
+
         # Final summary
         logger.info("\n" + "=" * 60)
         logger.info("🎉 TRAINING COMPLETE!")